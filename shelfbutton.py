@@ -1,34 +1,16 @@
 import sys
 
+srcDir = r"[THIS FILE'S DIRECTORY]\src"
+if srcDir not in sys.path:
+    sys.path.append(srcDir)
 
-import importlib
-
-reloadList = []
-
-sys.path.append(r"[THIS FILE'S DIRECTORY]\src")
-
-packages = ['ui', 'exportapi', 'IW_AnimExporter', 'resources']
-
-for modName in sys.modules.keys():
-    for package in packages:
-        if modName == package:
-            reloadList.append(modName)
-            continue
-        elif f"{package}." in modName:
-            reloadList.append(modName)
-            continue
+import IW_AnimExporter
+from IW_AnimExporter import reloadmanager
 
+# Only modules edited since the last click are reloaded, everything else is reused as is
+reloadmanager.reloadChanged()
 
-for modName in reloadList:
-    try:
-        if modName not in sys.modules:
-            continue
-        if sys.modules[modName] is not None:
-            del(sys.modules[modName])
-    except Exception as e:
-        continue
-        
-import IW_AnimExporter
 IW_AnimExporter.main()
 
-
+# the window imports most modules lazily, record them now so their first edit is reloaded on the next click
+reloadmanager.recordLoadedModules()
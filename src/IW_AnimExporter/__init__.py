@@ -1,9 +1,6 @@
 import sys, os
-from PySide2 import QtWidgets, QtCore
-import maya.cmds as cmds
-import maya.OpenMayaUI as omui
-from shiboken2 import wrapInstance
 
+# Qt and Maya modules are imported inside the functions that use them, which keeps importing this package cheap
 
 
 if os.path.dirname(__file__) not in sys.path:
@@ -22,8 +19,12 @@ def inMayaUi():
         return True
 
 def setupWindow(inMayaUi):
+    from PySide2 import QtWidgets
 
     if inMayaUi:
+        import maya.OpenMayaUI as omui
+        from shiboken2 import wrapInstance
+
         mayaWindowPtr = omui.MQtUtil.mainWindow()
         mayaWindow = wrapInstance(int(mayaWindowPtr), QtWidgets.QWidget)
         window = ui.mainwindow.MainWindow(parent=mayaWindow)
@@ -36,10 +37,26 @@ def setupWindow(inMayaUi):
     controller.ObjectAnimationData.connect(window.populateObjectData)
     controller.SetCommitButtonText.connect(window.setPortCommitButtonText)
     controller.InterfaceModeChanged.connect(window.emptyPortPanelData)
+    controller.CurvePreviewData.connect(window.setCurvePreview)
+    controller.LibrarySearchResults.connect(window.populateLibraryResults)
+    controller.LibraryStatus.connect(window.setLibraryStatus)
+    controller.JobQueueChanged.connect(window.populateJobQueue)
 
     window.ObjectSelected.connect(controller.emitObjectAnimationData)
+    window.ObjectSelected.connect(controller.emitObjectCurvePreview)
+    window.PreviewFileRequested.connect(controller.emitFileCurvePreview)
     window.PortCommitButtonClicked.connect(controller.portObjectAnimationData)
     window.InterfaceModeChanged.connect(controller.setInterfaceMode)
+    window.LibrarySearchRequested.connect(controller.searchLibrary)
+    window.LibraryRescanRequested.connect(controller.rescanLibrary)
+    window.PortQueueButtonClicked.connect(controller.queuePortJob)
+    window.JobMoveRequested.connect(controller.moveJob)
+    window.JobRemoveRequested.connect(controller.removeJob)
+    window.JobQueueStartRequested.connect(controller.startJobQueue)
+    window.JobQueueStopRequested.connect(controller.stopJobQueue)
+    window.ClearFinishedJobsRequested.connect(controller.clearFinishedJobs)
+    window.ProfilingToggled.connect(controller.setProfilingEnabled)
+    window.setProfilingChecked(exportapi.profiling.isEnabled())
 
     window.controller = controller  # keep instance
     window.finishInitialization()
@@ -49,6 +66,8 @@ def main():
     isInMaya = inMayaUi()
 
     if not isInMaya:
+        from PySide2 import QtWidgets
+        import maya.cmds as cmds
 
         cmds.file(file, open=True, force=True)
         app = QtWidgets.QApplication(sys.argv)
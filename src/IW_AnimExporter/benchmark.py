@@ -0,0 +1,102 @@
+import sys, os, time, math, argparse
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+if os.path.dirname(__file__) not in sys.path:
+    sys.path.append(os.path.dirname(__file__))
+
+from exportapi import exporthandler
+
+
+def typicalCurvePayload(attributeCount=10, keyCount=500):
+    """
+    Builds export data shaped like a dense character control export, in the schema 2 layout 'exportCurveData' writes
+
+    Parameters
+    ----------
+    attributeCount: int
+    keyCount: int
+        Keys per attribute
+
+    Returns
+    -------
+    dict
+        Attribute name to curve columns, see 'exporthandler.curveToColumns'
+
+    """
+    payload = {}
+    for attributeIndex in range(attributeCount):
+        attributeCurveData = {}
+        for keyIndex in range(keyCount):
+            phase = keyIndex * 0.1 + attributeIndex
+            attributeCurveData[float(keyIndex)] = {
+                exporthandler.attributeValueKey: math.sin(phase) * 10.0,
+                exporthandler.keyInTangentTypeKey: "auto",
+                exporthandler.keyInAngleKey: math.degrees(math.atan(math.cos(phase))),
+                exporthandler.keyInWeightKey: 1.0,
+                exporthandler.keyOutTangentTypeKey: "auto",
+                exporthandler.keyOutAngleKey: math.degrees(math.atan(math.cos(phase))),
+                exporthandler.keyOutWeightKey: 1.0,
+            }
+        payload[f"attribute{attributeIndex}"] = attributeCurveData
+    return dict(exporthandler.storedItems(payload.items()))
+
+def _bestTime(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - _start)
+    return best
+
+def benchmarkSerializers(payload=None, repeat=5):
+    """
+    Measures encode and decode throughput of every available serializer
+
+    Parameters
+    ----------
+    payload: dict
+        Data to encode, defaults to 'typicalCurvePayload'
+    repeat: int
+        Runs per measurement, the fastest one is kept
+
+    Returns
+    -------
+    dict
+        Serializer name to a dict of 'bytes', 'encodeMBps' and 'decodeMBps'
+
+    """
+    if payload is None:
+        payload = typicalCurvePayload()
+
+    results = {}
+    for name in exporthandler.availableSerializers():
+        serializer = exporthandler.getSerializer(name)
+        encoded = serializer.encode(payload)
+        megabytes = len(encoded) / 1e6
+        results[name] = {
+            "bytes": len(encoded),
+            "encodeMBps": megabytes / _bestTime(lambda: serializer.encode(payload), repeat),
+            "decodeMBps": megabytes / _bestTime(lambda: serializer.decode(encoded), repeat),
+        }
+    return results
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the animation file serializers")
+    parser.add_argument("--attributes", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args(args)
+
+    payload = typicalCurvePayload(options.attributes, options.keys)
+    results = benchmarkSerializers(payload, options.repeat)
+
+    print(f"{'serializer':<12} {'bytes':>12} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<12} {result['bytes']:>12} {result['encodeMBps']:>12.1f} {result['decodeMBps']:>12.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
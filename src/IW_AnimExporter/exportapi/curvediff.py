@@ -0,0 +1,292 @@
+import sys, argparse
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+import numpy as np
+
+from . import exporthandler, curveevaluator
+
+# Per key fields compared between matching keys, as CurveArrays attribute names
+comparedKeyFields = ["values", "inAngles", "inWeights", "outAngles", "outWeights"]
+
+
+class CurveDifference(object):
+
+    def __init__(self, attribute, fieldDifferences, sampledDifference, keyTimeMismatches, tangentTypeMismatches):
+        """
+        The largest differences found between two versions of the same curve
+
+        Parameters
+        ----------
+        attribute: str
+        fieldDifferences: dict
+            Compared key field to the largest absolute difference between matching keys
+        sampledDifference: float
+            Largest absolute value difference between the evaluated curves
+        keyTimeMismatches: int
+            Keys that only exist in one of the curves
+        tangentTypeMismatches: int
+            Matching keys whose in or out tangent type differs
+        """
+        super().__init__()
+        self.attribute = attribute
+        self.fieldDifferences = fieldDifferences
+        self.sampledDifference = sampledDifference
+        self.keyTimeMismatches = keyTimeMismatches
+        self.tangentTypeMismatches = tangentTypeMismatches
+
+    def maxDifference(self):
+        return max([self.sampledDifference] + list(self.fieldDifferences.values()))
+
+    def exceeds(self, tolerance):
+        return self.keyTimeMismatches > 0 or self.tangentTypeMismatches > 0 or self.maxDifference() > tolerance
+
+    def asDict(self):
+        return {
+            "attribute": self.attribute,
+            "fieldDifferences": self.fieldDifferences,
+            "sampledDifference": self.sampledDifference,
+            "keyTimeMismatches": self.keyTimeMismatches,
+            "tangentTypeMismatches": self.tangentTypeMismatches,
+        }
+
+
+class DiffReport(object):
+
+    def __init__(self, tolerance):
+        """
+        Collects the curve differences of one comparison
+
+        Parameters
+        ----------
+        tolerance: float
+            Largest difference still considered a match
+        """
+        super().__init__()
+        self.tolerance = tolerance
+        self.differences = []
+        self.missingAttributes = []
+        self.stoppedEarly = False
+
+    def passed(self):
+        return not self.missingAttributes and not self.failures()
+
+    def failures(self):
+        return [difference for difference in self.differences if difference.exceeds(self.tolerance)]
+
+    def worst(self, count=10):
+        """
+        Gets the curves that differ the most, mismatched keys ranking above any value difference
+
+        Parameters
+        ----------
+        count: int
+
+        Returns
+        -------
+        list[CurveDifference]
+
+        """
+        differing = [difference for difference in self.differences if difference.exceeds(0.0)]
+        ranked = sorted(
+            differing,
+            key=lambda difference: (difference.keyTimeMismatches + difference.tangentTypeMismatches, difference.maxDifference()),
+            reverse=True
+        )
+        return ranked[:count]
+
+
+def _matchKeys(curveA, curveB):
+    _, indicesA, indicesB = np.intersect1d(curveA.times, curveB.times, assume_unique=True, return_indices=True)
+    mismatches = len(curveA) + len(curveB) - 2 * len(indicesA)
+    return indicesA, indicesB, mismatches
+
+def _perCurveMaxima(flatDifferences, segmentStarts, segmentLengths):
+    """
+    Reduces a flat array of differences of every curve to the maximum per curve, 0.0 for curves without entries
+    """
+    maxima = np.zeros(len(segmentStarts), dtype=np.float64)
+    nonEmpty = segmentLengths > 0
+    if flatDifferences.size and np.any(nonEmpty):
+        maxima[nonEmpty] = np.maximum.reduceat(flatDifferences, segmentStarts[nonEmpty])
+    return maxima
+
+def _compareBatch(attributes, curvesA, curvesB, sampleStep, frameSeconds):
+    matches = [_matchKeys(curvesA[attr], curvesB[attr]) for attr in attributes]
+    segmentLengths = np.array([len(indicesA) for indicesA, _, _ in matches], dtype=np.int64)
+    segmentStarts = np.concatenate([[0], np.cumsum(segmentLengths)[:-1]]).astype(np.int64)
+
+    fieldMaxima = {}
+    for field in comparedKeyFields:
+        if segmentLengths.sum() == 0:
+            fieldMaxima[field] = np.zeros(len(attributes))
+            continue
+        flatA = np.concatenate([getattr(curvesA[attr], field)[indicesA] for attr, (indicesA, _, _) in zip(attributes, matches)])
+        flatB = np.concatenate([getattr(curvesB[attr], field)[indicesB] for attr, (_, indicesB, _) in zip(attributes, matches)])
+        fieldMaxima[field] = _perCurveMaxima(np.abs(flatA - flatB), segmentStarts, segmentLengths)
+
+    differences = []
+    for index, attr in enumerate(attributes):
+        curveA = curvesA[attr]
+        curveB = curvesB[attr]
+        indicesA, indicesB, keyTimeMismatches = matches[index]
+
+        tangentTypeMismatches = int(np.count_nonzero(
+            (curveA.inTangentTypes[indicesA] != curveB.inTangentTypes[indicesB])
+            | (curveA.outTangentTypes[indicesA] != curveB.outTangentTypes[indicesB])
+        ))
+
+        sampledDifference = 0.0
+        keyTimes = np.concatenate([curveA.times, curveB.times])
+        if sampleStep and keyTimes.size:
+            sampleTimes = np.arange(keyTimes.min(), keyTimes.max() + sampleStep, sampleStep)
+            sampledA = curveevaluator.evaluateCurve(curveA, sampleTimes, frameSeconds)
+            sampledB = curveevaluator.evaluateCurve(curveB, sampleTimes, frameSeconds)
+            sampledDifference = float(np.max(np.abs(sampledA - sampledB)))
+
+        differences.append(CurveDifference(
+            attribute=attr,
+            fieldDifferences={field: float(fieldMaxima[field][index]) for field in comparedKeyFields},
+            sampledDifference=sampledDifference,
+            keyTimeMismatches=int(keyTimeMismatches),
+            tangentTypeMismatches=tangentTypeMismatches
+        ))
+    return differences
+
+def compareCurves(curvesA, curvesB, tolerance=0.0001, sampleStep=1.0, frameSeconds=1.0 / 24.0, failFast=False, batchSize=256):
+    """
+    Compares two sets of curves by attribute, key by key and by sampling both curves
+
+    Parameters
+    ----------
+    curvesA: dict
+        Attribute name to CurveArrays
+    curvesB: dict
+        Attribute name to CurveArrays
+    tolerance: float
+        Largest difference still considered a match
+    sampleStep: float
+        Frames between samples, 0 or None skips the sampled comparison
+    frameSeconds: float
+        Length of a frame in seconds
+    failFast: bool
+        Whether to stop after the first batch containing a curve over the tolerance
+    batchSize: int
+        Curves compared per vectorized batch
+
+    Returns
+    -------
+    DiffReport
+
+    """
+    report = DiffReport(tolerance)
+    report.missingAttributes = sorted(set(curvesA).symmetric_difference(curvesB))
+    if failFast and report.missingAttributes:
+        report.stoppedEarly = True
+        return report
+
+    attributes = sorted(set(curvesA).intersection(curvesB))
+    for batchStart in range(0, len(attributes), batchSize):
+        batch = attributes[batchStart:batchStart + batchSize]
+        differences = _compareBatch(batch, curvesA, curvesB, sampleStep, frameSeconds)
+        report.differences.extend(differences)
+        if failFast and any(difference.exceeds(tolerance) for difference in differences):
+            report.stoppedEarly = batchStart + batchSize < len(attributes)
+            break
+
+    return report
+
+def _curveArraysFromData(animationCurveData):
+    return {attr: curveevaluator.CurveArrays.fromKeyframeData(attributeCurveData) for attr, attributeCurveData in animationCurveData.items()}
+
+def compareFiles(filepathA, filepathB, clip=None, **kwargs):
+    """
+    Compares two exported animation files, see 'compareCurves' for the keyword arguments
+
+    Parameters
+    ----------
+    filepathA: str
+    filepathB: str
+    clip: str
+        Clip section compared in both files, required for multi-clip files, see 'exporthandler.clipCurveData'
+
+    Returns
+    -------
+    DiffReport
+
+    """
+    return compareCurves(curveevaluator.loadCurveArrays(filepathA, clip=clip), curveevaluator.loadCurveArrays(filepathB, clip=clip), **kwargs)
+
+def compareFileToObject(filepath, objectName, keyframeOffset=0, clip=None, **kwargs):
+    """
+    Compares an exported animation file to the curves currently on an object in the scene, e.g. after importing it.
+    See 'compareCurves' for the keyword arguments
+
+    Parameters
+    ----------
+    filepath: str
+    objectName: str
+    keyframeOffset: float
+        Offset the file was imported with
+    clip: str
+        Clip section of a multi-clip file that was imported
+
+    Returns
+    -------
+    DiffReport
+
+    """
+    fileCurveData = exporthandler.clipCurveData(filepath, exporthandler.readJson(filepath), clip=clip)
+    objectCurveData = exporthandler.AnimationPort(objectName).getCurveData(attributes=list(fileCurveData.keys()))
+    if keyframeOffset:
+        objectCurveData = {
+            attr: {float(keyframeTime) - float(keyframeOffset): keyframeData for keyframeTime, keyframeData in attributeCurveData.items()}
+            for attr, attributeCurveData in objectCurveData.items()
+        }
+
+    kwargs.setdefault("frameSeconds", exporthandler.secondsPerFrame())
+    return compareCurves(_curveArraysFromData(fileCurveData), _curveArraysFromData(objectCurveData), **kwargs)
+
+def formatReport(report, count=10):
+    lines = []
+    for attr in report.missingAttributes:
+        lines.append(f"{attr}: only present in one side")
+    for difference in report.worst(count):
+        lines.append(
+            f"{difference.attribute}: max {difference.maxDifference():.6g}, sampled {difference.sampledDifference:.6g}, "
+            f"key time mismatches {difference.keyTimeMismatches}, tangent type mismatches {difference.tangentTypeMismatches}"
+        )
+    status = "MATCH" if report.passed() else "DIFFERENT"
+    if report.stoppedEarly:
+        status = f"{status} (stopped at the first difference over tolerance)"
+    lines.append(f"{status}: {len(report.failures())} of {len(report.differences)} compared curves over tolerance {report.tolerance}")
+    return "\n".join(lines)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Compare two exported animation files")
+    parser.add_argument("fileA")
+    parser.add_argument("fileB")
+    parser.add_argument("--tolerance", type=float, default=0.0001)
+    parser.add_argument("--sample-step", type=float, default=1.0)
+    parser.add_argument("--fps", type=float, default=24.0)
+    parser.add_argument("--clip", default=None, help="Clip section to compare, required for multi-clip files")
+    parser.add_argument("--fail-fast", action="store_true")
+    parser.add_argument("--worst", type=int, default=10)
+    options = parser.parse_args(args)
+
+    report = compareFiles(
+        options.fileA,
+        options.fileB,
+        clip=options.clip,
+        tolerance=options.tolerance,
+        sampleStep=options.sample_step,
+        frameSeconds=1.0 / options.fps,
+        failFast=options.fail_fast
+    )
+    print(formatReport(report, options.worst))
+    return 0 if report.passed() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+import numpy as np
+
+from . import exporthandler
+
+#   Evaluates exported animation curves without Maya.
+#
+#   Tangent angles are in degrees and describe a slope in value units per second, tangent weights are the length of
+#   the tangent in seconds. As with Maya a segment's bezier control points sit one third of the tangent away from
+#   their key. Non-weighted curves keep the control points' time at a third of the segment, which reduces to a hermite
+#   interpolation of the value. Before the first and after the last key the curve holds the key's value.
+
+stepTangentType = "step"
+stepNextTangentType = "stepnext"
+
+# the bezier parameter of a sample is solved until it moves by less than this, or its bracket is this narrow
+_bezierParameterTolerance = 1e-12
+# bisection alone reaches the tolerance well within this, newton steps usually after a handful
+_maxBezierIterations = 64
+
+
+class CurveArrays(object):
+
+    def __init__(self, times, values, inTangentTypes, inAngles, inWeights, outTangentTypes, outAngles, outWeights, weighted=None):
+        """
+        Parallel per key arrays of a single animation curve, sorted by time
+
+        Parameters
+        ----------
+        times: list[float]
+        values: list[float]
+        inTangentTypes: list[str]
+        inAngles: list[float]
+        inWeights: list[float]
+        outTangentTypes: list[str]
+        outAngles: list[float]
+        outWeights: list[float]
+        weighted: bool
+            Whether the curve uses weighted tangents, by default a curve is weighted when any weight differs from 1.0
+        """
+        super().__init__()
+        order = np.argsort(np.asarray(times, dtype=np.float64), kind="stable")
+        self.times = np.asarray(times, dtype=np.float64)[order]
+        self.values = np.asarray(values, dtype=np.float64)[order]
+        self.inTangentTypes = np.asarray(inTangentTypes, dtype=object)[order]
+        self.inAngles = np.asarray(inAngles, dtype=np.float64)[order]
+        self.inWeights = np.asarray(inWeights, dtype=np.float64)[order]
+        self.outTangentTypes = np.asarray(outTangentTypes, dtype=object)[order]
+        self.outAngles = np.asarray(outAngles, dtype=np.float64)[order]
+        self.outWeights = np.asarray(outWeights, dtype=np.float64)[order]
+
+        if weighted is None:
+            weighted = bool(np.any(self.inWeights != 1.0) or np.any(self.outWeights != 1.0))
+        self.weighted = weighted
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def fromKeyframeData(cls, attributeCurveData, weighted=None):
+        """
+        Builds the arrays from an exported attribute's keyframe time to keyframe data dictionary
+
+        Parameters
+        ----------
+        attributeCurveData: dict
+        weighted: bool
+
+        Returns
+        -------
+        CurveArrays
+
+        """
+        keyframeTimes = list(attributeCurveData.keys())
+        keyframes = [attributeCurveData[keyframeTime] for keyframeTime in keyframeTimes]
+        return cls(
+            times=[float(keyframeTime) for keyframeTime in keyframeTimes],
+            values=[keyframe.get(exporthandler.attributeValueKey) for keyframe in keyframes],
+            inTangentTypes=[keyframe.get(exporthandler.keyInTangentTypeKey) for keyframe in keyframes],
+            inAngles=[keyframe.get(exporthandler.keyInAngleKey, 0.0) for keyframe in keyframes],
+            inWeights=[keyframe.get(exporthandler.keyInWeightKey, 1.0) for keyframe in keyframes],
+            outTangentTypes=[keyframe.get(exporthandler.keyOutTangentTypeKey) for keyframe in keyframes],
+            outAngles=[keyframe.get(exporthandler.keyOutAngleKey, 0.0) for keyframe in keyframes],
+            outWeights=[keyframe.get(exporthandler.keyOutWeightKey, 1.0) for keyframe in keyframes],
+            weighted=weighted
+        )
+
+    @classmethod
+    def fromColumns(cls, columns, weighted=None):
+        """
+        Builds the arrays from a curve read as columns, see 'exporthandler.readJson', without going through per key
+        dictionaries
+
+        Parameters
+        ----------
+        columns: dict
+        weighted: bool
+
+        Returns
+        -------
+        CurveArrays
+
+        """
+        return cls(
+            times=columns[exporthandler.columnTimesKey],
+            values=columns[exporthandler.columnValuesKey],
+            inTangentTypes=columns[exporthandler.columnInTypeKey],
+            inAngles=columns[exporthandler.columnInAngleKey],
+            inWeights=columns[exporthandler.columnInWeightKey],
+            outTangentTypes=columns[exporthandler.columnOutTypeKey],
+            outAngles=columns[exporthandler.columnOutAngleKey],
+            outWeights=columns[exporthandler.columnOutWeightKey],
+            weighted=weighted
+        )
+
+    def toKeyframeData(self):
+        """
+        Converts the arrays back to the exported keyframe time to keyframe data layout
+
+        Returns
+        -------
+        dict
+
+        """
+        attributeCurveData = {}
+        for index in range(len(self)):
+            attributeCurveData[float(self.times[index])] = {
+                exporthandler.attributeValueKey: float(self.values[index]),
+                exporthandler.keyInTangentTypeKey: self.inTangentTypes[index],
+                exporthandler.keyInAngleKey: float(self.inAngles[index]),
+                exporthandler.keyInWeightKey: float(self.inWeights[index]),
+                exporthandler.keyOutTangentTypeKey: self.outTangentTypes[index],
+                exporthandler.keyOutAngleKey: float(self.outAngles[index]),
+                exporthandler.keyOutWeightKey: float(self.outWeights[index]),
+            }
+        return attributeCurveData
+
+
+def loadCurveArrays(filepath, clip=None):
+    """
+    Reads an exported animation file into curve arrays
+
+    Parameters
+    ----------
+    filepath: str
+    clip: str
+        Clip section to read, required for multi-clip files, see 'exporthandler.clipCurveData'
+
+    Returns
+    -------
+    dict
+        Attribute name to CurveArrays
+
+    """
+    animationCurveData = exporthandler.clipCurveData(filepath, exporthandler.readJson(filepath, columnar=True), clip=clip)
+    return {attr: CurveArrays.fromColumns(columns) for attr, columns in animationCurveData.items()}
+
+def _tangentOffsets(angles, weights, frameSeconds, weighted):
+    """
+    Gets the time (frames) and value offsets from a key to its bezier control point
+    """
+    radians = np.radians(angles)
+    if weighted:
+        timeOffsets = weights * np.cos(radians) / (3.0 * frameSeconds)
+        valueOffsets = weights * np.sin(radians) / 3.0
+        return timeOffsets, valueOffsets
+    return None, np.tan(radians) * frameSeconds
+
+def _solveBezierParameter(sampleTimes, t0, t1, t2, t3):
+    """
+    Finds the bezier parameter whose time matches each sample time, with newton steps kept inside a bisection bracket.
+    Control points clamped onto a key leave the time flat there, where newton stalls and bisection has to converge, so
+    the solve runs until every parameter settled instead of a fixed number of steps
+    """
+    a = t3 - 3.0 * t2 + 3.0 * t1 - t0
+    b = 3.0 * t2 - 6.0 * t1 + 3.0 * t0
+    c = 3.0 * t1 - 3.0 * t0
+    d = t0 - sampleTimes
+
+    span = t3 - t0
+    parameter = np.where(span > 0, (sampleTimes - t0) / np.where(span > 0, span, 1.0), 0.0)
+    low = np.zeros_like(parameter)
+    high = np.ones_like(parameter)
+    for _ in range(_maxBezierIterations):
+        error = ((a * parameter + b) * parameter + c) * parameter + d
+        low = np.where(error < 0, parameter, low)
+        high = np.where(error > 0, parameter, high)
+        derivative = (3.0 * a * parameter + 2.0 * b) * parameter + c
+        safeDerivative = np.where(derivative != 0, derivative, 1.0)
+        newton = parameter - error / safeDerivative
+        useNewton = (derivative != 0) & (newton > low) & (newton < high)
+        nextParameter = np.where(error == 0, parameter, np.where(useNewton, newton, 0.5 * (low + high)))
+        settled = (np.abs(nextParameter - parameter) <= _bezierParameterTolerance) | (high - low <= _bezierParameterTolerance)
+        parameter = nextParameter
+        if np.all(settled):
+            break
+    return parameter
+
+def evaluateCurve(curve, sampleTimes, frameSeconds=1.0 / 24.0):
+    """
+    Evaluates the curve at every sample time in one vectorized pass
+
+    Parameters
+    ----------
+    curve: CurveArrays
+    sampleTimes: numpy.ndarray
+        Frames to evaluate at, in any order
+    frameSeconds: float
+        Length of a frame in seconds, used to convert the per second tangents
+
+    Returns
+    -------
+    numpy.ndarray
+        The curve value at every sample time
+
+    """
+    sampleTimes = np.asarray(sampleTimes, dtype=np.float64)
+    keyCount = len(curve)
+    if keyCount == 0:
+        return np.zeros_like(sampleTimes)
+    if keyCount == 1:
+        return np.full_like(sampleTimes, curve.values[0])
+
+    times = curve.times
+    values = curve.values
+
+    # segment i runs from key i to key i+1, samples outside the keyed range hold the end values
+    segment = np.clip(np.searchsorted(times, sampleTimes, side="right") - 1, 0, keyCount - 2)
+    t0 = times[segment]
+    t3 = times[segment + 1]
+    v0 = values[segment]
+    v3 = values[segment + 1]
+    span = t3 - t0
+
+    outTimeOffsets, outValueOffsets = _tangentOffsets(curve.outAngles, curve.outWeights, frameSeconds, curve.weighted)
+    inTimeOffsets, inValueOffsets = _tangentOffsets(curve.inAngles, curve.inWeights, frameSeconds, curve.weighted)
+
+    if curve.weighted:
+        # control points are kept inside the segment so time stays monotonic
+        t1 = np.minimum(t0 + outTimeOffsets[segment], t3)
+        t2 = np.maximum(t3 - inTimeOffsets[segment + 1], t0)
+        v1 = v0 + outValueOffsets[segment]
+        v2 = v3 - inValueOffsets[segment + 1]
+        parameter = _solveBezierParameter(sampleTimes, t0, t1, t2, t3)
+    else:
+        v1 = v0 + outValueOffsets[segment] * span / 3.0
+        v2 = v3 - inValueOffsets[segment + 1] * span / 3.0
+        parameter = np.where(span > 0, (sampleTimes - t0) / np.where(span > 0, span, 1.0), 0.0)
+
+    parameter = np.clip(parameter, 0.0, 1.0)
+    inverse = 1.0 - parameter
+    result = (
+        inverse * inverse * inverse * v0
+        + 3.0 * inverse * inverse * parameter * v1
+        + 3.0 * inverse * parameter * parameter * v2
+        + parameter * parameter * parameter * v3
+    )
+
+    outTypes = curve.outTangentTypes[segment]
+    result = np.where(outTypes == stepTangentType, v0, result)
+    result = np.where(outTypes == stepNextTangentType, np.where(sampleTimes > t0, v3, v0), result)
+
+    result = np.where(sampleTimes <= times[0], values[0], result)
+    result = np.where(sampleTimes >= times[-1], values[-1], result)
+    return result
+
+def evaluateCurves(curves, sampleTimes, frameSeconds=1.0 / 24.0):
+    """
+    Evaluates every curve at the same sample times
+
+    Parameters
+    ----------
+    curves: dict
+        Attribute name to CurveArrays
+    sampleTimes: numpy.ndarray
+    frameSeconds: float
+
+    Returns
+    -------
+    dict
+        Attribute name to evaluated values
+
+    """
+    sampleTimes = np.asarray(sampleTimes, dtype=np.float64)
+    return {attr: evaluateCurve(curve, sampleTimes, frameSeconds) for attr, curve in curves.items()}
+
+def evaluateFile(filepath, sampleTimes, fps=24.0, clip=None):
+    """
+    Evaluates every curve of an exported animation file
+
+    Parameters
+    ----------
+    filepath: str
+    sampleTimes: numpy.ndarray
+        Frames to evaluate at
+    fps: float
+        Frame rate the file was exported at
+    clip: str
+        Clip section to evaluate, required for multi-clip files
+
+    Returns
+    -------
+    dict
+        Attribute name to evaluated values
+
+    """
+    return evaluateCurves(loadCurveArrays(filepath, clip=clip), sampleTimes, 1.0 / fps)
+
+def sampleCurvesUniform(curves, frameSeconds=1.0 / 24.0, samplesPerFrame=4.0, maxSamples=20000):
+    """
+    Evaluates every curve on one shared, evenly spaced grid covering all of their keys, e.g. for drawing them
+
+    Parameters
+    ----------
+    curves: list[CurveArrays]
+    frameSeconds: float
+    samplesPerFrame: float
+    maxSamples: int
+        Upper limit of samples per curve, long curves are sampled more coarsely
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        The sample times, and a curves by samples array of values
+
+    """
+    curves = [curve for curve in curves if len(curve)]
+    if not curves:
+        return np.zeros(0), np.zeros((0, 0))
+    startTime = min(float(curve.times[0]) for curve in curves)
+    endTime = max(float(curve.times[-1]) for curve in curves)
+    sampleCount = int(min(max((endTime - startTime) * samplesPerFrame, 1), maxSamples - 1)) + 1
+    sampleTimes = np.linspace(startTime, endTime, sampleCount)
+    values = np.empty((len(curves), sampleCount), dtype=np.float64)
+    for index, curve in enumerate(curves):
+        values[index] = evaluateCurve(curve, sampleTimes, frameSeconds)
+    return sampleTimes, values
+
+def downsampleMinMax(sampleTimes, values, startTime, endTime, columns):
+    """
+    Reduces sampled curves to at most two points per column of the visible time range, the minimum and maximum of
+    the samples in it, so drawing stays proportional to the pixel width however dense the curves are. Spikes are
+    never lost, unlike with plain decimation
+
+    Parameters
+    ----------
+    sampleTimes: numpy.ndarray
+        Evenly spaced, ascending sample times
+    values: numpy.ndarray
+        Curves by samples
+    startTime: float
+        First visible time
+    endTime: float
+        Last visible time
+    columns: int
+        Pixel width of the visible range
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        The point times, and a curves by points array of values
+
+    """
+    # one sample past each end so the lines run on to the edges
+    first = max(int(np.searchsorted(sampleTimes, startTime, side="right")) - 1, 0)
+    last = min(int(np.searchsorted(sampleTimes, endTime, side="left")) + 1, len(sampleTimes) - 1)
+    if last < first:
+        return np.zeros(0), np.zeros((len(values), 0))
+
+    visibleTimes = sampleTimes[first:last + 1]
+    visibleValues = values[:, first:last + 1]
+    columns = max(int(columns), 1)
+    if len(visibleTimes) <= 2 * columns:
+        return visibleTimes, visibleValues
+
+    binStarts = np.unique(np.linspace(0, len(visibleTimes), columns, endpoint=False).astype(np.int64))
+    minima = np.minimum.reduceat(visibleValues, binStarts, axis=1)
+    maxima = np.maximum.reduceat(visibleValues, binStarts, axis=1)
+
+    pointTimes = np.repeat(visibleTimes[binStarts], 2)
+    pointValues = np.empty((len(values), 2 * len(binStarts)), dtype=np.float64)
+    pointValues[:, 0::2] = minima
+    pointValues[:, 1::2] = maxima
+    return pointTimes, pointValues
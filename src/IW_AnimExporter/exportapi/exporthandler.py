@@ -1,10 +1,28 @@
-import json
+import os, io, re, sys, json, math, pickle, bisect, hashlib, tempfile, itertools, functools, contextlib, collections, concurrent.futures
 
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-import maya.cmds as cmds
+try:
+    import maya.cmds as cmds
+    import maya.api.OpenMaya as om
+except ImportError:
+    # Reading and writing animation files also works outside of Maya, e.g. for the curve evaluator
+    cmds = om = None
+
+from . import telemetry, libraryindex, profiling
+
+# counts the commands of running telemetry jobs
+cmds = telemetry.countingCommands(cmds)
+
+# region Local Imports
+parentPackageDir = os.path.dirname(os.path.dirname(__file__))
+if parentPackageDir not in sys.path:
+    sys.path.append(parentPackageDir)
+
+import resources
+# endregion
 
 
 # region KEYS
@@ -21,6 +39,65 @@ keyOutWeightKey        = "outWeight"
 # endregion
 
 
+class QueryCache(object):
+
+    def __init__(self):
+        """
+        Memoizes maya query results for the duration of one export or import job. Create one per job and let it go
+        afterwards, it is never invalidated while it lives
+        """
+        super().__init__()
+        self._keyableAttributes = {}
+        self._animCurveAttributes = {}
+        self._keyTimes = {}
+
+    def keyableAttributes(self, objectName):
+        if objectName not in self._keyableAttributes:
+            self._keyableAttributes[objectName] = cmds.listAttr(objectName, keyable=True) or []
+        return self._keyableAttributes[objectName]
+
+    def animCurveAttributes(self, objectName):
+        """
+        Gets the object's keyed attributes. Attributes driven directly by an animCurve are found with a single query for
+        the whole object, when some of the object's curves reach it through pairBlend, animLayer or character set nodes
+        the remaining keyable attributes are checked one by one as before
+        """
+        if objectName not in self._animCurveAttributes:
+            connections = cmds.listConnections(
+                objectName,
+                type="animCurve",
+                source=True,
+                destination=False,
+                connections=True,
+                plugs=False
+            ) or []
+            # connections alternate between the object's plug and the animCurve node connected to it
+            attributes = {plug.split(".", 1)[1] for plug in connections[0::2]}
+            objectCurves = cmds.keyframe(objectName, query=True, name=True) or []
+            if set(objectCurves) - set(connections[1::2]):
+                attributes.update(
+                    attr for attr in self.keyableAttributes(objectName)
+                    if attr not in attributes and cmds.keyframe(objectName, attribute=attr, query=True, keyframeCount=True) > 0
+                )
+            self._animCurveAttributes[objectName] = attributes
+        return self._animCurveAttributes[objectName]
+
+    def keyTimes(self, objectName, attribute):
+        _key = (objectName, attribute)
+        if _key not in self._keyTimes:
+            self._keyTimes[_key] = cmds.keyframe(objectName, attribute=attribute, query=True) or []
+        return self._keyTimes[_key]
+
+    def keyCount(self, objectName, attribute):
+        # the key times are needed right after the count anyway, so a single query serves both
+        return len(self.keyTimes(objectName, attribute))
+
+    def clear(self):
+        self._keyableAttributes.clear()
+        self._animCurveAttributes.clear()
+        self._keyTimes.clear()
+
+
 def getAnimatedSceneObjects():
     """
     Gets animated object names in current scene
@@ -31,8 +108,9 @@ def getAnimatedSceneObjects():
         The animated object names in the current scene
 
     """
-    objects = cmds.ls(transforms=True, objectsOnly=True)
-    animatedObjects = [object for object in objects if cmds.keyframe(object, query=True, keyframeCount=True) > 0]
+    with telemetry.phase("discovery"):
+        objects = cmds.ls(transforms=True, objectsOnly=True)
+        animatedObjects = [object for object in objects if cmds.keyframe(object, query=True, keyframeCount=True) > 0]
     return animatedObjects
 
 def getAnimatableSceneObjects():
@@ -45,8 +123,9 @@ def getAnimatableSceneObjects():
         The animatable object names in the current scene
 
     """
-    objects = cmds.ls(transforms=True, objectsOnly=True)
-    animatedObjects = [object for object in objects if len(cmds.listAnimatable(object)) > 0]
+    with telemetry.phase("discovery"):
+        objects = cmds.ls(transforms=True, objectsOnly=True)
+        animatedObjects = [object for object in objects if len(cmds.listAnimatable(object)) > 0]
     return animatedObjects
 
 def isAnimatedAttribute(attribute):
@@ -65,7 +144,7 @@ def isAnimatedAttribute(attribute):
     """
     return cmds.keyframe(attribute, query=True, keyframeCount=True) > 0
 
-def getAnimatedObjectAttributes(objectName):
+def getAnimatedObjectAttributes(objectName, queryCache=None):
     """
     Gets attributes for the given object that are aniamted
 
@@ -73,6 +152,8 @@ def getAnimatedObjectAttributes(objectName):
     ----------
     objectName: str
         Object to get animated attributes of
+    queryCache: QueryCache
+        Job cache to read and store the queries in
 
     Returns
     -------
@@ -80,8 +161,15 @@ def getAnimatedObjectAttributes(objectName):
         Attributes for the object that are animated
 
     """
-    objectKeyableAttributes = cmds.listAttr(objectName, keyable=True)
-    animatedAttributes = [attr for attr in objectKeyableAttributes if cmds.keyframe(objectName, attribute=attr, query=True, keyframeCount=True) > 0]
+    if queryCache is None:
+        queryCache = QueryCache()
+
+    with telemetry.phase("attributeQuery"):
+        # three queries per object however many attributes it has unless its curves are blended, kept in keyable
+        # attribute order
+        objectKeyableAttributes = queryCache.keyableAttributes(objectName)
+        animCurveAttributes = queryCache.animCurveAttributes(objectName)
+        animatedAttributes = [attr for attr in objectKeyableAttributes if attr in animCurveAttributes]
     return animatedAttributes
 
 def getKeyframeCurveData(objectName, keyframeTime, attribute):
@@ -124,112 +212,2567 @@ def getKeyframeCurveData(objectName, keyframeTime, attribute):
 
     return returnDict
 
-def getAttributeAnimationData(objectName, attribute, startFrame=None, endFrame=None):
+def getAttributeAnimationData(objectName, attribute, startFrame=None, endFrame=None, queryCache=None):
     """
 
     Parameters
     ----------
     objectName
     attribute
+    queryCache: QueryCache
+        Job cache to read and store the key time query in
+
+    Returns
+    -------
+    dict
+
+    """
+    attributeCurveData = {}
+    if queryCache is None:
+        queryCache = QueryCache()
+
+    with telemetry.phase("curveRead"):
+        # get attr keyframes
+        keyframeTimes = queryCache.keyTimes(objectName, attribute)
+
+
+        for keyframeTime in keyframeTimes:
+            if startFrame != None and keyframeTime < float(startFrame):
+                continue
+            if endFrame != None and keyframeTime > float(endFrame):
+                continue
+
+            # get curve data
+            curveData = getKeyframeCurveData(
+                objectName=objectName,
+                attribute=attribute,
+                keyframeTime=(keyframeTime, keyframeTime)
+            )
+
+            attributeCurveData[keyframeTime] = curveData
+
+    telemetry.addKeys(len(attributeCurveData))
+    return attributeCurveData
+
+
+@contextlib.contextmanager
+def suspendedSceneUpdates(chunkName="animCurveImport", undoChunk=True, disableUndo=False, suspendRefresh=True, suspendEvaluation=True):
+    """
+    Batches scene edits made inside the context. Everything that is changed is restored on exit, even when the
+    edits raise
+
+    Parameters
+    ----------
+    chunkName: str
+        Name of the undo chunk
+    undoChunk: bool
+        Whether to wrap the edits in a single undo chunk, so undoing them is one step
+    disableUndo: bool
+        Whether to turn the undo queue off entirely. Takes precedence over 'undoChunk'
+    suspendRefresh: bool
+        Whether to suspend viewport refreshes
+    suspendEvaluation: bool
+        Whether to turn the evaluation manager off
+
+    """
+    restoreStack = contextlib.ExitStack()
+    with restoreStack:
+        if disableUndo:
+            if cmds.undoInfo(query=True, state=True):
+                cmds.undoInfo(stateWithoutFlush=False)
+                restoreStack.callback(cmds.undoInfo, stateWithoutFlush=True)
+        elif undoChunk:
+            cmds.undoInfo(openChunk=True, chunkName=chunkName)
+            restoreStack.callback(cmds.undoInfo, closeChunk=True)
+
+        if suspendRefresh and not cmds.refresh(query=True, suspend=True):
+            cmds.refresh(suspend=True)
+            restoreStack.callback(cmds.refresh, suspend=False)
+
+        if suspendEvaluation:
+            evaluationMode = cmds.evaluationManager(query=True, mode=True)[0]
+            if evaluationMode != "off":
+                cmds.evaluationManager(mode="off")
+                restoreStack.callback(cmds.evaluationManager, mode=evaluationMode)
+
+        yield
+
+# region BAKE
+
+bakedTangentType = "linear"
+
+
+def secondsPerFrame():
+    """
+    The length of one frame in the current scene time unit
+
+    Returns
+    -------
+    float
+
+    """
+    return om.MTime(1.0, om.MTime.uiUnit()).asUnits(om.MTime.kSeconds)
+
+def getSampleTimes(startFrame, endFrame, step=1.0):
+    """
+    Gets evenly spaced sample times from start to end frame, including the end frame
+
+    Parameters
+    ----------
+    startFrame: float
+    endFrame: float
+    step: float
+        Frames between samples
+
+    Returns
+    -------
+    list[float]
+
+    """
+    if step <= 0:
+        raise ValueError(f"Sample step must be positive, got {step}")
+    startFrame = float(startFrame)
+    endFrame = float(endFrame)
+    sampleCount = int(math.floor((endFrame - startFrame) / step + 1e-6)) + 1
+    return [startFrame + index * step for index in range(max(sampleCount, 0))]
+
+def _plugValueReader(plug):
+    """
+    Builds a callable returning the plug's current value in UI units, matching what 'getAttr' returns
+    """
+    attribute = plug.attribute()
+    if attribute.hasFn(om.MFn.kUnitAttribute):
+        unitType = om.MFnUnitAttribute(attribute).unitType()
+        if unitType == om.MFnUnitAttribute.kAngle:
+            return lambda: plug.asMAngle().asUnits(om.MAngle.uiUnit())
+        if unitType == om.MFnUnitAttribute.kDistance:
+            return lambda: plug.asMDistance().asUnits(om.MDistance.uiUnit())
+        if unitType == om.MFnUnitAttribute.kTime:
+            return lambda: plug.asMTime().asUnits(om.MTime.uiUnit())
+    return plug.asDouble
+
+def sampleObjectAttributes(objectName, attributes, sampleTimes):
+    """
+    Evaluates every attribute at every sample time. The scene time is changed once per sample and all attributes are
+    read through their plugs in the same pass, then the original time is restored
+
+    Parameters
+    ----------
+    objectName: str
+        Object to sample
+    attributes: list[str]
+        Attributes to sample
+    sampleTimes: list[float]
+        Frames to sample at
+
+    Returns
+    -------
+    dict
+        Attribute name to a list of values, one per sample time
+
+    """
+    selectionList = om.MSelectionList()
+    for attr in attributes:
+        selectionList.add(f"{objectName}.{attr}")
+    readers = [_plugValueReader(selectionList.getPlug(index)) for index in range(len(attributes))]
+
+    samples = [[] for _ in attributes]
+    originalTime = cmds.currentTime(query=True)
+    with telemetry.phase("curveRead"), suspendedSceneUpdates(undoChunk=False, suspendEvaluation=False):
+        try:
+            for sampleTime in sampleTimes:
+                cmds.currentTime(sampleTime, update=True)
+                for attributeSamples, reader in zip(samples, readers):
+                    attributeSamples.append(reader())
+        finally:
+            cmds.currentTime(originalTime, update=True)
+
+    telemetry.addKeys(len(sampleTimes) * len(attributes))
+    return dict(zip(attributes, samples))
+
+def _linearTangentAngle(deltaValue, deltaTime, frameSeconds):
+    if deltaTime == 0:
+        return 0.0
+    return math.degrees(math.atan(deltaValue / (deltaTime * frameSeconds)))
+
+def setLinearTangentAngles(attributeCurveData, frameSeconds):
+    """
+    Recomputes the tangent angles of linear keys from their neighbouring keys, in place
+
+    Parameters
+    ----------
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+    frameSeconds: float
+        Result of 'secondsPerFrame'
+
+    """
+    keyframeTimes = sorted(attributeCurveData, key=float)
+    for index, keyframeTime in enumerate(keyframeTimes):
+        keyframeData = attributeCurveData[keyframeTime]
+        if index > 0 and keyframeData.get(keyInTangentTypeKey) == bakedTangentType:
+            previousTime = keyframeTimes[index - 1]
+            keyframeData[keyInAngleKey] = _linearTangentAngle(
+                keyframeData[attributeValueKey] - attributeCurveData[previousTime][attributeValueKey],
+                float(keyframeTime) - float(previousTime),
+                frameSeconds
+            )
+        if index < len(keyframeTimes) - 1 and keyframeData.get(keyOutTangentTypeKey) == bakedTangentType:
+            nextTime = keyframeTimes[index + 1]
+            keyframeData[keyOutAngleKey] = _linearTangentAngle(
+                attributeCurveData[nextTime][attributeValueKey] - keyframeData[attributeValueKey],
+                float(nextTime) - float(keyframeTime),
+                frameSeconds
+            )
+
+def buildDenseCurveData(sampleTimes, values, frameSeconds):
+    """
+    Builds keyframe data with a linear key on every sample
+
+    Parameters
+    ----------
+    sampleTimes: list[float]
+    values: list[float]
+    frameSeconds: float
+        Result of 'secondsPerFrame'
 
     Returns
     -------
     dict
+        Keyframe time to keyframe data
 
     """
     attributeCurveData = {}
+    for sampleTime, value in zip(sampleTimes, values):
+        attributeCurveData[sampleTime] = {
+            attributeValueKey: value,
+            keyInTangentTypeKey: bakedTangentType,
+            keyInAngleKey: 0.0,
+            keyInWeightKey: 1.0,
+            keyOutTangentTypeKey: bakedTangentType,
+            keyOutAngleKey: 0.0,
+            keyOutWeightKey: 1.0,
+        }
+    setLinearTangentAngles(attributeCurveData, frameSeconds)
+    return attributeCurveData
+
+def getBakedAnimationData(objectName, attributes, startFrame, endFrame, step=1.0):
+    """
+    Samples the given attributes across the frame range and returns them as dense linear curves, so that driven,
+    constrained, or expression controlled attributes can be exported like keyed ones
+
+    Parameters
+    ----------
+    objectName: str
+    attributes: list[str]
+    startFrame: float
+    endFrame: float
+    step: float
+        Frames between baked keys
+
+    Returns
+    -------
+    dict
+        Attribute name to keyframe time to keyframe data
+
+    """
+    sampleTimes = getSampleTimes(startFrame, endFrame, step)
+    frameSeconds = secondsPerFrame()
+    sampledValues = sampleObjectAttributes(objectName, attributes, sampleTimes)
+    return {attr: buildDenseCurveData(sampleTimes, values, frameSeconds) for attr, values in sampledValues.items()}
+
+def reduceCurveKeys(attributeCurveData, tolerance=0.0001, frameSeconds=None):
+    """
+    Removes linear keys that the straight line between their kept neighbours already reproduces within the tolerance.
+    Keys with any other tangent type are always kept
+
+    Parameters
+    ----------
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+    tolerance: float
+        Largest allowed value difference for a removed key
+    frameSeconds: float
+        Result of 'secondsPerFrame', queried from the scene when not given
+
+    Returns
+    -------
+    dict
+        The reduced keyframe time to keyframe data
 
-    # get attr keyframes
-    keyframeTimes = cmds.keyframe(objectName, attribute=attribute, query=True)
+    """
+    keyframeTimes = sorted(attributeCurveData, key=float)
+    if len(keyframeTimes) < 3:
+        return dict(attributeCurveData)
 
+    def isLinearKey(keyframeTime):
+        keyframeData = attributeCurveData[keyframeTime]
+        return keyframeData.get(keyInTangentTypeKey) == bakedTangentType and keyframeData.get(keyOutTangentTypeKey) == bakedTangentType
 
-    for keyframeTime in keyframeTimes:
-        if startFrame != None and keyframeTime < float(startFrame):
+    keptTimes = [keyframeTimes[0]]
+    anchorIndex = 0
+    for index in range(1, len(keyframeTimes) - 1):
+        keyframeTime = keyframeTimes[index]
+        if not isLinearKey(keyframeTime):
+            keptTimes.append(keyframeTime)
+            anchorIndex = index
             continue
-        if endFrame != None and keyframeTime > float(endFrame):
+
+        anchorTime = keyframeTimes[anchorIndex]
+        nextTime = keyframeTimes[index + 1]
+        anchorValue = attributeCurveData[anchorTime][attributeValueKey]
+        nextValue = attributeCurveData[nextTime][attributeValueKey]
+
+        # every key skipped since the anchor must still lie on the line from the anchor to the next key
+        span = float(nextTime) - float(anchorTime)
+        for candidateTime in keyframeTimes[anchorIndex + 1:index + 1]:
+            weight = (float(candidateTime) - float(anchorTime)) / span
+            interpolated = anchorValue + (nextValue - anchorValue) * weight
+            if abs(attributeCurveData[candidateTime][attributeValueKey] - interpolated) > tolerance:
+                keptTimes.append(keyframeTime)
+                anchorIndex = index
+                break
+    keptTimes.append(keyframeTimes[-1])
+
+    reducedCurveData = {keyframeTime: dict(attributeCurveData[keyframeTime]) for keyframeTime in keptTimes}
+    if frameSeconds is None:
+        frameSeconds = secondsPerFrame()
+    setLinearTangentAngles(reducedCurveData, frameSeconds)
+    return reducedCurveData
+
+# endregion
+
+# region CLIPS
+
+clipNameKey = "name"
+clipStartKey = "start"
+clipEndKey = "end"
+# clip lists typed into the interface, e.g. 'walk: 0-30, run: 31-60'
+clipListSeparator = ","
+_clipListEntry = re.compile(r"^\s*([^:]+?)\s*:\s*(-?\d+(?:\.\d*)?)\s*-\s*(-?\d+(?:\.\d*)?)\s*$")
+
+
+def sliceCurveData(attributeCurveData, keyframeTimes, startFrame, endFrame, rebase=False):
+    """
+    Gets the keys of a curve within a frame range
+
+    Parameters
+    ----------
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+    keyframeTimes: list[float]
+        The curve's keyframe times, sorted
+    startFrame: float
+    endFrame: float
+    rebase: bool
+        Whether to move the keys so the range starts at frame 0
+
+    Returns
+    -------
+    dict
+        Keyframe time to keyframe data for the keys in the range
+
+    """
+    startIndex = bisect.bisect_left(keyframeTimes, float(startFrame))
+    endIndex = bisect.bisect_right(keyframeTimes, float(endFrame))
+    offset = float(startFrame) if rebase else 0.0
+    return {keyframeTime - offset: attributeCurveData[keyframeTime] for keyframeTime in keyframeTimes[startIndex:endIndex]}
+
+def sliceClips(animationCurveData, clips, rebase=False):
+    """
+    Splits every curve into the given clips, sorting each curve's times once
+
+    Parameters
+    ----------
+    animationCurveData: dict
+        Attribute name to keyframe time to keyframe data, keyed by float times
+    clips: list[dict]
+        Clips with a 'name', 'start' and 'end'
+    rebase: bool
+        Whether every clip should start at frame 0
+
+    Returns
+    -------
+    dict
+        Clip name to attribute name to keyframe time to keyframe data
+
+    """
+    clipCurveData = {clip[clipNameKey]: {} for clip in clips}
+    for attr, attributeCurveData in animationCurveData.items():
+        keyframeTimes = sorted(attributeCurveData)
+        for clip in clips:
+            clipCurveData[clip[clipNameKey]][attr] = sliceCurveData(
+                attributeCurveData,
+                keyframeTimes,
+                clip[clipStartKey],
+                clip[clipEndKey],
+                rebase=rebase
+            )
+    return clipCurveData
+
+def clipFilepath(filepath, clipName):
+    _compressionExt = compressionExtension(filepath) or ""
+    _root, _ext = os.path.splitext(filepath[:len(filepath) - len(_compressionExt)])
+    return f"{_root}_{clipName}{_ext}{_compressionExt}"
+
+def parseClipList(text):
+    """
+    Reads a typed clip list of 'name: start-end' entries, e.g. 'walk: 0-30, run: 31-60'
+
+    Parameters
+    ----------
+    text: str
+
+    Returns
+    -------
+    list[dict]
+        Clips with a 'name', 'start' and 'end', none for an empty or missing list
+
+    Raises
+    ------
+    ValueError
+        When an entry is not of the 'name: start-end' form or ends before it starts
+
+    """
+    clips = []
+    for entry in (text or "").split(clipListSeparator):
+        if not entry.strip():
             continue
+        match = _clipListEntry.match(entry)
+        if match is None:
+            raise ValueError(f"Clip '{entry.strip()}' is not of the form 'name: start-end'")
+        clip = {clipNameKey: match.group(1), clipStartKey: float(match.group(2)), clipEndKey: float(match.group(3))}
+        if clip[clipEndKey] < clip[clipStartKey]:
+            raise ValueError(f"Clip '{clip[clipNameKey]}' ends before it starts")
+        clips.append(clip)
+    return clips
+
+# endregion
+
+# region APPLY
+
+def applyAttributeCurveData(objectName, attribute, attributeCurveData, keyframeOffset=0):
+    """
+    Sets the keys of a single exported curve on the given object attribute
+
+    Parameters
+    ----------
+    objectName: str
+    attribute: str
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+    keyframeOffset: float
+        Frames to offset every key by
 
-        # get curve data
-        curveData = getKeyframeCurveData(
-            objectName=objectName,
+    """
+    telemetry.addKeys(len(attributeCurveData))
+    for keyframeTime, keyframeData in attributeCurveData.items():
+        attrValue = keyframeData.get(attributeValueKey)
+        keyframeTime = float(keyframeTime) + float(keyframeOffset)
+        cmds.setKeyframe(objectName, attribute=attribute, value=attrValue, time=keyframeTime)
+        cmds.keyTangent(
+            objectName,
             attribute=attribute,
-            keyframeTime=(keyframeTime, keyframeTime)
+            time=(keyframeTime, keyframeTime),
+            inTangentType=keyframeData.get(keyInTangentTypeKey),
+            inAngle=keyframeData.get(keyInAngleKey),
+            inWeight=keyframeData.get(keyInWeightKey),
+            outTangentType=keyframeData.get(keyOutTangentTypeKey),
+            outAngle=keyframeData.get(keyOutAngleKey),
+            outWeight=keyframeData.get(keyOutWeightKey)
         )
 
-        attributeCurveData[keyframeTime] = curveData
+def selectedCurveData(objectName, animationCurveData, attributes=None):
+    """
+    Gets the curves of the attributes explicitly picked for import, or every curve when none were picked. The file's
+    curves left out are logged, as the picked attributes only offer channels already animated on the target
 
-    return attributeCurveData
+    Parameters
+    ----------
+    objectName: str
+    animationCurveData: dict
+        Attribute name to keyframe time to keyframe data
+    attributes: list[str]
+        Attributes picked for import, an empty selection picks every attribute
 
+    Returns
+    -------
+    dict
 
+    """
+    if not attributes:
+        return animationCurveData
+    skipped = [attr for attr in animationCurveData if attr not in attributes]
+    if skipped:
+        logger.info(f"Skipping {len(skipped)} curves not picked for {objectName}: {', '.join(skipped)}")
+    return {attr: attributeCurveData for attr, attributeCurveData in animationCurveData.items() if attr in attributes}
 
-def writeJson(filepath, data):
-    with open(filepath, "w") as file:
-        data = json.dumps(data, indent=4)
-        file.write(data)
+def applyCurveData(objectName, animationCurveData, keyframeOffset=0, attributes=None):
+    """
+    Sets the keys of every exported curve on the given object
 
-def readJson(filepath):
-    with open(filepath, "r") as file:
-        data = json.load(file)
-        return data
+    Parameters
+    ----------
+    objectName: str
+    animationCurveData: dict
+        Attribute name to keyframe time to keyframe data
+    keyframeOffset: float
+        Frames to offset every key by
+    attributes: list[str]
+        Attributes to apply, an empty selection applies every attribute
 
-class AnimationPort(object):
+    """
+    with telemetry.phase("apply"):
+        for attr, attributeCurveData in selectedCurveData(objectName, animationCurveData, attributes).items():
+            applyAttributeCurveData(objectName, attr, attributeCurveData, keyframeOffset)
+
+# endregion
+
+
+# region IMPORT PLAN
+
+#   Instead of setting every key of a file, an import first reads the target's existing curves once and only edits
+#   what differs. Existing keys inside the file's time range that the file does not have are removed with a single
+#   cutKey over the range spanning them, file keys inside that range are set again afterwards.
+
+planTimeTolerance = 1e-6
+planValueTolerance = 1e-6
+
+# tangent types whose angle maya recomputes from the neighbouring keys
+_neighbourDependentTangentTypes = {"auto", "spline", "clamped", "plateau"}
+
+
+class AttributeImportPlan(object):
+
+    def __init__(self, attribute):
+        """
+        The scene edits needed to make one target curve match an imported curve
+
+        Parameters
+        ----------
+        attribute: str
+        """
+        super().__init__()
+        self.attribute = attribute
+        self.addKeys = {}
+        self.changeKeys = {}
+        self.cutRange = None
+        self.unchangedKeys = 0
+
+    def setKeys(self):
+        setKeys = dict(self.changeKeys)
+        setKeys.update(self.addKeys)
+        return setKeys
+
+    def isEmpty(self):
+        return not self.addKeys and not self.changeKeys and self.cutRange is None
+
+
+class ImportPlan(object):
 
     def __init__(self, objectName):
         """
-        Facilitates the importing and exporting of animation curves for the provided object
+        The scene edits of a whole import, per attribute
 
         Parameters
         ----------
         objectName: str
-            The unique name for the target object
         """
         super().__init__()
-        self._targetObject = objectName
+        self.objectName = objectName
+        self.attributePlans = []
 
-    def targetObject(self):
-        return self._targetObject
+    def editCount(self):
+        """
+        Gets the number of keys set plus the number of cutKey calls the plan will run
+        """
+        return sum(len(plan.addKeys) + len(plan.changeKeys) + (plan.cutRange is not None) for plan in self.attributePlans)
 
-    def setTargetObject(self, objectName):
-        self._targetObject = objectName
+    def summary(self):
+        return {
+            "added": sum(len(plan.addKeys) for plan in self.attributePlans),
+            "changed": sum(len(plan.changeKeys) for plan in self.attributePlans),
+            "cut": sum(plan.cutRange is not None for plan in self.attributePlans),
+            "unchanged": sum(plan.unchangedKeys for plan in self.attributePlans),
+        }
 
-    def exportCurveData(self, filepath, startFrame=None, endFrame=None, attributes=None):
-        animatedAttributes = getAnimatedObjectAttributes(self.targetObject())
 
-        if attributes is None:
-            attributes = animatedAttributes
+def readTargetCurve(objectName, attribute):
+    """
+    Reads every key of an attribute's curve with one query per key field instead of one per key
 
-        animationCurveData = {}
-        for attr in attributes:
-            attributeCurveData = getAttributeAnimationData(
-                objectName=self.targetObject(),
-                startFrame=startFrame,
-                endFrame=endFrame,
-                attribute=attr
-            )
-            animationCurveData[attr] = attributeCurveData
+    Parameters
+    ----------
+    objectName: str
+    attribute: str
 
-        writeJson(filepath, animationCurveData)
-        print("\n\nExport Complete\n\n")
+    Returns
+    -------
+    dict
+        Keyframe time to keyframe data, empty when the attribute has no keys
 
-    def importCurveData(self, filepath, keyframeOffset=0, attributes=None):
-        animationCurveData = readJson(filepath)
-        objectName = self.targetObject()
-        for attr, animData in animationCurveData.items():
-            if isinstance(attr, list) and attr not in attributes:
-                continue
-            for keyframeTime, keyframeData in animData.items():
-                attrValue = keyframeData.get(attributeValueKey)
-                keyframeTime = float(keyframeTime) + float(keyframeOffset)
-                cmds.setKeyframe(objectName, attribute=attr, value=attrValue, time=keyframeTime)
-                cmds.keyTangent(
-                    objectName,
-                    attribute=attr,
-                    time=(keyframeTime, keyframeTime),
-                    inTangentType=keyframeData.get(keyInTangentTypeKey),
-                    inAngle=keyframeData.get(keyInAngleKey),
-                    inWeight=keyframeData.get(keyInWeightKey),
-                    outTangentType=keyframeData.get(keyOutTangentTypeKey),
-                    outAngle=keyframeData.get(keyOutAngleKey),
-                    outWeight=keyframeData.get(keyOutWeightKey)
-                )
-        return
\ No newline at end of file
+    """
+    keyframeTimes = cmds.keyframe(objectName, attribute=attribute, query=True, timeChange=True)
+    if not keyframeTimes:
+        return {}
+
+    fieldQueries = [
+        (attributeValueKey,     lambda: cmds.keyframe(objectName, attribute=attribute, query=True, valueChange=True)),
+        (keyInTangentTypeKey,   lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, inTangentType=True)),
+        (keyInAngleKey,         lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, inAngle=True)),
+        (keyInWeightKey,        lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, inWeight=True)),
+        (keyOutTangentTypeKey,  lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, outTangentType=True)),
+        (keyOutAngleKey,        lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, outAngle=True)),
+        (keyOutWeightKey,       lambda: cmds.keyTangent(objectName, attribute=attribute, query=True, outWeight=True)),
+    ]
+    fieldValues = [(field, query() or []) for field, query in fieldQueries]
+
+    targetCurveData = {}
+    for index, keyframeTime in enumerate(keyframeTimes):
+        targetCurveData[keyframeTime] = {field: values[index] if index < len(values) else None for field, values in fieldValues}
+    return targetCurveData
+
+def _timeKey(keyframeTime):
+    return round(float(keyframeTime) / planTimeTolerance)
+
+def _keyframesMatch(keyframeData, targetKeyframeData):
+    for field in (keyInTangentTypeKey, keyOutTangentTypeKey):
+        if keyframeData.get(field) != targetKeyframeData.get(field):
+            return False
+    for field in (attributeValueKey, keyInAngleKey, keyInWeightKey, keyOutAngleKey, keyOutWeightKey):
+        value = keyframeData.get(field)
+        targetValue = targetKeyframeData.get(field)
+        if value is None or targetValue is None:
+            if value != targetValue:
+                return False
+        elif abs(value - targetValue) > planValueTolerance:
+            return False
+    return True
+
+def planAttributeImport(attribute, attributeCurveData, targetCurveData, keyframeOffset=0):
+    """
+    Compares an imported curve to the target's existing curve
+
+    Parameters
+    ----------
+    attribute: str
+    attributeCurveData: dict
+        Imported keyframe time to keyframe data
+    targetCurveData: dict
+        Existing keyframe time to keyframe data, see 'readTargetCurve'
+    keyframeOffset: float
+        Frames to offset every imported key by
+
+    Returns
+    -------
+    AttributeImportPlan
+
+    """
+    plan = AttributeImportPlan(attribute)
+    fileKeys = {}
+    for keyframeTime, keyframeData in attributeCurveData.items():
+        keyframeTime = float(keyframeTime) + float(keyframeOffset)
+        fileKeys[_timeKey(keyframeTime)] = (keyframeTime, keyframeData)
+    if not fileKeys:
+        return plan
+
+    targetKeys = {_timeKey(keyframeTime): (float(keyframeTime), keyframeData) for keyframeTime, keyframeData in targetCurveData.items()}
+    fileStart = min(keyframeTime for keyframeTime, _ in fileKeys.values())
+    fileEnd = max(keyframeTime for keyframeTime, _ in fileKeys.values())
+
+    staleTimes = [
+        keyframeTime for timeKey, (keyframeTime, _) in targetKeys.items()
+        if timeKey not in fileKeys and fileStart <= keyframeTime <= fileEnd
+    ]
+    if staleTimes:
+        plan.cutRange = (min(staleTimes), max(staleTimes))
+
+    for timeKey, (keyframeTime, keyframeData) in sorted(fileKeys.items()):
+        target = targetKeys.get(timeKey)
+        if plan.cutRange is not None and plan.cutRange[0] <= keyframeTime <= plan.cutRange[1]:
+            # cleared by the cut along with the stale keys
+            plan.addKeys[keyframeTime] = keyframeData
+        elif target is None:
+            plan.addKeys[keyframeTime] = keyframeData
+        elif not _keyframesMatch(keyframeData, target[1]):
+            plan.changeKeys[keyframeTime] = keyframeData
+
+    _planNeighbourTangents(plan, fileKeys)
+    plan.unchangedKeys = len(fileKeys) - len(plan.addKeys) - len(plan.changeKeys)
+    return plan
+
+def _planNeighbourTangents(plan, fileKeys):
+    """
+    Setting or removing a key makes maya recompute the automatic tangents of its neighbours, so unchanged neighbours
+    with such tangents are set again to keep the exported angles
+    """
+    editedTimes = set(plan.setKeys())
+    if plan.cutRange is not None:
+        editedTimes.update(plan.cutRange)
+    if not editedTimes:
+        return
+
+    orderedKeys = [fileKeys[timeKey] for timeKey in sorted(fileKeys)]
+    for index, (keyframeTime, keyframeData) in enumerate(orderedKeys):
+        if keyframeTime in editedTimes:
+            continue
+        tangentTypes = {keyframeData.get(keyInTangentTypeKey), keyframeData.get(keyOutTangentTypeKey)}
+        if not tangentTypes & _neighbourDependentTangentTypes:
+            continue
+        previousTime = orderedKeys[index - 1][0] if index > 0 else None
+        nextTime = orderedKeys[index + 1][0] if index + 1 < len(orderedKeys) else None
+        if previousTime in editedTimes or nextTime in editedTimes or _bordersCut(plan.cutRange, previousTime, keyframeTime, nextTime):
+            plan.changeKeys[keyframeTime] = keyframeData
+
+def _bordersCut(cutRange, previousTime, keyframeTime, nextTime):
+    """
+    Whether no other imported key lies between the key and the cut range
+    """
+    if cutRange is None:
+        return False
+    if keyframeTime > cutRange[1]:
+        return previousTime is None or previousTime <= cutRange[1]
+    if keyframeTime < cutRange[0]:
+        return nextTime is None or nextTime >= cutRange[0]
+    return False
+
+def buildImportPlan(objectName, animationCurveData, keyframeOffset=0, attributes=None):
+    """
+    Reads the target's existing curves once and works out the minimal edits to match the imported curves
+
+    Parameters
+    ----------
+    objectName: str
+    animationCurveData: dict
+        Attribute name to keyframe time to keyframe data
+    keyframeOffset: float
+        Frames to offset every key by
+    attributes: list[str]
+        Attributes to import, an empty selection imports every attribute
+
+    Returns
+    -------
+    ImportPlan
+
+    """
+    plan = ImportPlan(objectName)
+    with telemetry.phase("diff"):
+        for attr, attributeCurveData in selectedCurveData(objectName, animationCurveData, attributes).items():
+            targetCurveData = readTargetCurve(objectName, attr)
+            plan.attributePlans.append(planAttributeImport(attr, attributeCurveData, targetCurveData, keyframeOffset))
+    logger.debug(f"Import plan for {objectName}: {plan.summary()}")
+    return plan
+
+def applyImportPlan(plan):
+    """
+    Runs the edits of an import plan, the cut of an attribute before its keys are set
+
+    Parameters
+    ----------
+    plan: ImportPlan
+
+    """
+    with telemetry.phase("apply"):
+        for attributePlan in plan.attributePlans:
+            if attributePlan.isEmpty():
+                continue
+            if attributePlan.cutRange is not None:
+                cmds.cutKey(plan.objectName, attribute=attributePlan.attribute, time=attributePlan.cutRange, clear=True)
+            applyAttributeCurveData(plan.objectName, attributePlan.attribute, attributePlan.setKeys())
+
+# endregion
+
+# region COLLAPSE
+
+#   Constant curves and curves repeating another curve are written in a collapsed form instead of key by key:
+#
+#   {"@static": 1.0, "@times": [0.0, 10.0], "@inTangentType": "auto", ...}      every key holds the same value
+#   {"@reference": "scaleX", "@offset": 0.0}                                    same keys as 'scaleX', values offset
+#
+#   A referenced curve is always written before the curves referencing it. Reading expands them back into keys.
+
+staticCurveKey = "@static"
+staticTimesKey = "@times"
+referenceCurveKey = "@reference"
+referenceOffsetKey = "@offset"
+
+_uniformKeyFields = [keyInTangentTypeKey, keyInAngleKey, keyInWeightKey, keyOutTangentTypeKey, keyOutAngleKey, keyOutWeightKey]
+
+
+def isCollapsedCurve(entry):
+    return isinstance(entry, dict) and (staticCurveKey in entry or referenceCurveKey in entry)
+
+def _isCurveSection(entry, clips=None):
+    """
+    Whether a top level entry is a clip section holding curves rather than a curve itself
+
+    Parameters
+    ----------
+    entry: dict
+    clips: bool
+        Whether the file's top level entries are clip sections, as recorded in its header. The entries of files written
+        without the flag are told apart by their shape
+
+    """
+    if clips is not None:
+        return bool(clips) and isinstance(entry, dict)
+    if not isinstance(entry, dict) or not entry or isCollapsedCurve(entry):
+        return False
+    _firstValue = next(iter(entry.values()))
+    return isinstance(_firstValue, dict) and attributeValueKey not in _firstValue
+
+def _staticCurve(attributeCurveData):
+    keyframes = list(attributeCurveData.values())
+    if not keyframes:
+        return None
+    first = keyframes[0]
+    for keyframe in keyframes:
+        if keyframe.get(attributeValueKey) != first.get(attributeValueKey):
+            return None
+        if keyframe.get(keyInAngleKey) != 0 or keyframe.get(keyOutAngleKey) != 0:
+            return None
+        if any(keyframe.get(field) != first.get(field) for field in _uniformKeyFields):
+            return None
+
+    staticCurve = {staticCurveKey: first.get(attributeValueKey), staticTimesKey: [float(keyframeTime) for keyframeTime in attributeCurveData]}
+    for field in _uniformKeyFields:
+        staticCurve[f"@{field}"] = first.get(field)
+    return staticCurve
+
+def _curveShapeSignature(attributeCurveData):
+    """
+    Everything about a curve except a constant value offset, used to find repeated curves
+    """
+    keyframeTimes = sorted(attributeCurveData, key=float)
+    baseValue = attributeCurveData[keyframeTimes[0]].get(attributeValueKey)
+    return tuple(
+        (float(keyframeTime), round(attributeCurveData[keyframeTime].get(attributeValueKey) - baseValue, 9))
+        + tuple(attributeCurveData[keyframeTime].get(field) for field in _uniformKeyFields)
+        for keyframeTime in keyframeTimes
+    )
+
+def collapseCurveData(animationCurveData):
+    """
+    Replaces constant curves and curves repeating an earlier curve by their collapsed form. Clip sections are
+    collapsed on their own
+
+    Parameters
+    ----------
+    animationCurveData: dict
+        Attribute name to keyframe time to keyframe data
+
+    Returns
+    -------
+    dict
+        The collapsed attribute name to curve data, in the same order
+
+    """
+    return dict(iterCollapsedCurves(animationCurveData.items()))
+
+def iterCollapsedCurves(items):
+    """
+    Collapses a stream of curves as they pass. No curve is held on to, every distinct shape is remembered by the
+    digest of its signature along with the first curve that had it
+
+    Parameters
+    ----------
+    items: iterable
+        (attribute, attributeCurveData) pairs
+
+    Returns
+    -------
+    generator
+        (attribute, curve data) pairs
+
+    """
+    # the signature holds every key relative to the first one, so curves sharing it only differ by the offset of their
+    # first keys. Only its sha1 digest is kept, the signature is as large as the curve itself
+    shapes = {}
+    for attr, attributeCurveData in items:
+        if _isCurveSection(attributeCurveData):
+            yield attr, collapseCurveData(attributeCurveData)
+            continue
+        if isCollapsedCurve(attributeCurveData) or not attributeCurveData:
+            yield attr, attributeCurveData
+            continue
+
+        staticCurve = _staticCurve(attributeCurveData)
+        if staticCurve is not None:
+            yield attr, staticCurve
+            continue
+
+        signature = hashlib.sha1(repr(_curveShapeSignature(attributeCurveData)).encode("utf-8")).digest()
+        baseValue = attributeCurveData[min(attributeCurveData, key=float)].get(attributeValueKey)
+        reference = shapes.get(signature)
+        if reference is not None:
+            referenceAttr, referenceValue = reference
+            yield attr, {referenceCurveKey: referenceAttr, referenceOffsetKey: baseValue - referenceValue}
+            continue
+        shapes[signature] = (attr, baseValue)
+        yield attr, attributeCurveData
+
+def expandCurve(entry, expandedCurves, columnar=False):
+    """
+    Expands a collapsed curve back into keys
+
+    Parameters
+    ----------
+    entry: dict
+        Collapsed curve
+    expandedCurves: dict
+        Attribute name to the curves read so far, for resolving references
+    columnar: bool
+        Whether to return the curve as columns instead of keyframe data, see 'curveToColumns'
+
+    Returns
+    -------
+    dict
+        Keyframe time to keyframe data, or the curve columns
+
+    """
+    if staticCurveKey in entry:
+        keyframeTimes = [float(keyframeTime) for keyframeTime in entry.get(staticTimesKey, [])]
+        if columnar:
+            columns = {columnTimesKey: keyframeTimes, columnValuesKey: [entry[staticCurveKey]] * len(keyframeTimes)}
+            for column, field in _columnFields[1:]:
+                columns[column] = [entry.get(f"@{field}")] * len(keyframeTimes)
+            return columns
+
+        keyframe = {attributeValueKey: entry[staticCurveKey]}
+        for field in _uniformKeyFields:
+            keyframe[field] = entry.get(f"@{field}")
+        return {keyframeTime: dict(keyframe) for keyframeTime in keyframeTimes}
+
+    referenceAttr = entry[referenceCurveKey]
+    if referenceAttr not in expandedCurves:
+        raise ValueError(f"Curve references '{referenceAttr}' which was not read before it")
+    offset = entry.get(referenceOffsetKey, 0.0)
+    referenceCurve = expandedCurves[referenceAttr]
+    if columnar:
+        columns = dict(referenceCurve)
+        columns[columnValuesKey] = [value + offset for value in referenceCurve[columnValuesKey]]
+        return columns
+
+    expandedCurve = {}
+    for keyframeTime, keyframe in referenceCurve.items():
+        keyframe = dict(keyframe)
+        keyframe[attributeValueKey] = keyframe[attributeValueKey] + offset
+        expandedCurve[keyframeTime] = keyframe
+    return expandedCurve
+
+def expandCurveItems(items, columnar=False, clips=None):
+    """
+    Expands the collapsed curves of a stream of top level entries as they are read, bringing every curve to the
+    same layout whatever schema it was written with
+
+    Parameters
+    ----------
+    items: iterable
+        (key, value) pairs
+    columnar: bool
+        Whether to give the curves as columns instead of keyframe data
+    clips: bool
+        Whether the entries are clip sections, see '_isCurveSection'
+
+    Returns
+    -------
+    generator
+        (key, value) pairs with every curve expanded
+
+    """
+    expandedCurves = {}
+    for key, entry in items:
+        if _isCurveSection(entry, clips):
+            entry = dict(expandCurveItems(entry.items(), columnar=columnar, clips=False))
+        elif isCollapsedCurve(entry):
+            entry = expandCurve(entry, expandedCurves, columnar=columnar)
+            expandedCurves[key] = entry
+        else:
+            entry = curveLayout(entry, columnar)
+            expandedCurves[key] = entry
+        yield key, entry
+
+# endregion
+
+# region SCHEMA
+
+#   Schema 1 stores every key as its own object, keyed by the key time as a string:
+#   {"translateX": {"1.0": {"value": 0.5, "inTangentType": "auto", "inAngle": 0.0, ...}, "2.0": {...}}}
+#
+#   Schema 2 stores every curve as parallel columns, a column holding the same value for every key is written once:
+#   {"translateX": {"times": [1.0, 2.0], "values": [0.5, 0.7], "inType": "auto", "inAngle": [0.0, 3.1], ...}}
+#
+#   The header of schema 2 files records {"schema": 2}. Readers recognise the layout of each curve on its own, so
+#   schema 1 files, with or without a header, keep reading as before.
+
+schemaVersionKey = "schema"
+currentSchemaVersion = 2
+
+columnTimesKey      = "times"
+columnValuesKey     = "values"
+columnInTypeKey     = "inType"
+columnInAngleKey    = "inAngle"
+columnInWeightKey   = "inWeight"
+columnOutTypeKey    = "outType"
+columnOutAngleKey   = "outAngle"
+columnOutWeightKey  = "outWeight"
+
+# column name to keyframe data field, values first
+_columnFields = [
+    (columnValuesKey, attributeValueKey),
+    (columnInTypeKey, keyInTangentTypeKey),
+    (columnInAngleKey, keyInAngleKey),
+    (columnInWeightKey, keyInWeightKey),
+    (columnOutTypeKey, keyOutTangentTypeKey),
+    (columnOutAngleKey, keyOutAngleKey),
+    (columnOutWeightKey, keyOutWeightKey),
+]
+
+
+def isColumnarCurve(entry):
+    return isinstance(entry, dict) and isinstance(entry.get(columnTimesKey), list)
+
+def curveToColumns(attributeCurveData, compact=False):
+    """
+    Converts keyframe data to parallel columns ordered by time
+
+    Parameters
+    ----------
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+    compact: bool
+        Whether to write tangent columns holding one value for every key as that single value
+
+    Returns
+    -------
+    dict
+        Column name to a list with one entry per key
+
+    """
+    keyframeTimes = sorted(attributeCurveData, key=float)
+    keyframes = [attributeCurveData[keyframeTime] for keyframeTime in keyframeTimes]
+    columns = {columnTimesKey: [float(keyframeTime) for keyframeTime in keyframeTimes]}
+    for column, field in _columnFields:
+        columnValues = [keyframe.get(field) for keyframe in keyframes]
+        if compact and column != columnValuesKey and len(columnValues) > 1 and columnValues.count(columnValues[0]) == len(columnValues):
+            columns[column] = columnValues[0]
+        else:
+            columns[column] = columnValues
+    return columns
+
+def _fullColumns(columns):
+    """
+    Expands the single value columns of a compact curve to one entry per key
+    """
+    keyCount = len(columns[columnTimesKey])
+    fullColumns = {columnTimesKey: columns[columnTimesKey]}
+    for column, _ in _columnFields:
+        columnValues = columns.get(column)
+        fullColumns[column] = columnValues if isinstance(columnValues, list) else [columnValues] * keyCount
+    return fullColumns
+
+def columnsToCurve(columns):
+    """
+    Converts curve columns back to keyframe time to keyframe data
+
+    Parameters
+    ----------
+    columns: dict
+
+    Returns
+    -------
+    dict
+
+    """
+    columns = _fullColumns(columns)
+    fields = [field for _, field in _columnFields]
+    keyframes = zip(*[columns[column] for column, _ in _columnFields])
+    return dict(zip(columns[columnTimesKey], [dict(zip(fields, keyframe)) for keyframe in keyframes]))
+
+def curveLayout(entry, columnar):
+    """
+    Brings a curve of either schema to keyframe data, or to full columns when 'columnar' is set
+    """
+    if isColumnarCurve(entry):
+        return _fullColumns(entry) if columnar else columnsToCurve(entry)
+    if columnar and isinstance(entry, dict):
+        return curveToColumns(entry)
+    if isinstance(entry, dict):
+        # schema 1 times are strings
+        return {float(keyframeTime): keyframe for keyframeTime, keyframe in entry.items()}
+    return entry
+
+def columnarItems(items, clips=None):
+    """
+    Converts a stream of top level entries to schema 2 as they are written, leaving collapsed curves as they are
+
+    Parameters
+    ----------
+    items: iterable
+        (key, value) pairs
+    clips: bool
+        Whether the entries are clip sections, see '_isCurveSection'
+
+    Returns
+    -------
+    generator
+        (key, value) pairs
+
+    """
+    for key, entry in items:
+        if _isCurveSection(entry, clips):
+            yield key, dict(columnarItems(entry.items(), clips=False))
+        elif isinstance(entry, dict) and not isCollapsedCurve(entry) and not isColumnarCurve(entry):
+            yield key, curveToColumns(entry, compact=True)
+        else:
+            yield key, entry
+
+# endregion
+
+# region PRECISION
+
+#   Exports can round floats to a number of decimals per kind of field, e.g. {"values": 6, "angles": 4}. Rounding
+#   happens column by column on the schema 2 layout, before encoding, and the serializers then write the shortest
+#   text that reads back as the rounded float, '12.3457' instead of '12.345678901234567'. The largest rounding error
+#   of every kind of field is collected into a precision loss report. Schema 1 curves are written as they are.
+
+precisionTimesKey = "times"
+precisionValuesKey = "values"
+precisionAnglesKey = "angles"
+precisionWeightsKey = "weights"
+
+# Columns shorter than this are rounded in python, numpy only pays off on longer ones
+vectorizedColumnLength = 64
+
+# column or collapsed curve field to the precision setting it follows. Reference offsets stay in full, so a curve
+# expanded from its reference is off by no more than the reference itself
+_precisionFields = {
+    columnTimesKey: precisionTimesKey,
+    columnValuesKey: precisionValuesKey,
+    columnInAngleKey: precisionAnglesKey,
+    columnOutAngleKey: precisionAnglesKey,
+    columnInWeightKey: precisionWeightsKey,
+    columnOutWeightKey: precisionWeightsKey,
+    staticTimesKey: precisionTimesKey,
+    staticCurveKey: precisionValuesKey,
+    f"@{keyInAngleKey}": precisionAnglesKey,
+    f"@{keyOutAngleKey}": precisionAnglesKey,
+    f"@{keyInWeightKey}": precisionWeightsKey,
+    f"@{keyOutWeightKey}": precisionWeightsKey,
+}
+
+_numpyModule = None
+
+
+def _numpy():
+    # numpy is only loaded once a long column is rounded, keeping this module cheap to import
+    global _numpyModule
+    if _numpyModule is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpyModule = numpy
+    return _numpyModule
+
+def exportPrecision():
+    """
+    Gets the default export precision from the app config. Settings are null by default, rounding is opted into per
+    setting
+
+    Returns
+    -------
+    dict or None
+        Precision setting to decimals, None to write every float in full
+    """
+    _precision = resources.exportPrecision()
+    if not _precision or all(decimals is None for decimals in _precision.values()):
+        return None
+    return _precision
+
+def roundColumn(values, decimals):
+    """
+    Rounds a column of floats, a whole column at once when it is long enough
+
+    Parameters
+    ----------
+    values: list[float] | float
+        A column, or the single value of a compact column
+    decimals: int
+
+    Returns
+    -------
+    tuple(list[float] | float, float)
+        The rounded column and its largest rounding error
+
+    """
+    if isinstance(values, float):
+        # adding 0.0 turns a rounded -0.0 into 0.0
+        rounded = round(values, decimals) + 0.0
+        return rounded, abs(values - rounded)
+    if not isinstance(values, list) or not values:
+        return values, 0.0
+
+    numpy = _numpy() if len(values) >= vectorizedColumnLength else None
+    if numpy:
+        array = numpy.asarray(values)
+        if array.dtype.kind == "f":
+            roundedArray = numpy.round(array, decimals) + 0.0
+            return roundedArray.tolist(), float(numpy.abs(array - roundedArray).max())
+
+    rounded = [round(value, decimals) + 0.0 if isinstance(value, float) else value for value in values]
+    error = max((abs(value - roundedValue) for value, roundedValue in zip(values, rounded) if isinstance(value, float)), default=0.0)
+    return rounded, error
+
+def roundCurve(entry, precision, precisionLoss):
+    """
+    Rounds the float fields of a schema 2 or collapsed curve
+
+    Parameters
+    ----------
+    entry: dict
+    precision: dict
+        Precision setting to decimals, settings left out or set to None keep their fields in full
+    precisionLoss: dict
+        Precision setting to the largest rounding error so far, updated in place
+
+    Returns
+    -------
+    dict
+        A rounded copy of the curve
+
+    """
+    rounded = dict(entry)
+    for field, setting in _precisionFields.items():
+        decimals = precision.get(setting)
+        if decimals is None or field not in entry:
+            continue
+        rounded[field], error = roundColumn(entry[field], decimals)
+        if error > precisionLoss.get(setting, 0.0):
+            precisionLoss[setting] = error
+    return rounded
+
+def roundedItems(items, precision, precisionLoss=None, clips=None):
+    """
+    Rounds a stream of schema 2 top level entries as they are written, see 'roundCurve'
+
+    Parameters
+    ----------
+    items: iterable
+        (key, value) pairs
+    precision: dict
+    precisionLoss: dict
+        Filled with the largest rounding error of every precision setting
+    clips: bool
+        Whether the entries are clip sections, see '_isCurveSection'
+
+    Returns
+    -------
+    generator
+        (key, value) pairs
+
+    """
+    if precisionLoss is None:
+        precisionLoss = {}
+    for key, entry in items:
+        if _isCurveSection(entry, clips):
+            yield key, dict(roundedItems(entry.items(), precision, precisionLoss, clips=False))
+        elif isColumnarCurve(entry) or isCollapsedCurve(entry):
+            with telemetry.phase("round"):
+                rounded = roundCurve(entry, precision, precisionLoss)
+            yield key, rounded
+        else:
+            yield key, entry
+
+def storedItems(items, precision=None, precisionLoss=None, clips=None):
+    """
+    Brings a stream of top level entries to the form a schema 2 file stores them in, so a stage after it sees the
+    exact values a reader gets back
+
+    Parameters
+    ----------
+    items: iterable
+        (key, value) pairs
+    precision: dict
+        See 'roundCurve', floats stay in full when not given
+    precisionLoss: dict
+        Filled with the largest rounding error of every precision setting
+    clips: bool
+        Whether the entries are clip sections, see '_isCurveSection'
+
+    Returns
+    -------
+    generator
+        (key, value) pairs
+
+    """
+    items = columnarItems(items, clips=clips)
+    if precision:
+        items = roundedItems(items, precision, precisionLoss, clips=clips)
+    return items
+
+def reportPrecisionLoss(filepath, precisionLoss):
+    """
+    Logs the largest rounding error of every precision setting and adds it to the running telemetry job
+    """
+    for setting, error in precisionLoss.items():
+        telemetry.addPrecisionLoss(setting, error)
+    if precisionLoss:
+        _errors = ", ".join(f"{setting} {error:.3g}" for setting, error in sorted(precisionLoss.items()))
+        logger.info(f"Largest rounding error writing {filepath}: {_errors}")
+
+# endregion
+
+# region SERIALIZERS
+
+#   Animation files start with a single json header line naming the encoding of the payload that follows, e.g.
+#   {"format": "IW_AnimExporter", "encoding": "orjson", "layout": "lines"}
+#   With the "lines" layout a json payload is one json object written with a top level entry per line, so the reader
+#   only has to decode one curve at a time:
+#
+#   {"format": "IW_AnimExporter", "encoding": "json", "layout": "lines", "schema": 2, "clips": false}
+#   {
+#   "translateX": {"times": [1.0, 2.0], "values": [0.5, 0.7], ...},
+#   "translateY": {"@static": 0.0, "@times": [1.0, 2.0], ...}
+#   }
+#
+#   Msgpack payloads use the "pairs" layout instead, a [key, value] array per top level entry one after the other, so
+#   neither the writer nor the reader needs the number of entries. Msgpack files without a layout hold a single map.
+#
+#   The header line makes the file as a whole no longer valid json, standard json tools read it after its first line.
+#   Files without the header, as written before it existed, are read as plain json.
+#
+#   The header also records {"clips": true} for files holding a section per clip instead of curves. Files written
+#   before the flag existed are told apart by the shape of their first entry.
+#
+#   Files are compressed based on their extension, e.g. 'walk.json.gz', and are compressed and decompressed as a stream.
+
+fileFormatName = "IW_AnimExporter"
+# longest first line read when looking for the header, keeps a plain json file on a single line from being read whole
+headerLineLimit = 64 * 1024
+headerFormatKey = "format"
+headerEncodingKey = "encoding"
+headerLayoutKey = "layout"
+headerClipsKey = "clips"
+lineLayout = "lines"
+pairLayout = "pairs"
+
+# Used when no encoding is requested, the first one that can be imported wins
+preferredSerializers = ["orjson", "ujson", "json"]
+
+
+class Serializer(object):
+
+    def __init__(self, name, encode, decode, isJson=True, layout=lineLayout):
+        """
+        Encodes and decodes animation data to and from bytes
+
+        Parameters
+        ----------
+        name: str
+            Name recorded in the file header
+        encode: callable
+            Takes the data, returns bytes
+        decode: callable
+            Takes bytes, returns the data
+        isJson: bool
+            Whether the payload is json, which any json serializer can decode
+        layout: str
+            Layout 'writeItems' writes, recorded in the file header
+        """
+        super().__init__()
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+        self.isJson = isJson
+        self.layout = layout
+
+    def writeItems(self, file, items):
+        """
+        Writes the top level entries one at a time, each on its own line
+
+        Parameters
+        ----------
+        file: io.BufferedIOBase
+        items: iterable
+            (key, value) pairs of the top level dictionary
+
+        """
+        file.write(b"{")
+        separator = b"\n"
+        for key, value in items:
+            file.write(separator)
+            file.write(json.dumps(str(key)).encode("utf-8"))
+            file.write(b": ")
+            with telemetry.phase("encode"):
+                encoded = self.encode(value)
+            file.write(encoded)
+            separator = b",\n"
+        file.write(b"\n}\n")
+
+    def iterItems(self, file, layout=None):
+        """
+        Reads the top level entries. Files written with the line layout are decoded one line at a time
+
+        Parameters
+        ----------
+        file: io.BufferedIOBase
+        layout: str
+            Layout recorded in the file header
+
+        Returns
+        -------
+        generator
+            (key, value) pairs of the top level dictionary
+
+        """
+        if layout != lineLayout:
+            yield from self.decode(file.read()).items()
+            return
+
+        for line in file:
+            line = line.strip()
+            if line in (b"{", b"}", b""):
+                continue
+            if line.endswith(b","):
+                line = line[:-1]
+            yield from self.decode(b"{" + line + b"}").items()
+
+
+class MsgpackSerializer(Serializer):
+
+    def __init__(self, msgpack):
+        """
+        Streams msgpack entries one [key, value] pair at a time
+
+        Parameters
+        ----------
+        msgpack: module
+        """
+        super().__init__(
+            name="msgpack",
+            encode=lambda data: msgpack.packb(data, use_bin_type=True),
+            decode=lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False),
+            isJson=False,
+            layout=pairLayout
+        )
+        self._msgpack = msgpack
+
+    def writeItems(self, file, items):
+        # a pair per entry rather than one map, whose header would need the entry count up front
+        packer = self._msgpack.Packer(use_bin_type=True)
+        for key, value in items:
+            with telemetry.phase("encode"):
+                encoded = packer.pack([key, value])
+            file.write(encoded)
+
+    def iterItems(self, file, layout=None):
+        unpacker = self._msgpack.Unpacker(file, raw=False, strict_map_key=False)
+        if layout == pairLayout:
+            for key, value in unpacker:
+                yield key, value
+            return
+
+        # files written before the pair layout hold a single map
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            yield key, unpacker.unpack()
+
+
+_serializers = {}
+
+def registerSerializer(serializer):
+    _serializers[serializer.name] = serializer
+
+def availableSerializers():
+    return list(_serializers.keys())
+
+def getSerializer(name=None):
+    """
+    Gets a registered serializer
+
+    Parameters
+    ----------
+    name: str
+        Serializer name, defaults to the first available of 'preferredSerializers'
+
+    Returns
+    -------
+    Serializer
+
+    """
+    if name is None:
+        name = next(_name for _name in preferredSerializers if _name in _serializers)
+    if name not in _serializers:
+        raise ValueError(f"Serializer '{name}' is not available, available serializers: {availableSerializers()}")
+    return _serializers[name]
+
+def getDecoder(name):
+    """
+    Gets the serializer able to decode a payload written with the given encoding. Json payloads are decoded with the
+    fastest available json serializer, whichever library wrote them
+    """
+    if name in _serializers and not _serializers[name].isJson:
+        return _serializers[name]
+    if name in _serializers or name in preferredSerializers:
+        return getSerializer()
+    raise ValueError(f"No serializer available to decode '{name}' files")
+
+def _registerDefaultSerializers():
+    registerSerializer(Serializer(
+        name="json",
+        encode=lambda data: json.dumps(data).encode("utf-8"),
+        decode=lambda payload: json.loads(payload.decode("utf-8"))
+    ))
+
+    try:
+        import orjson
+        registerSerializer(Serializer(
+            name="orjson",
+            encode=lambda data: orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS),
+            decode=orjson.loads
+        ))
+    except ImportError:
+        pass
+
+    try:
+        import ujson
+        registerSerializer(Serializer(
+            name="ujson",
+            encode=lambda data: ujson.dumps(data).encode("utf-8"),
+            decode=ujson.loads
+        ))
+    except ImportError:
+        pass
+
+    try:
+        import msgpack
+        registerSerializer(MsgpackSerializer(msgpack))
+    except ImportError:
+        pass
+
+_registerDefaultSerializers()
+
+
+# region COMPRESSION
+
+defaultCompressionLevels = {
+    ".gz": 6,
+    ".bz2": 9,
+    ".xz": 6,
+    ".lzma": 6,
+    ".zst": 3,
+}
+
+
+def _openGzip(filepath, mode, level):
+    import gzip
+    if "w" in mode:
+        return gzip.open(filepath, mode, compresslevel=level)
+    return gzip.open(filepath, mode)
+
+def _openBz2(filepath, mode, level):
+    import bz2
+    if "w" in mode:
+        return bz2.open(filepath, mode, compresslevel=level)
+    return bz2.open(filepath, mode)
+
+def _openLzma(filepath, mode, level):
+    import lzma
+    if "w" in mode:
+        return lzma.open(filepath, mode, preset=level)
+    return lzma.open(filepath, mode)
+
+def _openZstd(filepath, mode, level):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(f"Reading or writing '{filepath}' requires the zstandard module")
+    if "w" in mode:
+        return zstandard.ZstdCompressor(level=level).stream_writer(open(filepath, mode))
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(filepath, mode)))
+
+_compressionOpeners = {
+    ".gz": _openGzip,
+    ".bz2": _openBz2,
+    ".xz": _openLzma,
+    ".lzma": _openLzma,
+    ".zst": _openZstd,
+}
+
+def compressionExtension(filepath):
+    _extension = os.path.splitext(filepath)[1].lower()
+    return _extension if _extension in _compressionOpeners else None
+
+def openAnimationFile(filepath, mode="rb", compressionLevel=None):
+    """
+    Opens an animation file as a binary stream, compressing or decompressing it on the fly based on its extension
+
+    Parameters
+    ----------
+    filepath: str
+    mode: str
+        'rb' or 'wb'
+    compressionLevel: int
+        Compression level when writing, defaults to 'defaultCompressionLevels'
+
+    Returns
+    -------
+    io.BufferedIOBase
+
+    """
+    _extension = compressionExtension(filepath)
+    if _extension is None:
+        return open(filepath, mode)
+    if compressionLevel is None:
+        compressionLevel = defaultCompressionLevels[_extension]
+    return _compressionOpeners[_extension](filepath, mode, compressionLevel)
+
+# endregion
+
+
+def encodeHeader(encoding, layout=None, schema=None, clips=None):
+    header = {headerFormatKey: fileFormatName, headerEncodingKey: encoding}
+    if layout is not None:
+        header[headerLayoutKey] = layout
+    if schema is not None:
+        header[schemaVersionKey] = schema
+    if clips is not None:
+        header[headerClipsKey] = bool(clips)
+    return json.dumps(header).encode("utf-8") + b"\n"
+
+def decodeHeader(line):
+    """
+    Parses a file's first line as a header
+
+    Returns
+    -------
+    dict or None
+        The header, None when the line is not a header
+    """
+    if not line.startswith(b"{") or fileFormatName.encode("utf-8") not in line:
+        return None
+    try:
+        header = json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get(headerFormatKey) != fileFormatName:
+        return None
+    return header
+
+# files being written start with this until they are complete
+temporaryFilePrefix = ".writing_"
+
+
+def writeJson(filepath, data, encoding=None, compressionLevel=None, schema=None, precision=None, precisionLoss=None, clips=False):
+    """
+    Streams animation data to a file with a header recording its encoding
+
+    Parameters
+    ----------
+    filepath: str
+    data: dict | iterable
+        Top level entries, or a stream of (key, value) pairs written as they arrive
+    encoding: str
+        Serializer name, defaults to the fastest available json serializer
+    compressionLevel: int
+        Compression level for compressed file extensions
+    schema: int
+        Schema version to write, defaults to 'currentSchemaVersion'
+    precision: dict
+        Precision setting to decimals the floats of schema 2 curves are rounded to, see 'roundCurve'. Floats are
+        written in full when not given
+    precisionLoss: dict
+        Filled with the largest rounding error of every precision setting
+    clips: bool
+        Whether the top level entries are clip sections, recorded in the header
+
+    """
+    if schema is None:
+        schema = currentSchemaVersion
+    serializer = getSerializer(encoding)
+    items = data.items() if isinstance(data, dict) else data
+    if schema >= 2:
+        items = storedItems(items, precision, precisionLoss, clips=clips)
+    # the stream is written to a temporary file first, so a stream failing halfway never touches an existing file.
+    # The temporary file keeps the extension, which picks the compression
+    handle, temporaryFilepath = tempfile.mkstemp(prefix=temporaryFilePrefix, suffix=f"_{os.path.basename(filepath)}", dir=os.path.dirname(os.path.abspath(filepath)))
+    os.close(handle)
+    try:
+        with telemetry.phase("write"):
+            with openAnimationFile(temporaryFilepath, "wb", compressionLevel) as file:
+                file.write(encodeHeader(serializer.name, serializer.layout, schema=schema if schema >= 2 else None, clips=clips))
+                serializer.writeItems(file, items)
+        os.chmod(temporaryFilepath, _newFileMode())
+        os.replace(temporaryFilepath, filepath)
+    finally:
+        if os.path.exists(temporaryFilepath):
+            os.remove(temporaryFilepath)
+    telemetry.addBytes(os.path.getsize(filepath))
+
+def _newFileMode():
+    # 'mkstemp' creates files readable by their owner only, written files get the mode 'open' would have given them
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def readHeader(filepath):
+    """
+    Gets a file's header, None for plain json files
+    """
+    with openAnimationFile(filepath, "rb") as file:
+        return decodeHeader(file.readline(headerLineLimit))
+
+def headerClips(header):
+    """
+    Gets whether a header records its file as holding clip sections, None for files written without the flag
+    """
+    return None if header is None else header.get(headerClipsKey)
+
+def fileHasClips(filepath, animationCurveData=None):
+    """
+    Whether a file holds a section per clip instead of curves, as recorded in its header. Files written without the
+    flag are told apart by the shape of their first entry
+
+    Parameters
+    ----------
+    filepath: str
+    animationCurveData: dict
+        The file's entries when it was read already, saves reading its first entry again
+
+    Returns
+    -------
+    bool
+
+    """
+    clips = headerClips(readHeader(filepath))
+    if clips is not None:
+        return clips
+    if animationCurveData is not None:
+        return _isCurveSection(next(iter(animationCurveData.values()), None))
+    with contextlib.closing(iterJson(filepath, expand=False)) as items:
+        return _isCurveSection(next(items, (None, None))[1])
+
+def iterJson(filepath, expand=True, columnar=False):
+    """
+    Reads the top level entries of an animation file one at a time, curves of either schema coming out the same
+
+    Parameters
+    ----------
+    filepath: str
+    expand: bool
+        Whether to expand collapsed curves back into keys and bring every curve to one layout. Otherwise the
+        entries are returned as they are stored
+    columnar: bool
+        Whether expanded curves are given as columns, see 'curveToColumns', instead of keyframe data
+
+    Returns
+    -------
+    generator
+        (key, value) pairs, e.g. attribute name and its keyframe data
+
+    """
+    with openAnimationFile(filepath, "rb") as file:
+        firstLine = file.readline(headerLineLimit)
+        header = decodeHeader(firstLine)
+        if header is None:
+            # plain json files carry no header, so the first line belongs to the payload. It is put back in front of
+            # the rest instead of seeking, which compressed streams can only do by decompressing from the start again.
+            # Plain json is decoded whole anyway
+            items = getDecoder("json").iterItems(io.BytesIO(firstLine + file.read()))
+        else:
+            items = getDecoder(header.get(headerEncodingKey)).iterItems(file, header.get(headerLayoutKey))
+        if expand:
+            items = expandCurveItems(items, columnar=columnar, clips=headerClips(header))
+        yield from items
+
+def readJson(filepath, columnar=False):
+    """
+    Reads animation data, decoding it with the serializer named in the file header. Schema 1 and 2 files both read
+    as keyframe data
+
+    Parameters
+    ----------
+    filepath: str
+    columnar: bool
+        Whether to read every curve as columns instead, the faster layout to process whole curves with
+
+    Returns
+    -------
+    dict
+
+    """
+    with telemetry.phase("read"):
+        return dict(iterJson(filepath, columnar=columnar))
+
+# endregion
+
+# region SPILL
+
+#   Exports hold on to curves they cannot write yet, the reference curves of the collapse stage and the clips of a
+#   clip export. Under a memory budget these spill to temporary shard files once the held curves outgrow it, so an
+#   export's memory no longer grows with the size of the shot. Shards are pickled, keeping float keyframe times as
+#   they are, and are removed once the export finished.
+
+exportMemoryBudgetEnvironmentVariable = "IW_ANIMEXPORTER_EXPORT_MEMORY_BUDGET"
+
+
+def exportMemoryBudget():
+    """
+    Gets the default export memory budget, in megabytes from the environment, then the app config
+
+    Returns
+    -------
+    int or None
+        Budget in bytes, None for no budget
+    """
+    _megabytes = os.environ.get(exportMemoryBudgetEnvironmentVariable) or resources.exportMemoryBudget()
+    if not _megabytes:
+        return None
+    return int(float(_megabytes) * 1024 * 1024)
+
+def estimateDataSize(data):
+    """
+    Approximates the bytes held by curve data. The keys of a curve and the values of a column share one layout, so
+    only the first one is measured and counted for all of them. Errs on the high side, values shared between keys
+    are counted for every key
+    """
+    size = sys.getsizeof(data)
+    if isinstance(data, dict):
+        first = next(iter(data.values()), None)
+        if isinstance(first, (dict, list, tuple)):
+            size += len(data) * (sys.getsizeof(next(iter(data))) + estimateDataSize(first))
+        else:
+            size += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in data.items())
+    elif isinstance(data, (list, tuple)) and data:
+        size += len(data) * estimateDataSize(data[0])
+    return size
+
+
+class SpillBuffer(object):
+
+    def __init__(self, memoryBudget=None, directory=None):
+        """
+        Ordered (key, value) entries held in memory up to a budget. Once the held entries outgrow the budget they
+        are written to a new shard file and dropped from memory. Use it as a context manager to remove the shards
+
+        Parameters
+        ----------
+        memoryBudget: int
+            Bytes held before spilling, estimated with 'estimateDataSize'. Nothing spills when not given
+        directory: str
+            Directory of the shard files, defaults to the temp directory
+        """
+        super().__init__()
+        self.memoryBudget = memoryBudget
+        self.directory = directory
+        self.heldBytes = 0
+        self._held = {}
+        self._locations = []
+        self._indices = {}
+        self._shards = []
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, key):
+        return key in self._indices
+
+    def __getitem__(self, key):
+        """
+        Gets the value last added under the key
+        """
+        return self.get(self._indices[key])[1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def shardCount(self):
+        return len(self._shards)
+
+    def append(self, key, value):
+        """
+        Adds an entry after the others
+
+        Returns
+        -------
+        int
+            The entry's index, see 'get'
+        """
+        index = len(self._locations)
+        self._locations.append(None)
+        self._indices[key] = index
+        self._held[index] = (key, value)
+        if self.memoryBudget:
+            self.heldBytes += estimateDataSize(value)
+            if self.heldBytes > self.memoryBudget:
+                self.spill()
+        return index
+
+    def spill(self):
+        """
+        Writes every held entry to a new shard file, in order, and drops them from memory
+        """
+        if not self._held:
+            return
+        with telemetry.phase("spill"):
+            handle, shardFilepath = tempfile.mkstemp(prefix="IW_AnimExporter_", suffix=".shard", dir=self.directory)
+            self._shards.append(shardFilepath)
+            with os.fdopen(handle, "wb") as file:
+                for index, entry in self._held.items():
+                    self._locations[index] = (shardFilepath, file.tell())
+                    pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.debug(f"Spilled {len(self._held)} curves, about {self.heldBytes} bytes, to {shardFilepath}")
+        self._held = {}
+        self.heldBytes = 0
+
+    def get(self, index):
+        """
+        Gets one entry, reading it back from its shard when it spilled
+
+        Returns
+        -------
+        tuple(key, value)
+        """
+        entry = self._held.get(index)
+        if entry is not None:
+            return entry
+        shardFilepath, offset = self._locations[index]
+        with open(shardFilepath, "rb") as file:
+            file.seek(offset)
+            return pickle.load(file)
+
+    def items(self):
+        """
+        Streams every entry in the order it was added, reading the shards one entry at a time
+
+        Returns
+        -------
+        generator
+            (key, value) pairs
+        """
+        # every entry older than the last spill lives in a shard, the held entries come after all of them
+        for shardFilepath in self._shards:
+            with open(shardFilepath, "rb") as file:
+                while True:
+                    try:
+                        yield pickle.load(file)
+                    except EOFError:
+                        break
+        yield from list(self._held.values())
+
+    def close(self):
+        for shardFilepath in self._shards:
+            try:
+                os.remove(shardFilepath)
+            except OSError as e:
+                logger.warning(f"Could not remove spill shard {shardFilepath}: {e}")
+        self._shards = []
+        self._held = {}
+        self._locations = []
+        self._indices = {}
+        self.heldBytes = 0
+
+# endregion
+
+# region STREAMING
+
+#   Generator stages passing one curve at a time, so a curve can be reduced, encoded and written before the next one
+#   is read:
+#
+#   curves = iterObjectCurves(["hero:hip_ctrl"], frameRange=(1, 120))
+#   curves = reduceCurves(curves, tolerance=0.001)
+#   writeJson(filepath, iterCollapsedCurves(curveItems(curves)))
+#
+#   Object streams yield (objectName, attribute, attributeCurveData), item streams yield (attribute, attributeCurveData)
+
+def iterObjectCurves(objects, attributes=None, frameRange=None, bakeStep=None, queryCache=None):
+    """
+    Reads the animation curves of the given objects one curve at a time
+
+    Parameters
+    ----------
+    objects: list[str]
+        Objects to read, a single name is accepted too
+    attributes: list[str] | dict
+        Attributes to read for every object, or object name to attributes. Defaults to the animated attributes, or
+        every keyable attribute when baking
+    frameRange: tuple(float, float)
+        First and last frame to read, either may be None. Defaults to every key, or the playback range when baking
+    bakeStep: float
+        When given the attributes are sampled every 'bakeStep' frames instead of reading their keys. The attributes of
+        one object are sampled together, so only that object's samples are held at once
+    queryCache: QueryCache
+        Job cache for the maya queries, a new one is used for this stream when not given
+
+    Returns
+    -------
+    generator
+        (objectName, attribute, attributeCurveData)
+
+    """
+    if isinstance(objects, str):
+        objects = [objects]
+    if queryCache is None:
+        queryCache = QueryCache()
+    startFrame, endFrame = frameRange if frameRange is not None else (None, None)
+
+    for objectName in objects:
+        objectAttributes = attributes.get(objectName) if isinstance(attributes, dict) else attributes
+
+        if bakeStep:
+            if not objectAttributes:
+                objectAttributes = list(queryCache.keyableAttributes(objectName))
+            if startFrame is None:
+                startFrame = cmds.playbackOptions(query=True, minTime=True)
+            if endFrame is None:
+                endFrame = cmds.playbackOptions(query=True, maxTime=True)
+            bakedCurveData = getBakedAnimationData(objectName, objectAttributes, startFrame, endFrame, step=bakeStep)
+            for attr in objectAttributes:
+                yield objectName, attr, bakedCurveData.pop(attr)
+            continue
+
+        if objectAttributes is None:
+            objectAttributes = getAnimatedObjectAttributes(objectName, queryCache=queryCache)
+        for attr in objectAttributes:
+            yield objectName, attr, getAttributeAnimationData(
+                objectName=objectName,
+                attribute=attr,
+                startFrame=startFrame,
+                endFrame=endFrame,
+                queryCache=queryCache
+            )
+
+def reduceCurves(curves, tolerance=0.0001, frameSeconds=None):
+    """
+    Reduces every curve of an object stream, see 'reduceCurveKeys'
+
+    Parameters
+    ----------
+    curves: iterable
+        (objectName, attribute, attributeCurveData)
+    tolerance: float
+    frameSeconds: float
+        Result of 'secondsPerFrame', queried once from the scene when not given
+
+    Returns
+    -------
+    generator
+        (objectName, attribute, attributeCurveData)
+
+    """
+    for objectName, attr, attributeCurveData in curves:
+        if frameSeconds is None:
+            frameSeconds = secondsPerFrame()
+        yield objectName, attr, reduceCurveKeys(attributeCurveData, tolerance=tolerance, frameSeconds=frameSeconds)
+
+def curveItems(curves):
+    """
+    Drops the object name from an object stream, giving the (attribute, attributeCurveData) items written per file
+    """
+    for _, attr, attributeCurveData in curves:
+        yield attr, attributeCurveData
+
+# endregion
+
+# region MULTI FILE IMPORT
+
+#   Files are decoded, decompressed and retimed in worker threads while the main thread applies the files decoded
+#   before them, in the order they were given. Workers run at most 'prefetch' files ahead, which bounds the decoded
+#   data held in memory. Import jobs are plain dictionaries:
+#
+#   {"filepath": "walk.json.gz", "objectName": "hero:hip_ctrl", "keyframeOffset": 10, "attributes": [], "clip": None,
+#    "timeTransform": None}
+
+importFilepathKey = "filepath"
+importObjectKey = "objectName"
+importOffsetKey = "keyframeOffset"
+importAttributesKey = "attributes"
+importClipKey = "clip"
+importTimeTransformKey = "timeTransform"
+
+# multiple files picked in the interface are stored as one string
+filepathSeparator = ";"
+
+
+def splitFilepaths(filepaths):
+    """
+    Gets the files of a 'filepathSeparator' separated selection, none for an empty or missing selection
+    """
+    if not filepaths:
+        return []
+    return [filepath.strip() for filepath in filepaths.split(filepathSeparator) if filepath.strip()]
+
+def objectNameFromFilepath(filepath):
+    """
+    Gets the object a file was exported from by its name, as exports are named after their object. Maya names hold
+    no dots, so everything from the first one on is extension, e.g. 'hip_ctrl.json.gz'
+    """
+    return os.path.basename(filepath).split(".")[0]
+
+def clipCurveData(filepath, animationCurveData, clip=None):
+    """
+    Gets the curves of a read file, the given clip's section of a multi-clip file
+
+    Parameters
+    ----------
+    filepath: str
+    animationCurveData: dict
+        The file's entries
+    clip: str
+        Clip section to import, required for multi-clip files and refused for any other
+
+    Returns
+    -------
+    dict
+        Attribute name to keyframe time to keyframe data
+
+    Raises
+    ------
+    ValueError
+        When a clip is asked for from a file without clips or the other way around, a multi-clip file imported whole
+        would set its clip sections as attributes
+
+    """
+    clips = fileHasClips(filepath, animationCurveData)
+    if clip is None:
+        if clips:
+            raise ValueError(f"'{filepath}' holds the clips {', '.join(animationCurveData)}, name the clip to read")
+        return animationCurveData
+    if not clips:
+        raise ValueError(f"'{filepath}' holds no clips, cannot read clip '{clip}'")
+    return animationCurveData[clip]
+
+def decodeImportFile(filepath, clip=None, timeTransform=None):
+    """
+    Reads and retimes a file for import without touching the scene, so it can run in a worker. Telemetry phases are
+    not reported from here as they belong to the main thread
+
+    Parameters
+    ----------
+    filepath: str
+    clip: str
+        Clip section to import from a multi-clip file, see 'clipCurveData'
+    timeTransform: timetransform.TimeTransform
+
+    Returns
+    -------
+    dict
+        Attribute name to keyframe time to keyframe data
+
+    """
+    animationCurveData = clipCurveData(filepath, dict(iterJson(filepath)), clip=clip)
+    if timeTransform is not None and not timeTransform.isIdentity():
+        animationCurveData = timeTransform.applyToCurveData(animationCurveData)
+    return animationCurveData
+
+def _decodeImportJob(job):
+    return decodeImportFile(job[importFilepathKey], clip=job.get(importClipKey), timeTransform=job.get(importTimeTransformKey))
+
+def iterDecodedImports(jobs, workers=None, prefetch=None, processes=False):
+    """
+    Decodes the import jobs concurrently while giving them back in their original order
+
+    Parameters
+    ----------
+    jobs: list[dict]
+    workers: int
+        Decoding threads, or processes, defaults to the cpu count
+    prefetch: int
+        Files decoded ahead of the one being handed out, defaults to twice the workers
+    processes: bool
+        Whether to decode in processes instead of threads, for json decoding heavy imports outside of the Maya
+        interface. Threads already overlap decompression and file reads
+
+    Returns
+    -------
+    generator
+        (job, animationCurveData, error) with the error of a file that could not be decoded, else None
+
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if prefetch is None:
+        prefetch = 2 * workers
+    executorClass = concurrent.futures.ProcessPoolExecutor if processes else concurrent.futures.ThreadPoolExecutor
+    with executorClass(max_workers=workers) as executor:
+        pending = collections.deque()
+        jobIterator = iter(jobs)
+        for job in itertools.islice(jobIterator, max(prefetch, 1)):
+            pending.append((job, executor.submit(_decodeImportJob, job)))
+
+        while pending:
+            job, future = pending.popleft()
+            # keep the workers busy before waiting on the next file in order
+            for nextJob in itertools.islice(jobIterator, 1):
+                pending.append((nextJob, executor.submit(_decodeImportJob, nextJob)))
+            try:
+                yield job, future.result(), None
+            except Exception as e:
+                yield job, None, e
+
+def importFiles(jobs, workers=None, prefetch=None, processes=False, fastMode=True, disableUndo=False, minimalEdits=True):
+    """
+    Imports several files, decoding them concurrently while the main thread only applies the decoded curves, one file
+    after the other in the given order
+
+    Parameters
+    ----------
+    jobs: list[dict]
+        Import jobs, see the region comment for their keys
+    workers: int
+        See 'iterDecodedImports'
+    prefetch: int
+        See 'iterDecodedImports'
+    processes: bool
+        See 'iterDecodedImports'
+    fastMode: bool
+        Whether to apply every file in a single undo chunk with viewport refresh and the evaluation manager suspended
+    disableUndo: bool
+        Whether to turn the undo queue off during the import instead of using an undo chunk
+    minimalEdits: bool
+        Whether to only apply what differs from the target's existing keys, see 'buildImportPlan'
+
+    Returns
+    -------
+    list[dict]
+        Per job the 'filepath', the applied 'plan' and the 'error' of a failed file
+
+    """
+    jobs = list(jobs)
+    results = []
+
+    def applyFiles():
+        decodedImports = iterDecodedImports(jobs, workers=workers, prefetch=prefetch, processes=processes)
+        while True:
+            with telemetry.phase("read"):
+                # time spent waiting on a file not decoded yet
+                decodedImport = next(decodedImports, None)
+            if decodedImport is None:
+                break
+            job, animationCurveData, error = decodedImport
+            result = {importFilepathKey: job[importFilepathKey], "plan": None, "error": error}
+            results.append(result)
+            if error is not None:
+                logger.warning(f"Could not import {job[importFilepathKey]}: {error}")
+                continue
+
+            objectName = job[importObjectKey]
+            keyframeOffset = job.get(importOffsetKey) or 0
+            attributes = job.get(importAttributesKey)
+            if minimalEdits:
+                result["plan"] = buildImportPlan(objectName, animationCurveData, keyframeOffset=keyframeOffset, attributes=attributes)
+                applyImportPlan(result["plan"])
+            else:
+                applyCurveData(objectName, animationCurveData, keyframeOffset=keyframeOffset, attributes=attributes)
+
+    with telemetry.recordJob("importFiles", filepath=filepathSeparator.join(job[importFilepathKey] for job in jobs)), \
+            profiling.profiledJob("importFiles", filepath=jobs[0][importFilepathKey] if jobs else None):
+        if not fastMode:
+            applyFiles()
+        else:
+            with suspendedSceneUpdates(chunkName="importFiles", disableUndo=disableUndo):
+                applyFiles()
+    return results
+
+# endregion
+
+def _recordedJob(jobType):
+    """
+    Records the decorated AnimationPort method as a telemetry job, counting the maya commands it runs, and profiles it
+    while profiling is enabled
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, filepath, *args, **kwargs):
+            with telemetry.recordJob(jobType, objectName=self.targetObject(), filepath=filepath), \
+                    profiling.profiledJob(jobType, objectName=self.targetObject(), filepath=filepath):
+                return method(self, filepath, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class AnimationPort(object):
+
+    def __init__(self, objectName):
+        """
+        Facilitates the importing and exporting of animation curves for the provided object
+
+        Parameters
+        ----------
+        objectName: str
+            The unique name for the target object
+        """
+        super().__init__()
+        self._targetObject = objectName
+
+    def targetObject(self):
+        return self._targetObject
+
+    def setTargetObject(self, objectName):
+        self._targetObject = objectName
+
+    def getCurveData(self, startFrame=None, endFrame=None, attributes=None, bakeStep=None, reduceTolerance=None, queryCache=None):
+        """
+        Reads the target object's animation curves in the exported file layout. See 'iterCurves' for the parameters
+
+        Returns
+        -------
+        dict
+            Attribute name to keyframe time to keyframe data
+
+        """
+        return dict(self.iterCurves(
+            startFrame=startFrame,
+            endFrame=endFrame,
+            attributes=attributes,
+            bakeStep=bakeStep,
+            reduceTolerance=reduceTolerance,
+            queryCache=queryCache
+        ))
+
+    def iterCurves(self, startFrame=None, endFrame=None, attributes=None, bakeStep=None, reduceTolerance=None, queryCache=None):
+        """
+        Reads the target object's animation curves one at a time
+
+        Parameters
+        ----------
+        startFrame: float
+            First frame to export, defaults to the first key, or the playback start when baking
+        endFrame: float
+            Last frame to export, defaults to the last key, or the playback end when baking
+        attributes: list[str]
+            Attributes to export, defaults to the animated attributes, or every keyable attribute when baking
+        bakeStep: float
+            When given the attributes are sampled every 'bakeStep' frames instead of reading their keys
+        reduceTolerance: float
+            When given linear keys that are within this tolerance of their neighbours' interpolation are removed, a
+            tolerance of 0 keeps every key
+        queryCache: QueryCache
+            Job cache for the maya queries, a new one is used for this call when not given
+
+        Returns
+        -------
+        generator
+            (attribute, attributeCurveData)
+
+        """
+        curves = iterObjectCurves(
+            [self.targetObject()],
+            attributes=attributes,
+            frameRange=(startFrame, endFrame),
+            bakeStep=bakeStep,
+            queryCache=queryCache
+        )
+        if reduceTolerance:
+            curves = reduceCurves(curves, tolerance=reduceTolerance)
+        return curveItems(curves)
+
+    @_recordedJob("export")
+    def exportCurveData(self, filepath, startFrame=None, endFrame=None, attributes=None, bakeStep=None, reduceTolerance=None, encoding=None, compressionLevel=None, queryCache=None, collapseCurves=True, indexLibrary=True, precision=None):
+        """
+        Writes the target object's animation curves to the given file. See 'getCurveData' for the curve parameters
+
+        Parameters
+        ----------
+        filepath: str
+            File to write, a '.gz', '.bz2', '.xz' or '.zst' extension compresses it
+        encoding: str
+            Serializer name, see 'writeJson'
+        compressionLevel: int
+            Compression level for compressed file extensions
+        queryCache: QueryCache
+            Job cache for the maya queries
+        collapseCurves: bool
+            Whether to write constant and repeated curves in their collapsed form
+        indexLibrary: bool
+            Whether to add the written curves to the library index
+        precision: dict
+            Decimals to round 'times', 'values', 'angles' and 'weights' to, see 'roundCurve'. Defaults to
+            'exportPrecision', an empty dictionary writes every float in full
+
+        """
+        if precision is None:
+            precision = exportPrecision()
+        curves = self.iterCurves(
+            startFrame=startFrame,
+            endFrame=endFrame,
+            attributes=attributes,
+            bakeStep=bakeStep,
+            reduceTolerance=reduceTolerance,
+            queryCache=queryCache
+        )
+        if collapseCurves:
+            curves = iterCollapsedCurves(curves)
+        precisionLoss = {}
+        curves = storedItems(curves, precision, precisionLoss)
+        indexEntries = []
+        if indexLibrary:
+            # described as stored, so the index hashes the same values a rescan of the file reads
+            curves = libraryindex.collectCurveEntries(curves, indexEntries)
+        writeJson(filepath, curves, encoding=encoding, compressionLevel=compressionLevel)
+        reportPrecisionLoss(filepath, precisionLoss)
+        if indexLibrary:
+            libraryindex.recordExport(filepath, self.targetObject(), indexEntries)
+        print("\n\nExport Complete\n\n")
+
+    @_recordedJob("exportClips")
+    def exportClips(self, filepath, clips, attributes=None, bakeStep=None, reduceTolerance=None, separateFiles=False, rebase=False, encoding=None, compressionLevel=None, queryCache=None, collapseCurves=True, indexLibrary=True, memoryBudget=None, precision=None):
+        """
+        Exports several frame ranges while reading each curve only once. The clips are written as sections of one
+        file, keyed by clip name, or as one file per clip named '<file>_<clip name>'
+
+        Parameters
+        ----------
+        filepath: str
+            File to write
+        clips: list[dict]
+            Clips with a 'name', 'start' and 'end' frame
+        attributes: list[str]
+            Attributes to export, see 'getCurveData'
+        bakeStep: float
+            See 'getCurveData'
+        reduceTolerance: float
+            See 'getCurveData'
+        separateFiles: bool
+            Whether to write one file per clip instead of one file with a section per clip
+        rebase: bool
+            Whether every clip should start at frame 0
+        encoding: str
+            Serializer name, see 'writeJson'
+        compressionLevel: int
+            Compression level for compressed file extensions
+        queryCache: QueryCache
+            Job cache for the maya queries
+        collapseCurves: bool
+            Whether to write constant and repeated curves in their collapsed form
+        indexLibrary: bool
+            Whether to add the written curves to the library index
+        memoryBudget: int
+            Bytes of sliced curves held until they are written before they spill to disk, shared evenly by the clips.
+            Defaults to 'exportMemoryBudget'
+        precision: dict
+            Decimals to round 'times', 'values', 'angles' and 'weights' to, see 'exportCurveData'
+
+        Returns
+        -------
+        list[str]
+            The written files
+
+        """
+        if not clips:
+            return []
+        if memoryBudget is None:
+            memoryBudget = exportMemoryBudget()
+        clipMemoryBudget = memoryBudget // len(clips) if memoryBudget else None
+        if precision is None:
+            precision = exportPrecision()
+
+        curves = self.iterCurves(
+            startFrame=min(float(clip[clipStartKey]) for clip in clips),
+            endFrame=max(float(clip[clipEndKey]) for clip in clips),
+            attributes=attributes,
+            bakeStep=bakeStep,
+            reduceTolerance=reduceTolerance,
+            queryCache=queryCache
+        )
+        with contextlib.ExitStack() as stack:
+            # slice each curve as it is read so the unsliced curves are never held all at once
+            clipCurves = {clip[clipNameKey]: stack.enter_context(SpillBuffer(clipMemoryBudget)) for clip in clips}
+            for attr, attributeCurveData in curves:
+                for clipName, curveData in sliceClips({attr: attributeCurveData}, clips, rebase=rebase).items():
+                    for clipAttr, clipAttributeCurveData in curveData.items():
+                        clipCurves[clipName].append(clipAttr, clipAttributeCurveData)
+
+            def clipItems(clipName):
+                items = clipCurves[clipName].items()
+                return iterCollapsedCurves(items) if collapseCurves else items
+
+            if not separateFiles:
+                # every clip is one top level entry of the file, so only the clip being written is read back whole
+                precisionLoss = {}
+                indexEntries = []
+                items = storedItems(((clipName, dict(clipItems(clipName))) for clipName in clipCurves), precision, precisionLoss, clips=True)
+                if indexLibrary:
+                    items = libraryindex.collectCurveEntries(items, indexEntries, clips=True)
+                writeJson(filepath, items, encoding=encoding, compressionLevel=compressionLevel, clips=True)
+                reportPrecisionLoss(filepath, precisionLoss)
+                if indexLibrary:
+                    libraryindex.recordExport(filepath, self.targetObject(), indexEntries)
+                return [filepath]
+
+            filepaths = []
+            for clipName in clipCurves:
+                _clipFilepath = clipFilepath(filepath, clipName)
+                precisionLoss = {}
+                indexEntries = []
+                items = storedItems(clipItems(clipName), precision, precisionLoss)
+                if indexLibrary:
+                    items = libraryindex.collectCurveEntries(items, indexEntries, clip=clipName)
+                writeJson(_clipFilepath, items, encoding=encoding, compressionLevel=compressionLevel)
+                reportPrecisionLoss(_clipFilepath, precisionLoss)
+                if indexLibrary:
+                    libraryindex.recordExport(_clipFilepath, self.targetObject(), indexEntries)
+                filepaths.append(_clipFilepath)
+            return filepaths
+
+    @_recordedJob("import")
+    def importCurveData(self, filepath, keyframeOffset=0, attributes=None, fastMode=True, disableUndo=False, timeTransform=None, clip=None, minimalEdits=True):
+        """
+        Applies the animation curves in the given file to the target object
+
+        Parameters
+        ----------
+        filepath: str
+            Animation file to import
+        keyframeOffset: float
+            Frames to offset every key by
+        attributes: list[str]
+            Attributes to import, defaults to every attribute in the file
+        fastMode: bool
+            Whether to apply the keys in a single undo chunk with viewport refresh and the evaluation manager suspended
+        disableUndo: bool
+            Whether to turn the undo queue off during the import instead of using an undo chunk
+        timeTransform: timetransform.TimeTransform
+            Retimes the whole curves before any key is set, 'keyframeOffset' is added afterwards
+        clip: str
+            Name of the clip section to import from a multi-clip file, required for those and refused for any other
+        minimalEdits: bool
+            Whether to compare against the target's existing keys first and only edit what differs, removing existing
+            keys within the imported range that the file does not have
+
+        Returns
+        -------
+        ImportPlan
+            The applied plan, None when 'minimalEdits' is off
+
+        """
+        animationCurveData = clipCurveData(filepath, readJson(filepath), clip=clip)
+        if timeTransform is not None and not timeTransform.isIdentity():
+            animationCurveData = timeTransform.applyToCurveData(animationCurveData)
+
+        plan = None
+        if minimalEdits:
+            plan = buildImportPlan(self.targetObject(), animationCurveData, keyframeOffset=keyframeOffset, attributes=attributes)
+            if not plan.editCount():
+                return plan
+
+        def applyImport():
+            if plan is not None:
+                applyImportPlan(plan)
+            else:
+                self._applyCurveData(animationCurveData, keyframeOffset, attributes)
+
+        if not fastMode:
+            applyImport()
+            return plan
+
+        with suspendedSceneUpdates(chunkName=f"importCurveData_{self.targetObject()}", disableUndo=disableUndo):
+            applyImport()
+        return plan
+
+    def _applyCurveData(self, animationCurveData, keyframeOffset=0, attributes=None):
+        applyCurveData(self.targetObject(), animationCurveData, keyframeOffset=keyframeOffset, attributes=attributes)
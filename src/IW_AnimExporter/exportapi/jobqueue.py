@@ -0,0 +1,215 @@
+import itertools
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+from . import telemetry
+
+#   Export and import jobs queued from the interface. The queue itself only keeps order and state, running a job is
+#   left to the controller, which runs them one after the other on the main thread as Maya requires.
+#
+#   Jobs for the same object are coalesced while they wait: a second export of an object replaces the settings of the
+#   export already queued for it instead of exporting it twice. Imports coalesce when they also read the same file.
+
+statusPending = "pending"
+statusRunning = "running"
+statusDone = "done"
+statusFailed = "failed"
+
+jobTypeExport = "export"
+jobTypeImport = "import"
+
+_jobIds = itertools.count(1)
+
+
+class PortJob(object):
+
+    def __init__(self, jobType, objectName, filepath, portMethod, animationData, maxRetries=1):
+        """
+        A queued export or import
+
+        Parameters
+        ----------
+        jobType: str
+            'export' or 'import'
+        objectName: str
+        filepath: str
+        portMethod: str
+            Name of the controller method running the job
+        animationData: dict
+            Port panel data the job runs with
+        maxRetries: int
+            Times a failed job is run again before it is marked failed
+        """
+        super().__init__()
+        self.jobId = next(_jobIds)
+        self.jobType = jobType
+        self.objectName = objectName
+        self.filepath = filepath
+        self.portMethod = portMethod
+        self.animationData = animationData
+        self.maxRetries = maxRetries
+        self.status = statusPending
+        self.attempts = 0
+        self.error = None
+        self.duration = None
+        self.estimatedDuration = None
+
+    def coalesceKey(self):
+        if self.jobType == jobTypeExport:
+            return self.jobType, self.objectName
+        return self.jobType, self.objectName, self.filepath
+
+    def asDict(self):
+        return {
+            "jobId": self.jobId,
+            "jobType": self.jobType,
+            "objectName": self.objectName,
+            "filepath": self.filepath,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "duration": self.duration,
+            "estimatedDuration": self.estimatedDuration,
+        }
+
+
+class DurationEstimator(object):
+
+    def __init__(self, records=None):
+        """
+        Estimates job durations from earlier telemetry records, by object when that object ran before, else by job
+        type
+
+        Parameters
+        ----------
+        records: list[dict]
+            Telemetry records, read from the telemetry log when not given
+        """
+        super().__init__()
+        self._objectDurations = {}
+        self._typeDurations = {}
+        if records is None:
+            records = telemetry.readRecords()
+        for record in records:
+            if record.get("status") == "ok" and record.get("duration") is not None:
+                self.addDuration(record.get("jobType"), record.get("objectName"), record["duration"])
+
+    @staticmethod
+    def _add(durations, key, duration):
+        total, count = durations.get(key, (0.0, 0))
+        durations[key] = (total + duration, count + 1)
+
+    def addDuration(self, jobType, objectName, duration):
+        self._add(self._objectDurations, (jobType, objectName), duration)
+        self._add(self._typeDurations, jobType, duration)
+
+    def estimate(self, jobType, objectName):
+        """
+        Returns
+        -------
+        float or None
+            Mean earlier duration in seconds, None without any earlier job of the type
+        """
+        total, count = self._objectDurations.get((jobType, objectName)) or self._typeDurations.get(jobType) or (0.0, 0)
+        return total / count if count else None
+
+
+class JobQueue(object):
+
+    def __init__(self, estimator=None):
+        """
+        Ordered export and import jobs with their state
+
+        Parameters
+        ----------
+        estimator: DurationEstimator
+        """
+        super().__init__()
+        self.jobs = []
+        self.estimator = estimator or DurationEstimator()
+
+    def enqueue(self, job):
+        """
+        Adds a job, or updates the waiting job for the same object with the new job's settings
+
+        Parameters
+        ----------
+        job: PortJob
+
+        Returns
+        -------
+        PortJob
+            The queued job, which is the existing one when the new job was coalesced into it
+
+        """
+        for queuedJob in self.jobs:
+            if queuedJob.status == statusPending and queuedJob.coalesceKey() == job.coalesceKey():
+                queuedJob.filepath = job.filepath
+                queuedJob.portMethod = job.portMethod
+                queuedJob.animationData = job.animationData
+                logger.debug(f"Coalesced {job.jobType} of {job.objectName} into job {queuedJob.jobId}")
+                return queuedJob
+
+        job.estimatedDuration = self.estimator.estimate(job.jobType, job.objectName)
+        self.jobs.append(job)
+        return job
+
+    def job(self, jobId):
+        for job in self.jobs:
+            if job.jobId == jobId:
+                return job
+        return None
+
+    def move(self, jobId, offset):
+        """
+        Moves a job up, negative offsets, or down the queue
+        """
+        job = self.job(jobId)
+        if job is None:
+            return
+        index = self.jobs.index(job)
+        newIndex = min(max(index + offset, 0), len(self.jobs) - 1)
+        self.jobs.insert(newIndex, self.jobs.pop(index))
+
+    def remove(self, jobId):
+        job = self.job(jobId)
+        if job is not None and job.status != statusRunning:
+            self.jobs.remove(job)
+
+    def clearFinished(self):
+        self.jobs = [job for job in self.jobs if job.status not in (statusDone, statusFailed)]
+
+    def nextPending(self):
+        for job in self.jobs:
+            if job.status == statusPending:
+                return job
+        return None
+
+    def jobStarted(self, job):
+        job.status = statusRunning
+        job.attempts += 1
+        job.error = None
+
+    def jobFinished(self, job, duration, error=None):
+        """
+        Records a job's outcome. A failed job with retries left waits again at its place in the queue
+        """
+        job.duration = duration
+        if error is None:
+            job.status = statusDone
+            self.estimator.addDuration(job.jobType, job.objectName, duration)
+            return
+        job.error = error
+        job.status = statusPending if job.attempts <= job.maxRetries else statusFailed
+        logger.warning(f"{job.jobType} of {job.objectName} failed on attempt {job.attempts}: {error}")
+
+    def remainingDuration(self):
+        """
+        Gets the estimated seconds until every waiting job ran, jobs without an estimate are left out
+        """
+        return sum(job.estimatedDuration or 0.0 for job in self.jobs if job.status in (statusPending, statusRunning))
+
+    def asList(self):
+        return [job.asDict() for job in self.jobs]
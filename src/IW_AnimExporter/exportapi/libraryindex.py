@@ -0,0 +1,451 @@
+import sys, os, json, time, sqlite3, hashlib, tempfile, argparse
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# region Local Imports
+parentPackageDir = os.path.dirname(os.path.dirname(__file__))
+if parentPackageDir not in sys.path:
+    sys.path.append(parentPackageDir)
+
+import resources
+# endregion
+
+from . import exporthandler
+
+#   A local sqlite database of every curve in the exported files, so a curve can be found without opening the files.
+#   Exports add their curves as they are written, 'LibraryIndex.scan' catches up with files changed on disk by
+#   comparing modification times. Files are keyed by their absolute, normalized path.
+
+libraryIndexEnvironmentVariable = "IW_ANIMEXPORTER_LIBRARY_INDEX"
+
+# file extensions of animation files, including the compressed ones
+animationFileExtensions = (".json", ".msgpack", ".gz", ".bz2", ".xz", ".zst")
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    objectName TEXT,
+    indexedAt REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS curves (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    clip TEXT,
+    objectName TEXT,
+    attribute TEXT NOT NULL,
+    keyCount INTEGER NOT NULL,
+    startTime REAL,
+    endTime REAL,
+    curveHash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS curvesObjectAttribute ON curves (objectName, attribute);
+CREATE INDEX IF NOT EXISTS curvesAttribute ON curves (attribute);
+CREATE INDEX IF NOT EXISTS curvesHash ON curves (curveHash);
+CREATE INDEX IF NOT EXISTS curvesPath ON curves (path);
+"""
+
+
+def libraryIndexFilepath():
+    """
+    Gets the index database, from the environment, then the app config, then the temp directory
+
+    Returns
+    -------
+    str
+
+    """
+    _filepath = os.environ.get(libraryIndexEnvironmentVariable) or resources.libraryIndex()
+    if not _filepath:
+        _filepath = os.path.join(tempfile.gettempdir(), "IW_AnimExporter", "library.sqlite")
+    return _filepath
+
+def _normalizedPath(filepath):
+    return os.path.normcase(os.path.abspath(filepath))
+
+def curveHash(attributeCurveData):
+    """
+    Hashes a curve's keys independently of key order and of whether its times are strings or floats
+
+    Parameters
+    ----------
+    attributeCurveData: dict
+        Keyframe time to keyframe data
+
+    Returns
+    -------
+    str
+
+    """
+    keys = sorted((float(keyframeTime), sorted(keyframeData.items())) for keyframeTime, keyframeData in attributeCurveData.items())
+    return hashlib.sha1(json.dumps(keys, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def curveEntry(attribute, attributeCurveData, clip=None):
+    """
+    Describes one curve for the index
+
+    Parameters
+    ----------
+    attribute: str
+    attributeCurveData: dict
+        Keyframe time to keyframe data, expanded
+    clip: str
+        Clip section of the curve in a multi-clip file
+
+    Returns
+    -------
+    dict
+
+    """
+    keyframeTimes = [float(keyframeTime) for keyframeTime in attributeCurveData]
+    return {
+        "clip": clip,
+        "attribute": attribute,
+        "keyCount": len(keyframeTimes),
+        "startTime": min(keyframeTimes) if keyframeTimes else None,
+        "endTime": max(keyframeTimes) if keyframeTimes else None,
+        "curveHash": curveHash(attributeCurveData),
+    }
+
+def collectCurveEntries(items, entries, clip=None, clips=None):
+    """
+    Passes a stream of top level entries through unchanged while describing each curve into 'entries', so an export
+    can index what it writes without reading the file back. Collapsed curves, columns and clip sections are expanded
+    the way a reader expands them, so an entry matches the one 'fileCurveEntries' gives for the written file.
+
+    No curve is held on to. A reference curve can only be hashed once the curve it references is known again, so it
+    is described by a pending entry instead, see 'resolveCurveEntries'
+
+    Parameters
+    ----------
+    items: iterable
+        (key, value) pairs as they are written, see 'exporthandler.storedItems'
+    entries: list
+        Receives a 'curveEntry' per curve
+    clip: str
+    clips: bool
+        Whether the entries are clip sections, see 'exporthandler._isCurveSection'
+
+    Returns
+    -------
+    generator
+        The same (key, value) pairs
+
+    """
+    for key, entry in items:
+        if exporthandler._isCurveSection(entry, clips):
+            # a section is written whole, so its references resolve against the section itself
+            for attr, sectionEntry in entry.items():
+                entries.append(curveEntry(attr, _expandedSectionCurve(sectionEntry, entry), clip=key))
+        elif exporthandler.isCollapsedCurve(entry) and exporthandler.referenceCurveKey in entry:
+            entries.append(_pendingCurveEntry(key, entry, clip=clip))
+        elif exporthandler.isCollapsedCurve(entry):
+            entries.append(curveEntry(key, exporthandler.expandCurve(entry, {}), clip=clip))
+        else:
+            entries.append(curveEntry(key, exporthandler.curveLayout(entry, columnar=False), clip=clip))
+        yield key, entry
+
+def _expandedSectionCurve(entry, section):
+    if not exporthandler.isCollapsedCurve(entry):
+        return exporthandler.curveLayout(entry, columnar=False)
+    referenceAttr = entry.get(exporthandler.referenceCurveKey)
+    expandedCurves = {referenceAttr: exporthandler.curveLayout(section[referenceAttr], columnar=False)} if referenceAttr in section else {}
+    return exporthandler.expandCurve(entry, expandedCurves)
+
+def _pendingCurveEntry(attribute, entry, clip=None):
+    return {
+        "clip": clip,
+        "attribute": attribute,
+        exporthandler.referenceCurveKey: entry[exporthandler.referenceCurveKey],
+        exporthandler.referenceOffsetKey: entry.get(exporthandler.referenceOffsetKey, 0.0),
+    }
+
+def resolveCurveEntries(filepath, entries):
+    """
+    Completes the pending entries 'collectCurveEntries' left for reference curves, reading back only the curves they
+    reference from the written file. Files without reference curves are not read
+
+    Parameters
+    ----------
+    filepath: str
+        The file the entries were collected from
+    entries: list
+        Curve entries, completed in place
+
+    Returns
+    -------
+    list
+        The same entries
+
+    """
+    pending = [index for index, entry in enumerate(entries) if exporthandler.referenceCurveKey in entry]
+    if not pending:
+        return entries
+
+    referencedAttrs = {entries[index][exporthandler.referenceCurveKey] for index in pending}
+    referenceCurves = {}
+    for key, entry in exporthandler.iterJson(filepath, expand=False):
+        if key in referencedAttrs:
+            referenceCurves[key] = exporthandler.curveLayout(entry, columnar=False)
+
+    for index in pending:
+        entry = entries[index]
+        reference = {key: entry[key] for key in (exporthandler.referenceCurveKey, exporthandler.referenceOffsetKey)}
+        entries[index] = curveEntry(entry["attribute"], exporthandler.expandCurve(reference, referenceCurves), clip=entry["clip"])
+    return entries
+
+def fileCurveEntries(filepath):
+    """
+    Reads an animation file and describes every curve in it, clip sections included
+    """
+    entries = []
+    clips = exporthandler.fileHasClips(filepath)
+    for key, entry in exporthandler.iterJson(filepath):
+        if clips:
+            entries.extend(curveEntry(attr, attributeCurveData, clip=key) for attr, attributeCurveData in entry.items())
+        else:
+            entries.append(curveEntry(key, entry))
+    return entries
+
+def _likePattern(pattern):
+    # '*' and '?' wildcards from the search fields, with sql wildcards in the names themselves escaped
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "%").replace("?", "_")
+
+
+class LibraryIndex(object):
+
+    def __init__(self, filepath=None):
+        """
+        Opens, and creates when needed, the index database
+
+        Parameters
+        ----------
+        filepath: str
+            Database file, defaults to 'libraryIndexFilepath'
+        """
+        super().__init__()
+        self.filepath = filepath or libraryIndexFilepath()
+        if self.filepath != ":memory:":
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        self._connection = sqlite3.connect(self.filepath, timeout=10.0)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if self.filepath != ":memory:":
+            # readers do not block the exporter's writes
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_schema)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def addFile(self, filepath, entries, objectName=None):
+        """
+        Replaces everything indexed for the file by the given curve entries
+
+        Parameters
+        ----------
+        filepath: str
+        entries: list[dict]
+            See 'curveEntry'
+        objectName: str
+            Object the file was exported from, defaults to the file name as exports are named after their object
+
+        """
+        path = _normalizedPath(filepath)
+        if objectName is None:
+            objectName = exporthandler.objectNameFromFilepath(filepath)
+        stat = os.stat(filepath)
+        with self._connection:
+            self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._connection.execute(
+                "INSERT INTO files (path, mtime, size, objectName, indexedAt) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, objectName, time.time())
+            )
+            self._connection.executemany(
+                "INSERT INTO curves (path, clip, objectName, attribute, keyCount, startTime, endTime, curveHash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (path, entry["clip"], objectName, entry["attribute"], entry["keyCount"], entry["startTime"], entry["endTime"], entry["curveHash"])
+                    for entry in entries
+                ]
+            )
+
+    def indexFile(self, filepath, objectName=None):
+        """
+        Reads the file and indexes its curves
+        """
+        self.addFile(filepath, fileCurveEntries(filepath), objectName=objectName)
+
+    def removeFile(self, filepath):
+        with self._connection:
+            self._connection.execute("DELETE FROM files WHERE path = ?", (_normalizedPath(filepath),))
+
+    def scan(self, directories, extensions=animationFileExtensions):
+        """
+        Brings the index up to date with the files under the given directories. Only files whose modification time
+        or size changed are read again, indexed files that no longer exist are removed
+
+        Parameters
+        ----------
+        directories: list[str]
+        extensions: tuple(str)
+            File extensions of animation files
+
+        Returns
+        -------
+        dict
+            Counts of 'indexed', 'unchanged', 'removed' and 'failed' files
+
+        """
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        for directory in directories:
+            root = _normalizedPath(directory)
+            known = {
+                row["path"]: (row["mtime"], row["size"])
+                for row in self._connection.execute(
+                    "SELECT path, mtime, size FROM files WHERE path LIKE ? ESCAPE '\\'",
+                    (_likePattern(os.path.join(root, "")) + "%",)
+                )
+            }
+
+            for dirpath, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    if not filename.lower().endswith(extensions) or filename.startswith(exporthandler.temporaryFilePrefix):
+                        continue
+                    filepath = os.path.join(dirpath, filename)
+                    path = _normalizedPath(filepath)
+                    try:
+                        stat = os.stat(filepath)
+                    except OSError:
+                        continue
+                    if known.pop(path, None) == (stat.st_mtime_ns, stat.st_size):
+                        counts["unchanged"] += 1
+                        continue
+                    try:
+                        self.indexFile(filepath)
+                        counts["indexed"] += 1
+                    except Exception as e:
+                        logger.warning(f"Could not index {filepath}: {e}")
+                        counts["failed"] += 1
+
+            for path in known:
+                self.removeFile(path)
+                counts["removed"] += 1
+        return counts
+
+    def findCurves(self, objectName=None, attribute=None, startFrame=None, endFrame=None, curveHash=None, limit=1000):
+        """
+        Finds indexed curves. Names accept '*' and '?' wildcards
+
+        Parameters
+        ----------
+        objectName: str
+        attribute: str
+        startFrame: float
+            Only curves keyed from this frame or earlier
+        endFrame: float
+            Only curves keyed up to this frame or later
+        curveHash: str
+            Only curves identical to the curve with this hash
+        limit: int
+
+        Returns
+        -------
+        list[dict]
+            The file 'path', 'clip', 'objectName', 'attribute', 'keyCount', 'startTime', 'endTime' and 'curveHash' of
+            every matching curve
+
+        """
+        conditions = []
+        parameters = []
+        for column, pattern in (("objectName", objectName), ("attribute", attribute)):
+            if not pattern:
+                continue
+            if "*" in pattern or "?" in pattern:
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                parameters.append(_likePattern(pattern))
+            else:
+                conditions.append(f"{column} = ?")
+                parameters.append(pattern)
+        if startFrame is not None:
+            conditions.append("startTime <= ?")
+            parameters.append(float(startFrame))
+        if endFrame is not None:
+            conditions.append("endTime >= ?")
+            parameters.append(float(endFrame))
+        if curveHash:
+            conditions.append("curveHash = ?")
+            parameters.append(curveHash)
+
+        query = "SELECT path, clip, objectName, attribute, keyCount, startTime, endTime, curveHash FROM curves"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path, clip, attribute LIMIT ?"
+        parameters.append(int(limit))
+        return [dict(row) for row in self._connection.execute(query, parameters)]
+
+    def findFiles(self, **kwargs):
+        """
+        Gets the distinct files containing a matching curve, see 'findCurves' for the keyword arguments
+
+        Returns
+        -------
+        list[str]
+
+        """
+        files = []
+        for curve in self.findCurves(**kwargs):
+            if curve["path"] not in files:
+                files.append(curve["path"])
+        return files
+
+
+def recordExport(filepath, objectName, entries):
+    """
+    Adds a just written export to the default index, resolving the entries of its reference curves first. Indexing
+    must never fail the export itself
+    """
+    try:
+        resolveCurveEntries(filepath, entries)
+        with LibraryIndex() as index:
+            index.addFile(filepath, entries, objectName=objectName)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.warning(f"Could not index {filepath}: {e}")
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Update and search the animation library index")
+    parser.add_argument("--index", default=None, help="Index database, defaults to the configured one")
+    parser.add_argument("--scan", nargs="*", default=None, help="Directories to rescan, defaults to the configured library roots")
+    parser.add_argument("--object", default=None)
+    parser.add_argument("--attribute", default=None)
+    parser.add_argument("--start", type=float, default=None)
+    parser.add_argument("--end", type=float, default=None)
+    options = parser.parse_args(args)
+
+    with LibraryIndex(options.index) as index:
+        if options.scan is not None:
+            directories = options.scan or resources.libraryRoots()
+            _start = time.perf_counter()
+            counts = index.scan(directories)
+            print(f"Scanned {', '.join(directories)} in {time.perf_counter() - _start:.2f}s: {counts}")
+
+        if options.object or options.attribute or options.start is not None or options.end is not None:
+            _start = time.perf_counter()
+            curves = index.findCurves(objectName=options.object, attribute=options.attribute, startFrame=options.start, endFrame=options.end)
+            for curve in curves:
+                clip = f" [{curve['clip']}]" if curve["clip"] else ""
+                print(f"{curve['path']}{clip}: {curve['objectName']}.{curve['attribute']} {curve['keyCount']} keys {curve['startTime']}-{curve['endTime']}")
+            print(f"{len(curves)} curves in {(time.perf_counter() - _start) * 1000.0:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import sys, os, io, pstats, cProfile, datetime, tempfile, argparse, functools, contextlib
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# region Local Imports
+parentPackageDir = os.path.dirname(os.path.dirname(__file__))
+if parentPackageDir not in sys.path:
+    sys.path.append(parentPackageDir)
+
+import resources
+# endregion
+
+#   On demand cProfile capture of single export or import jobs. Profiling is switched on through the environment or
+#   from the interface, while it is off a profiled job only checks one module level flag. Every profiled job writes a
+#   '.prof' file, readable with pstats or snakeviz, and a short text report of its hottest functions next to it.
+#   Jobs started inside a profiled job are part of its profile and do not write their own, so the interface slots
+#   starting an export or import are not profiled themselves and leave naming and placing the profile to the job.
+
+profileEnvironmentVariable = "IW_ANIMEXPORTER_PROFILE"
+profileDirectoryEnvironmentVariable = "IW_ANIMEXPORTER_PROFILE_DIR"
+
+reportFunctionCount = 25
+
+_enabled = os.environ.get(profileEnvironmentVariable, "").lower() not in ("", "0", "false", "no", "off")
+_activeProfile = None
+
+
+def isEnabled():
+    return _enabled
+
+def setEnabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+    logger.info(f"Job profiling {'enabled' if _enabled else 'disabled'}")
+
+def profileDirectory(filepath=None):
+    """
+    Gets the directory profiles are written to, from the environment, then the app config, then next to the job's file,
+    then the temp directory
+
+    Parameters
+    ----------
+    filepath: str
+        File the profiled job exports or imports
+
+    Returns
+    -------
+    str
+
+    """
+    _directory = os.environ.get(profileDirectoryEnvironmentVariable) or resources.profileDirectory()
+    if not _directory and filepath:
+        _directory = os.path.dirname(os.path.abspath(filepath))
+    if not _directory:
+        _directory = os.path.join(tempfile.gettempdir(), "IW_AnimExporter", "profiles")
+    return _directory
+
+def _profileName(jobName, objectName=None, filepath=None):
+    _label = objectName or (os.path.basename(filepath).split(".")[0] if filepath else None)
+    _parts = [jobName] + ([_label] if _label else []) + [datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")]
+    # object names may hold namespaces and dag paths
+    return "_".join(_parts).replace(":", "_").replace("|", "_")
+
+def hotFunctionReport(stats, count=reportFunctionCount):
+    """
+    Formats the functions taking the most time, once by their own time and once including the functions they call
+
+    Parameters
+    ----------
+    stats: pstats.Stats
+    count: int
+        Functions listed per ordering
+
+    Returns
+    -------
+    str
+
+    """
+    stream = io.StringIO()
+    stats.stream = stream
+    stream.write(f"{stats.total_calls} calls in {stats.total_tt:.3f}s\n\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(count)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(count)
+    return stream.getvalue()
+
+def writeProfile(profile, jobName, objectName=None, filepath=None):
+    """
+    Writes the '.prof' file of a finished profile and its hot function report next to it
+
+    Returns
+    -------
+    str or None
+        The '.prof' file, None when it could not be written
+
+    """
+    _name = _profileName(jobName, objectName=objectName, filepath=filepath)
+    _directory = profileDirectory(filepath)
+    profileFilepath = os.path.join(_directory, f"{_name}.prof")
+    try:
+        os.makedirs(_directory, exist_ok=True)
+        profile.dump_stats(profileFilepath)
+        with open(os.path.join(_directory, f"{_name}.txt"), "w") as file:
+            file.write(" ".join(part for part in (jobName, objectName, filepath) if part) + "\n")
+            file.write(hotFunctionReport(pstats.Stats(profile)))
+    except OSError as e:
+        # losing a profile must never fail the job itself
+        logger.warning(f"Could not write profile to {profileFilepath}: {e}")
+        return None
+    logger.info(f"Wrote profile of {jobName} to {profileFilepath}")
+    return profileFilepath
+
+@contextlib.contextmanager
+def profiledJob(jobName, objectName=None, filepath=None):
+    """
+    Profiles the job run inside the context while profiling is enabled. Nested jobs are part of the outer profile
+
+    Parameters
+    ----------
+    jobName: str
+        e.g. 'export' or 'import', starts the profile's file name
+    objectName: str
+    filepath: str
+        File the job exports or imports, profiles are written next to it without a configured directory
+
+    """
+    global _activeProfile
+    if not _enabled or _activeProfile is not None:
+        yield
+        return
+
+    profile = cProfile.Profile()
+    _activeProfile = profile
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        _activeProfile = None
+        writeProfile(profile, jobName, objectName=objectName, filepath=filepath)
+
+def profiled(jobName):
+    """
+    Profiles every call of the decorated function while profiling is enabled
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with profiledJob(jobName):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Print the hot function report of a job profile")
+    parser.add_argument("profile")
+    parser.add_argument("--count", type=int, default=reportFunctionCount)
+    options = parser.parse_args(args)
+
+    print(hotFunctionReport(pstats.Stats(options.profile), count=options.count))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
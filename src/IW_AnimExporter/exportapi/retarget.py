@@ -0,0 +1,239 @@
+import os, re
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+import maya.cmds
+
+from . import exporthandler, telemetry
+
+# counts the commands of running telemetry jobs
+cmds = telemetry.countingCommands(maya.cmds)
+
+#   Mapping rules are plain dictionaries so they can be stored in json alongside a rig:
+#
+#   {"type": "prefix", "from": "src_", "to": "tgt_"}
+#   {"type": "namespace", "from": "hero", "to": "crowd01"}          an empty "from" adds the namespace
+#   {"type": "regex", "pattern": "^L_(.*)$", "replace": "Left_\\1"}
+#   {"type": "table", "mapping": {"hip_ctrl": "COG_ctrl"}}
+#
+#   Every rule accepts "scope": "object" (default) or "attribute". Rules run in order, each one receiving the result of
+#   the previous one. A table maps names it does not contain to themselves.
+
+ruleTypePrefix = "prefix"
+ruleTypeNamespace = "namespace"
+ruleTypeRegex = "regex"
+ruleTypeTable = "table"
+
+scopeObject = "object"
+scopeAttribute = "attribute"
+
+
+def _compilePrefixRule(rule):
+    source = rule.get("from", "")
+    target = rule.get("to", "")
+
+    def mapName(name):
+        if not name.startswith(source):
+            return name
+        return f"{target}{name[len(source):]}"
+    return mapName
+
+def _compileNamespaceRule(rule):
+    source = rule.get("from", "").strip(":")
+    target = rule.get("to", "").strip(":")
+    sourcePrefix = f"{source}:" if source else ""
+    targetPrefix = f"{target}:" if target else ""
+
+    def mapName(name):
+        # each path component of a dag path carries its own namespace
+        components = []
+        for component in name.split("|"):
+            if sourcePrefix and component.startswith(sourcePrefix):
+                component = f"{targetPrefix}{component[len(sourcePrefix):]}"
+            elif not sourcePrefix and component and ":" not in component:
+                component = f"{targetPrefix}{component}"
+            components.append(component)
+        return "|".join(components)
+    return mapName
+
+def _compileRegexRule(rule):
+    pattern = re.compile(rule["pattern"])
+    replace = rule.get("replace", "")
+    return lambda name: pattern.sub(replace, name)
+
+def _compileTableRule(rule):
+    mapping = dict(rule.get("mapping", {}))
+    return lambda name: mapping.get(name, name)
+
+_ruleCompilers = {
+    ruleTypePrefix: _compilePrefixRule,
+    ruleTypeNamespace: _compileNamespaceRule,
+    ruleTypeRegex: _compileRegexRule,
+    ruleTypeTable: _compileTableRule,
+}
+
+
+class NameMapping(object):
+
+    def __init__(self, rules=None):
+        """
+        Compiles the mapping rules once so every name lookup is a chain of plain function calls
+
+        Parameters
+        ----------
+        rules: list[dict]
+            Mapping rules, see the module comment for their layout
+        """
+        super().__init__()
+        self._objectRules = []
+        self._attributeRules = []
+        for rule in rules or []:
+            compiler = _ruleCompilers.get(rule.get("type"))
+            if compiler is None:
+                raise ValueError(f"Unknown mapping rule type: {rule.get('type')}")
+            scope = rule.get("scope", scopeObject)
+            if scope == scopeObject:
+                self._objectRules.append(compiler(rule))
+            elif scope == scopeAttribute:
+                self._attributeRules.append(compiler(rule))
+            else:
+                raise ValueError(f"Unknown mapping rule scope: {scope}")
+
+    @staticmethod
+    def _mapName(name, rules):
+        for rule in rules:
+            name = rule(name)
+        return name
+
+    def mapObject(self, objectName):
+        return self._mapName(objectName, self._objectRules)
+
+    def mapAttribute(self, attribute):
+        return self._mapName(attribute, self._attributeRules)
+
+
+class RetargetPlan(object):
+
+    def __init__(self):
+        """
+        Every resolved target plug with the curve to apply to it, and the source plugs that could not be resolved
+        """
+        super().__init__()
+        self.curves = []
+        self.unresolved = []
+
+    def targetPlugs(self):
+        return [f"{targetObject}.{targetAttribute}" for targetObject, targetAttribute, _ in self.curves]
+
+
+def sourceObjectFromFilepath(filepath):
+    """
+    Gets the source object of an exported file from its name, as exports are named after the exported object
+    """
+    return exporthandler.objectNameFromFilepath(filepath)
+
+def buildRetargetPlan(sources, mapping, attributes=None):
+    """
+    Reads every file and resolves all source to target object and attribute pairs before anything is applied
+
+    Parameters
+    ----------
+    sources: list
+        Exported file paths, or (filepath, sourceObjectName) pairs for files not named after their object
+    mapping: NameMapping
+    attributes: list[str]
+        Source attributes to retarget, an empty selection retargets every attribute
+
+    Returns
+    -------
+    RetargetPlan
+
+    """
+    plan = RetargetPlan()
+    candidates = []
+    for source in sources:
+        if isinstance(source, (list, tuple)):
+            filepath, sourceObject = source
+        else:
+            filepath, sourceObject = source, sourceObjectFromFilepath(source)
+
+        targetObject = mapping.mapObject(sourceObject)
+        fileCurveData = exporthandler.selectedCurveData(sourceObject, exporthandler.clipCurveData(filepath, exporthandler.readJson(filepath)), attributes)
+        for attr, attributeCurveData in fileCurveData.items():
+            candidates.append((f"{sourceObject}.{attr}", targetObject, mapping.mapAttribute(attr), attributeCurveData))
+
+    # resolve existence once per unique target plug
+    existingPlugs = {}
+    for sourcePlug, targetObject, targetAttribute, attributeCurveData in candidates:
+        targetPlug = f"{targetObject}.{targetAttribute}"
+        if targetPlug not in existingPlugs:
+            existingPlugs[targetPlug] = cmds.objExists(targetPlug)
+        if not existingPlugs[targetPlug]:
+            plan.unresolved.append((sourcePlug, targetPlug))
+            continue
+        plan.curves.append((targetObject, targetAttribute, attributeCurveData))
+
+    for sourcePlug, targetPlug in plan.unresolved:
+        logger.warning(f"Could not retarget {sourcePlug}, {targetPlug} does not exist")
+    return plan
+
+def applyRetargetPlan(plan, keyframeOffset=0, timeTransform=None, fastMode=True, disableUndo=False):
+    """
+    Applies every curve of the plan as one batched import, a single undo step when 'fastMode' is on
+
+    Parameters
+    ----------
+    plan: RetargetPlan
+    keyframeOffset: float
+        Frames to offset every key by
+    timeTransform: timetransform.TimeTransform
+        Retimes the curves before they are applied
+    fastMode: bool
+        Whether to apply the keys with viewport refresh and the evaluation manager suspended
+    disableUndo: bool
+        Whether to turn the undo queue off instead of using an undo chunk
+
+    """
+    curves = plan.curves
+    if timeTransform is not None and not timeTransform.isIdentity():
+        curves = [
+            (targetObject, targetAttribute, timeTransform.applyToCurveData({targetAttribute: attributeCurveData})[targetAttribute])
+            for targetObject, targetAttribute, attributeCurveData in curves
+        ]
+
+    def applyCurves():
+        for targetObject, targetAttribute, attributeCurveData in curves:
+            exporthandler.applyAttributeCurveData(targetObject, targetAttribute, attributeCurveData, keyframeOffset)
+
+    if not fastMode:
+        applyCurves()
+        return
+
+    with exporthandler.suspendedSceneUpdates(chunkName="retargetCurveData", disableUndo=disableUndo):
+        applyCurves()
+
+def retargetCurveData(sources, rules, attributes=None, **kwargs):
+    """
+    Imports a set of exported files onto a differently named rig. See 'applyRetargetPlan' for the keyword arguments
+
+    Parameters
+    ----------
+    sources: list
+        Exported file paths, or (filepath, sourceObjectName) pairs
+    rules: list[dict]
+        Mapping rules
+    attributes: list[str]
+        Source attributes to retarget
+
+    Returns
+    -------
+    RetargetPlan
+        The applied plan, including the source plugs that could not be resolved
+
+    """
+    with telemetry.recordJob("retarget"):
+        plan = buildRetargetPlan(sources, NameMapping(rules), attributes=attributes)
+        applyRetargetPlan(plan, **kwargs)
+    return plan
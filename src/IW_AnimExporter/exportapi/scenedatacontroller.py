@@ -1,17 +1,18 @@
-import sys, os
+import sys, os, time
 
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 from PySide2 import QtCore
-from . import exporthandler
+from . import exporthandler, libraryindex, jobqueue, profiling, telemetry, timetransform
 
 # region Local Imports
 parentPackageDir = os.path.dirname(os.path.dirname(__file__))
 if parentPackageDir not in sys.path:
     sys.path.append(parentPackageDir)
 
+import resources
 from resources import InterfaceModes
 # endregion
 
@@ -24,9 +25,18 @@ class SceneDataController(QtCore.QObject):
     SetCommitButtonText = QtCore.Signal(str)
     InterfaceModeChanged = QtCore.Signal()
 
+    CurvePreviewData = QtCore.Signal(dict, float)
+
+    LibrarySearchResults = QtCore.Signal(list)
+    LibraryStatus = QtCore.Signal(str)
+
+    JobQueueChanged = QtCore.Signal(list, float)
+
     def __init__(self):
         super().__init__()
         self._interfaceMode = None
+        self._jobQueue = None
+        self._jobQueueRunning = False
 
     @QtCore.Slot()
     def setInterfaceMode(self, interfaceMode):
@@ -49,10 +59,12 @@ class SceneDataController(QtCore.QObject):
         return self._interfaceMode
 
     @QtCore.Slot()
+    @profiling.profiled("emitObjectAnimationData")
     def emitObjectAnimationData(self, objectName):
         objectDataDict = {}
         objectDataDict["Object Name"] = objectName
-        objectDataDict["Attributes"] = exporthandler.getAnimatedObjectAttributes(objectName)
+        with telemetry.recordJob("objectAttributes", objectName=objectName):
+            objectDataDict["Attributes"] = exporthandler.getAnimatedObjectAttributes(objectName)
 
         animationDataDefaults = InterfaceModes.getInterfaceModeAnimationDataDefaults(self.interfaceMode())
         objectDataDict.update(animationDataDefaults)
@@ -63,12 +75,14 @@ class SceneDataController(QtCore.QObject):
 
 
     def _emitAnimatedObjects(self):
-        _animatedObjects = exporthandler.getAnimatedSceneObjects()
+        with telemetry.recordJob("objectDiscovery"):
+            _animatedObjects = exporthandler.getAnimatedSceneObjects()
         self.ObjectNamesGathered.emit(_animatedObjects)
 
 
     def _emitAnimatableObjects(self):
-        _animatableObjects = exporthandler.getAnimatableSceneObjects()
+        with telemetry.recordJob("objectDiscovery"):
+            _animatableObjects = exporthandler.getAnimatableSceneObjects()
         self.ObjectNamesGathered.emit(_animatableObjects)
 
 
@@ -89,9 +103,16 @@ class SceneDataController(QtCore.QObject):
         selected_attributes = animationData.get("Attributes")
         startFrame = animationData.get("Start Frame")
         endFrame = animationData.get("End Frame")
+        bakeStep = animationData.get("Bake Step")
+        reduceTolerance = animationData.get("Reduce Tolerance")
+        clips = exporthandler.parseClipList(animationData.get("Clips"))
 
         exportHandler = exporthandler.AnimationPort(objectName=objectName)
-        exportHandler.exportCurveData(filepath=filepath, startFrame=startFrame, endFrame=endFrame, attributes=selected_attributes)
+        if clips:
+            # the clips give the frame ranges, the start and end frames are not used
+            exportHandler.exportClips(filepath, clips, attributes=selected_attributes, bakeStep=bakeStep, reduceTolerance=reduceTolerance)
+            return
+        exportHandler.exportCurveData(filepath=filepath, startFrame=startFrame, endFrame=endFrame, attributes=selected_attributes, bakeStep=bakeStep, reduceTolerance=reduceTolerance)
         return
 
     def _importObjectAnimationData(self, animationData):
@@ -99,6 +120,198 @@ class SceneDataController(QtCore.QObject):
         filepath = animationData.get("Animation File")
         selected_attributes = animationData.get("Attributes")
         keyframeOffset = animationData.get("Frame Offset")
+        clip = animationData.get("Clip") or None
+        timeTransform = self._importTimeTransform(animationData)
+
+        filepaths = exporthandler.splitFilepaths(filepath)
+        if len(filepaths) > 1:
+            # the object and attributes picked in the panel belong to the selected object, not to every file's object
+            if selected_attributes:
+                logger.warning(f"Ignoring the picked attributes, {len(filepaths)} files import onto the objects they are named after")
+            self._importAnimationFiles(filepaths, keyframeOffset, clip=clip, timeTransform=timeTransform)
+            return
+
         portHandler = exporthandler.AnimationPort(objectName=objectName)
-        portHandler.importCurveData(filepath=filepath, keyframeOffset=keyframeOffset, attributes=selected_attributes)
+        portHandler.importCurveData(filepath=filepath, keyframeOffset=keyframeOffset, attributes=selected_attributes, clip=clip, timeTransform=timeTransform)
         print("\n\nImport Complete\n\n")
+
+    @staticmethod
+    def _importTimeTransform(animationData):
+        """
+        Builds the import panel's retiming, None when it leaves the curves as they are. Clipping and reversing are only
+        available through 'timetransform.TimeTransform' itself
+        """
+        timeTransform = timetransform.TimeTransform(
+            scale=animationData.get("Time Scale") or 1.0,
+            pivot=animationData.get("Time Pivot") or 0.0,
+            snapStep=animationData.get("Snap Step") or None,
+            frameSeconds=exporthandler.secondsPerFrame()
+        )
+        return None if timeTransform.isIdentity() else timeTransform
+
+    def _importAnimationFiles(self, filepaths, keyframeOffset, clip=None, timeTransform=None):
+        """
+        Imports several files at once, each onto the object it was exported from as named by the file, whatever object
+        is selected in the interface and with every attribute of each file. Raises when any file failed, after the
+        others were imported, so a queued job sees the failure
+
+        Raises
+        ------
+        RuntimeError
+            Naming every file that failed and why
+        """
+        jobs = [
+            {
+                exporthandler.importFilepathKey: filepath,
+                exporthandler.importObjectKey: exporthandler.objectNameFromFilepath(filepath),
+                exporthandler.importOffsetKey: keyframeOffset,
+                exporthandler.importClipKey: clip,
+                exporthandler.importTimeTransformKey: timeTransform,
+            }
+            for filepath in filepaths
+        ]
+        for job in jobs:
+            logger.info(f"Importing {job[exporthandler.importFilepathKey]} onto {job[exporthandler.importObjectKey]}")
+        results = exporthandler.importFiles(jobs)
+        failed = [result for result in results if result["error"] is not None]
+        logger.info(f"Imported {len(results) - len(failed)} of {len(results)} files")
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {len(results)} files failed to import: "
+                + ", ".join(f"{result[exporthandler.importFilepathKey]} ({result['error']})" for result in failed)
+            )
+
+    @QtCore.Slot()
+    def setProfilingEnabled(self, enabled):
+        profiling.setEnabled(enabled)
+
+    @QtCore.Slot()
+    @profiling.profiled("emitObjectCurvePreview")
+    def emitObjectCurvePreview(self, objectName):
+        # whole curves are read with one query per key field, fast enough to follow the selection
+        animationCurveData = {
+            attr: exporthandler.readTargetCurve(objectName, attr)
+            for attr in exporthandler.getAnimatedObjectAttributes(objectName)
+        }
+        self.CurvePreviewData.emit(animationCurveData, exporthandler.secondsPerFrame())
+
+    @QtCore.Slot()
+    @profiling.profiled("emitFileCurvePreview")
+    def emitFileCurvePreview(self, filepath):
+        try:
+            fileCurveData = exporthandler.readJson(filepath)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not preview {filepath}: {e}")
+            return
+
+        animationCurveData = {}
+        clips = exporthandler.fileHasClips(filepath, fileCurveData)
+        for key, entry in fileCurveData.items():
+            if clips:
+                # multi-clip files show every clip, named '<clip>.<attribute>'
+                animationCurveData.update({f"{key}.{attr}": attributeCurveData for attr, attributeCurveData in entry.items()})
+            else:
+                animationCurveData[key] = entry
+        self.CurvePreviewData.emit(animationCurveData, exporthandler.secondsPerFrame())
+
+    @QtCore.Slot()
+    @profiling.profiled("searchLibrary")
+    def searchLibrary(self, query):
+        with libraryindex.LibraryIndex() as index:
+            curves = index.findCurves(**query)
+        self.LibrarySearchResults.emit(curves)
+
+    @QtCore.Slot()
+    @profiling.profiled("rescanLibrary")
+    def rescanLibrary(self):
+        roots = resources.libraryRoots()
+        if not roots:
+            self.LibraryStatus.emit("No library roots configured")
+            return
+        with libraryindex.LibraryIndex() as index:
+            counts = index.scan(roots)
+        self.LibraryStatus.emit(f"{counts['indexed']} indexed, {counts['unchanged']} unchanged, {counts['removed']} removed, {counts['failed']} failed")
+
+    # region JOB QUEUE
+
+    def jobQueue(self):
+        # created on first use, reading the telemetry for the estimates is not needed before
+        if self._jobQueue is None:
+            self._jobQueue = jobqueue.JobQueue()
+        return self._jobQueue
+
+    def _emitJobQueue(self):
+        self.JobQueueChanged.emit(self.jobQueue().asList(), self.jobQueue().remainingDuration())
+
+    @QtCore.Slot()
+    def queuePortJob(self, animationData):
+        """
+        Queues the port panel's export or import instead of running it right away
+        """
+        _methodName = InterfaceModes.getInterfaceControllerPortMethod(self.interfaceMode())
+        if not hasattr(self, _methodName):
+            return
+        exportMode = self.interfaceMode() == InterfaceModes.Mode1
+        job = jobqueue.PortJob(
+            jobType=jobqueue.jobTypeExport if exportMode else jobqueue.jobTypeImport,
+            objectName=animationData.get("Object Name"),
+            filepath=animationData.get("File Save Location" if exportMode else "Animation File"),
+            portMethod=_methodName,
+            animationData=dict(animationData)
+        )
+        self.jobQueue().enqueue(job)
+        self._emitJobQueue()
+
+    @QtCore.Slot()
+    def moveJob(self, jobId, offset):
+        self.jobQueue().move(jobId, offset)
+        self._emitJobQueue()
+
+    @QtCore.Slot()
+    def removeJob(self, jobId):
+        self.jobQueue().remove(jobId)
+        self._emitJobQueue()
+
+    @QtCore.Slot()
+    def clearFinishedJobs(self):
+        self.jobQueue().clearFinished()
+        self._emitJobQueue()
+
+    @QtCore.Slot()
+    def startJobQueue(self):
+        if self._jobQueueRunning:
+            return
+        self._jobQueueRunning = True
+        self._scheduleNextJob()
+
+    @QtCore.Slot()
+    def stopJobQueue(self):
+        # the running job finishes, nothing after it starts
+        self._jobQueueRunning = False
+
+    def _scheduleNextJob(self):
+        # back to the event loop between jobs so the window stays responsive and the queue can be edited
+        QtCore.QTimer.singleShot(0, self._runNextJob)
+
+    def _runNextJob(self):
+        if not self._jobQueueRunning:
+            return
+        job = self.jobQueue().nextPending()
+        if job is None:
+            self._jobQueueRunning = False
+            self._emitJobQueue()
+            return
+
+        self.jobQueue().jobStarted(job)
+        self._emitJobQueue()
+        _start = time.perf_counter()
+        error = None
+        try:
+            getattr(self, job.portMethod)(job.animationData)
+        except Exception as e:
+            error = repr(e)
+        self.jobQueue().jobFinished(job, time.perf_counter() - _start, error=error)
+        self._emitJobQueue()
+        self._scheduleNextJob()
+
+    # endregion
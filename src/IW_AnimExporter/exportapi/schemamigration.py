@@ -0,0 +1,119 @@
+import sys, os, time, argparse, concurrent.futures
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+from . import exporthandler, libraryindex
+
+#   Rewrites animation files in the current schema. Every file keeps its encoding and compression, collapsed curves
+#   stay collapsed. 'writeJson' only replaces the original once the migrated file was written completely.
+
+migratedStatus = "migrated"
+currentStatus = "current"
+failedStatus = "failed"
+
+
+def fileSchemaVersion(filepath):
+    """
+    Gets the schema version a file was written with, 1 for files from before schema versions were recorded
+    """
+    header = exporthandler.readHeader(filepath)
+    if header is None:
+        return 1
+    return header.get(exporthandler.schemaVersionKey, 1)
+
+def migrateFile(filepath, schema=None, compressionLevel=None):
+    """
+    Rewrites one file in the given schema unless it already is
+
+    Parameters
+    ----------
+    filepath: str
+    schema: int
+        Defaults to 'exporthandler.currentSchemaVersion'
+    compressionLevel: int
+
+    Returns
+    -------
+    tuple(str, str, str)
+        The file, its status and the error for failed files
+
+    """
+    if schema is None:
+        schema = exporthandler.currentSchemaVersion
+    try:
+        if fileSchemaVersion(filepath) == schema:
+            return filepath, currentStatus, None
+
+        header = exporthandler.readHeader(filepath) or {}
+        encoding = header.get(exporthandler.headerEncodingKey, "json")
+        exporthandler.writeJson(
+            filepath,
+            exporthandler.iterJson(filepath, expand=False),
+            encoding=encoding,
+            compressionLevel=compressionLevel,
+            schema=schema,
+            clips=exporthandler.fileHasClips(filepath)
+        )
+    except Exception as e:
+        return filepath, failedStatus, repr(e)
+    return filepath, migratedStatus, None
+
+def findAnimationFiles(directories, extensions=libraryindex.animationFileExtensions):
+    for directory in directories:
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.lower().endswith(extensions) and not filename.startswith(exporthandler.temporaryFilePrefix):
+                    yield os.path.join(dirpath, filename)
+
+def migrateLibrary(directories, schema=None, workers=None, compressionLevel=None):
+    """
+    Migrates every animation file under the given directories, several files at once in separate processes
+
+    Parameters
+    ----------
+    directories: list[str]
+    schema: int
+        Defaults to 'exporthandler.currentSchemaVersion'
+    workers: int
+        Worker processes, defaults to the cpu count
+    compressionLevel: int
+
+    Returns
+    -------
+    dict
+        Status to the files with that status
+
+    """
+    filepaths = list(findAnimationFiles(directories))
+    results = {migratedStatus: [], currentStatus: [], failedStatus: []}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(migrateFile, filepath, schema, compressionLevel) for filepath in filepaths]
+        for future in concurrent.futures.as_completed(futures):
+            filepath, status, error = future.result()
+            results[status].append(filepath)
+            if error is not None:
+                logger.warning(f"Could not migrate {filepath}: {error}")
+    return results
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Rewrite exported animation files in the current schema")
+    parser.add_argument("directories", nargs="+")
+    parser.add_argument("--schema", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compression-level", type=int, default=None)
+    options = parser.parse_args(args)
+
+    _start = time.perf_counter()
+    results = migrateLibrary(options.directories, schema=options.schema, workers=options.workers, compressionLevel=options.compression_level)
+    print(
+        f"{len(results[migratedStatus])} migrated, {len(results[currentStatus])} already current, "
+        f"{len(results[failedStatus])} failed in {time.perf_counter() - _start:.2f}s"
+    )
+    for filepath in results[failedStatus]:
+        print(f"    failed: {filepath}")
+    return 0 if not results[failedStatus] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+import sys, os, json, time, socket, tempfile, argparse, contextlib, contextvars, tracemalloc
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# region Local Imports
+parentPackageDir = os.path.dirname(os.path.dirname(__file__))
+if parentPackageDir not in sys.path:
+    sys.path.append(parentPackageDir)
+
+import resources
+# endregion
+
+#   Every export or import job appends one json line to the telemetry log. Code running inside a job reports into it
+#   through the module level 'phase', 'addKeys', 'addBytes' and 'addPrecisionLoss' functions, which do nothing when no job is running.
+#   Phases are exclusive, time spent in a nested phase is not counted again for the phase around it.
+#
+#   The running job is kept per context, so a job only ever sees the code it runs itself. Worker threads started by a
+#   job, e.g. the decoding threads of 'importFiles', report into no job, their time shows up as the job waiting on them.
+
+telemetryLogEnvironmentVariable = "IW_ANIMEXPORTER_TELEMETRY_LOG"
+
+_activeJob = contextvars.ContextVar("IW_AnimExporter_activeJob", default=None)
+
+
+def telemetryLogFilepath():
+    """
+    Gets the telemetry log, from the environment, then the app config, then the temp directory
+
+    Returns
+    -------
+    str
+
+    """
+    _filepath = os.environ.get(telemetryLogEnvironmentVariable) or resources.telemetryLog()
+    if not _filepath:
+        _filepath = os.path.join(tempfile.gettempdir(), "IW_AnimExporter", "telemetry.jsonl")
+    return _filepath
+
+def _processPeakMemory():
+    """
+    Gets the largest resident size the process ever had, in bytes, None where it cannot be queried
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    _maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    return _maxrss if sys.platform == "darwin" else _maxrss * 1024
+
+def _canMeasureJobPeak():
+    # the traced peak can only be scoped to a job when it can be reset, python 3.9 and later
+    return tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak")
+
+
+class CountingCommands(object):
+
+    def __init__(self, commands):
+        """
+        Wraps 'maya.cmds' for a module, counting every command called through it into the job running in the caller's
+        context. Outside of a job the commands are handed out as they are
+
+        Parameters
+        ----------
+        commands: module
+            The real 'maya.cmds'
+        """
+        super().__init__()
+        self._commands = commands
+
+    def __getattr__(self, name):
+        command = getattr(self._commands, name)
+        job = _activeJob.get()
+        if job is None or not callable(command):
+            return command
+        calls = job.mayaCalls
+
+        def countedCommand(*args, **kwargs):
+            calls[name] = calls.get(name, 0) + 1
+            return command(*args, **kwargs)
+        return countedCommand
+
+def countingCommands(commands):
+    """
+    Wraps a module's 'maya.cmds' in a 'CountingCommands', None when Maya is not available
+    """
+    return CountingCommands(commands) if commands is not None else None
+
+
+class JobTelemetry(object):
+
+    def __init__(self, jobType, objectName=None, filepath=None):
+        """
+        Measurements of a single export or import job
+
+        Parameters
+        ----------
+        jobType: str
+            e.g. 'export' or 'import'
+        objectName: str
+        filepath: str
+        """
+        super().__init__()
+        self.jobType = jobType
+        self.objectName = objectName
+        self.filepath = filepath
+        self.phaseTimes = {}
+        self.mayaCalls = {}
+        self.keys = 0
+        self.bytesWritten = 0
+        self.precisionLoss = {}
+        self.status = "ok"
+        self.error = None
+        self._phaseStack = []
+        self._startTime = None
+        self._duration = None
+        self._startProcessPeak = None
+        self._jobPeak = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        _start = time.perf_counter()
+        self._phaseStack.append(name)
+        try:
+            yield
+        finally:
+            self._phaseStack.pop()
+            _elapsed = time.perf_counter() - _start
+            self.phaseTimes[name] = self.phaseTimes.get(name, 0.0) + _elapsed
+            if self._phaseStack:
+                _parent = self._phaseStack[-1]
+                self.phaseTimes[_parent] = self.phaseTimes.get(_parent, 0.0) - _elapsed
+
+    def start(self):
+        self._startTime = time.perf_counter()
+        self._startProcessPeak = _processPeakMemory()
+        if _canMeasureJobPeak():
+            tracemalloc.reset_peak()
+
+    def stop(self):
+        self._duration = time.perf_counter() - self._startTime
+        if _canMeasureJobPeak():
+            self._jobPeak = tracemalloc.get_traced_memory()[1]
+
+    def record(self):
+        """
+        Returns
+        -------
+        dict
+            The json serializable telemetry record of the job
+        """
+        processPeak = _processPeakMemory()
+        return {
+            "time": time.time(),
+            "host": socket.gethostname(),
+            "jobType": self.jobType,
+            "objectName": self.objectName,
+            "filepath": self.filepath,
+            "status": self.status,
+            "error": self.error,
+            "duration": self._duration,
+            "phases": self.phaseTimes,
+            "mayaCalls": self.mayaCalls,
+            "mayaCallCount": sum(self.mayaCalls.values()),
+            "keys": self.keys,
+            "keysPerSecond": self.keys / self._duration if self._duration else None,
+            "bytesWritten": self.bytesWritten,
+            "precisionLoss": self.precisionLoss,
+            # traced python allocations during the job, only while tracemalloc runs
+            "peakMemory": self._jobPeak,
+            # the process' lifetime peak, and how far the job raised it
+            "processPeakMemory": processPeak,
+            "processPeakMemoryGrowth": processPeak - self._startProcessPeak if processPeak is not None and self._startProcessPeak is not None else None,
+        }
+
+
+def activeJob():
+    return _activeJob.get()
+
+@contextlib.contextmanager
+def phase(name):
+    job = _activeJob.get()
+    if job is None:
+        yield
+        return
+    with job.phase(name):
+        yield
+
+def addKeys(count):
+    job = _activeJob.get()
+    if job is not None:
+        job.keys += count
+
+def addBytes(count):
+    job = _activeJob.get()
+    if job is not None:
+        job.bytesWritten += count
+
+def addPrecisionLoss(setting, error):
+    """
+    Keeps the largest rounding error of a precision setting, e.g. 'values', over the job
+    """
+    job = _activeJob.get()
+    if job is not None and error > job.precisionLoss.get(setting, 0.0):
+        job.precisionLoss[setting] = error
+
+def writeRecord(record, filepath=None):
+    if filepath is None:
+        filepath = telemetryLogFilepath()
+    try:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "a") as file:
+            file.write(json.dumps(record) + "\n")
+    except OSError as e:
+        # losing a telemetry record must never fail the job itself
+        logger.warning(f"Could not write telemetry to {filepath}: {e}")
+
+@contextlib.contextmanager
+def recordJob(jobType, objectName=None, filepath=None):
+    """
+    Measures the job run inside the context and appends its record to the telemetry log. Nested jobs are folded into
+    the outer one. Maya commands are counted for modules using 'countingCommands'
+
+    Parameters
+    ----------
+    jobType: str
+    objectName: str
+    filepath: str
+
+    """
+    outerJob = _activeJob.get()
+    if outerJob is not None:
+        yield outerJob
+        return
+
+    job = JobTelemetry(jobType, objectName=objectName, filepath=filepath)
+    token = _activeJob.set(job)
+    job.start()
+    try:
+        yield job
+    except Exception as e:
+        job.status = "failed"
+        job.error = repr(e)
+        raise
+    finally:
+        job.stop()
+        _activeJob.reset(token)
+        writeRecord(job.record())
+
+def readRecords(filepath=None):
+    if filepath is None:
+        filepath = telemetryLogFilepath()
+    records = []
+    if not os.path.exists(filepath):
+        return records
+    with open(filepath, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+def summarizeRecords(records):
+    """
+    Aggregates telemetry records per job type
+
+    Parameters
+    ----------
+    records: list[dict]
+
+    Returns
+    -------
+    dict
+        Job type to job count, failures, total and mean duration, mean phase times, keys, keys per second and bytes
+
+    """
+    summary = {}
+    for record in records:
+        _summary = summary.setdefault(record.get("jobType"), {
+            "jobs": 0,
+            "failed": 0,
+            "totalDuration": 0.0,
+            "phases": {},
+            "mayaCalls": 0,
+            "keys": 0,
+            "bytesWritten": 0,
+            "peakMemory": 0,
+            "processPeakMemoryGrowth": 0,
+        })
+        _summary["jobs"] += 1
+        _summary["failed"] += record.get("status") != "ok"
+        _summary["totalDuration"] += record.get("duration") or 0.0
+        _summary["mayaCalls"] += record.get("mayaCallCount") or 0
+        _summary["keys"] += record.get("keys") or 0
+        _summary["bytesWritten"] += record.get("bytesWritten") or 0
+        _summary["peakMemory"] = max(_summary["peakMemory"], record.get("peakMemory") or 0)
+        _summary["processPeakMemoryGrowth"] = max(_summary["processPeakMemoryGrowth"], record.get("processPeakMemoryGrowth") or 0)
+        for phaseName, seconds in (record.get("phases") or {}).items():
+            _summary["phases"][phaseName] = _summary["phases"].get(phaseName, 0.0) + seconds
+
+    for _summary in summary.values():
+        _jobs = _summary["jobs"]
+        _summary["meanDuration"] = _summary["totalDuration"] / _jobs
+        _summary["meanPhases"] = {phaseName: seconds / _jobs for phaseName, seconds in _summary.pop("phases").items()}
+        _summary["keysPerSecond"] = _summary["keys"] / _summary["totalDuration"] if _summary["totalDuration"] else None
+    return summary
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Summarize the export and import telemetry log")
+    parser.add_argument("log", nargs="?", default=None)
+    options = parser.parse_args(args)
+
+    summary = summarizeRecords(readRecords(options.log))
+    if not summary:
+        print("No telemetry records")
+        return 0
+
+    for jobType, _summary in summary.items():
+        print(f"{jobType}: {_summary['jobs']} jobs, {_summary['failed']} failed, mean {_summary['meanDuration']:.3f}s")
+        for phaseName, seconds in sorted(_summary["meanPhases"].items(), key=lambda item: item[1], reverse=True):
+            print(f"    {phaseName:<20} {seconds * 1000.0:>12.2f} ms")
+        keysPerSecond = _summary["keysPerSecond"]
+        print(f"    keys {_summary['keys']}, {keysPerSecond or 0:.0f} keys/s, {_summary['mayaCalls']} maya calls, "
+              f"{_summary['bytesWritten']} bytes written, traced job peak {_summary['peakMemory']} bytes, "
+              f"process peak raised by up to {_summary['processPeakMemoryGrowth']} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+import numpy as np
+
+from . import curveevaluator
+
+# tangent type of the keys added at clip boundaries, which keeps the tangent angle it was given
+fixedTangentType = "fixed"
+
+# step tangents hold a value over the segment after their key, played backwards they hold the other end's value
+_reversedStepTangentTypes = {
+    curveevaluator.stepTangentType: curveevaluator.stepNextTangentType,
+    curveevaluator.stepNextTangentType: curveevaluator.stepTangentType,
+}
+
+
+class TimeTransform(object):
+
+    def __init__(self, offset=0.0, scale=1.0, pivot=0.0, clipStart=None, clipEnd=None, reverse=False, snapStep=None, frameSeconds=1.0 / 24.0):
+        """
+        Retimes whole curves at once. The steps run in the order: clip, reverse, scale, offset, snap
+
+        Parameters
+        ----------
+        offset: float
+            Frames added to every key
+        scale: float
+            Time scale applied about the pivot, must be positive
+        pivot: float
+            Frame that stays in place when scaling
+        clipStart: float
+            Keys before this source frame are dropped. When it falls between keys a key evaluated from the curve is
+            added on it, so the clipped curve keeps its shape
+        clipEnd: float
+            Keys after this source frame are dropped, with a key added on it as for 'clipStart'
+        reverse: bool
+            Whether to play the curve backwards within its own keyed range
+        snapStep: float
+            When given key times are rounded to the nearest multiple of this many frames. Keys landing on the same
+            frame keep the first one
+        frameSeconds: float
+            Length of a frame in seconds, used to evaluate the keys added at the clip boundaries
+        """
+        super().__init__()
+        if scale <= 0:
+            raise ValueError(f"Time scale must be positive, got {scale}. Use 'reverse' to play a curve backwards")
+        self.offset = float(offset)
+        self.scale = float(scale)
+        self.pivot = float(pivot)
+        self.clipStart = clipStart
+        self.clipEnd = clipEnd
+        self.reverse = reverse
+        self.snapStep = snapStep
+        self.frameSeconds = frameSeconds
+
+    def isIdentity(self):
+        return (
+            self.offset == 0.0
+            and self.scale == 1.0
+            and self.clipStart is None
+            and self.clipEnd is None
+            and not self.reverse
+            and not self.snapStep
+        )
+
+    def apply(self, curve):
+        """
+        Returns a retimed copy of the curve with its tangents adjusted to keep the same shape
+
+        Parameters
+        ----------
+        curve: curveevaluator.CurveArrays
+
+        Returns
+        -------
+        curveevaluator.CurveArrays
+
+        """
+        for boundary in (self.clipStart, self.clipEnd):
+            if boundary is None:
+                continue
+            boundary = float(boundary)
+            if len(curve) > 1 and curve.times[0] < boundary < curve.times[-1] and not np.any(curve.times == boundary):
+                curve = _insertKey(curve, boundary, self.frameSeconds)
+
+        times = curve.times
+        keep = np.ones(len(times), dtype=bool)
+        if self.clipStart is not None:
+            keep &= times >= float(self.clipStart)
+        if self.clipEnd is not None:
+            keep &= times <= float(self.clipEnd)
+
+        times = times[keep]
+        values = curve.values[keep]
+        inTypes, inAngles, inWeights = curve.inTangentTypes[keep], curve.inAngles[keep], curve.inWeights[keep]
+        outTypes, outAngles, outWeights = curve.outTangentTypes[keep], curve.outAngles[keep], curve.outWeights[keep]
+
+        if self.reverse and len(times):
+            # mirror the keys within their range, the in tangent of a key becomes its out tangent with the slope flipped
+            times = (times[0] + times[-1]) - times[::-1]
+            values = values[::-1]
+            reversedInTypes, reversedOutTypes = inTypes[::-1], outTypes[::-1]
+            stepped = _isStepTangent(reversedOutTypes)
+            # step types are out tangents only, a key stepping out keeps its in tangent type on both sides
+            inTypes = np.where(stepped, reversedInTypes, reversedOutTypes)
+            # a step governs the segment after its key, which after mirroring starts at the key before it
+            outTypes = reversedInTypes.copy()
+            segmentStepped = stepped[1:]
+            outTypes[:-1][segmentStepped] = [_reversedStepTangentTypes[_type] for _type in reversedOutTypes[1:][segmentStepped]]
+            inAngles, outAngles = -outAngles[::-1], -inAngles[::-1]
+            inWeights, outWeights = outWeights[::-1], inWeights[::-1]
+
+        if self.scale != 1.0:
+            times = self.pivot + (times - self.pivot) * self.scale
+            inAngles, inWeights = _scaleTangents(inAngles, inWeights, self.scale, curve.weighted)
+            outAngles, outWeights = _scaleTangents(outAngles, outWeights, self.scale, curve.weighted)
+
+        times = times + self.offset
+
+        if self.snapStep:
+            times = np.round(times / self.snapStep) * self.snapStep
+            times, unique = np.unique(times, return_index=True)
+            values = values[unique]
+            inTypes, inAngles, inWeights = inTypes[unique], inAngles[unique], inWeights[unique]
+            outTypes, outAngles, outWeights = outTypes[unique], outAngles[unique], outWeights[unique]
+
+        return curveevaluator.CurveArrays(
+            times=times,
+            values=values,
+            inTangentTypes=inTypes,
+            inAngles=inAngles,
+            inWeights=inWeights,
+            outTangentTypes=outTypes,
+            outAngles=outAngles,
+            outWeights=outWeights,
+            weighted=curve.weighted
+        )
+
+    def applyToCurveData(self, animationCurveData):
+        """
+        Retimes every curve of an exported animation
+
+        Parameters
+        ----------
+        animationCurveData: dict
+            Attribute name to keyframe time to keyframe data
+
+        Returns
+        -------
+        dict
+            The retimed attribute name to keyframe time to keyframe data
+
+        """
+        return {
+            attr: self.apply(curveevaluator.CurveArrays.fromKeyframeData(attributeCurveData)).toKeyframeData()
+            for attr, attributeCurveData in animationCurveData.items()
+        }
+
+
+def _isStepTangent(tangentTypes):
+    return (tangentTypes == curveevaluator.stepTangentType) | (tangentTypes == curveevaluator.stepNextTangentType)
+
+def _tangentFromOffset(offset, frameSeconds):
+    """
+    Gets the weighted tangent angle and weight placing a bezier control point at the given (frames, value) offset from
+    its key, the inverse of 'curveevaluator._tangentOffsets'
+    """
+    timeComponent = 3.0 * frameSeconds * offset[0]
+    valueComponent = 3.0 * offset[1]
+    return float(np.degrees(np.arctan2(valueComponent, timeComponent))), float(np.hypot(timeComponent, valueComponent))
+
+def _bezierParameter(time, t0, t1, t2, t3):
+    """
+    Finds the bezier parameter of a single time to full precision, the control point times are kept inside the segment
+    so time rises with the parameter
+    """
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        parameter = 0.5 * (low + high)
+        inverse = 1.0 - parameter
+        if inverse ** 3 * t0 + 3.0 * inverse ** 2 * parameter * t1 + 3.0 * inverse * parameter ** 2 * t2 + parameter ** 3 * t3 < time:
+            low = parameter
+        else:
+            high = parameter
+    return 0.5 * (low + high)
+
+def _insertKey(curve, time, frameSeconds):
+    """
+    Adds a key inside the curve's keyed range without changing its shape. The key's value and tangents come from the
+    segment it splits, on weighted curves the tangents of the segment's keys also shorten to the part they keep
+
+    Parameters
+    ----------
+    curve: curveevaluator.CurveArrays
+    time: float
+        Frame strictly between two keys
+    frameSeconds: float
+
+    Returns
+    -------
+    curveevaluator.CurveArrays
+
+    """
+    segment = int(np.searchsorted(curve.times, time, side="right")) - 1
+    t0, t3 = curve.times[segment], curve.times[segment + 1]
+    v0, v3 = curve.values[segment], curve.values[segment + 1]
+    value = float(curveevaluator.evaluateCurve(curve, [time], frameSeconds)[0])
+    inAngles, inWeights = curve.inAngles.copy(), curve.inWeights.copy()
+    outAngles, outWeights = curve.outAngles.copy(), curve.outWeights.copy()
+    keyOutType = fixedTangentType
+
+    outTimeOffsets, outValueOffsets = curveevaluator._tangentOffsets(curve.outAngles, curve.outWeights, frameSeconds, curve.weighted)
+    inTimeOffsets, inValueOffsets = curveevaluator._tangentOffsets(curve.inAngles, curve.inWeights, frameSeconds, curve.weighted)
+    if _isStepTangent(curve.outTangentTypes[segment:segment + 1])[0]:
+        # both halves step the same way, the added key holds the value the step holds at its time
+        keyOutType = curve.outTangentTypes[segment]
+        keyInAngle, keyInWeight, keyOutAngle, keyOutWeight = 0.0, 1.0, 0.0, 1.0
+    elif curve.weighted:
+        # split the bezier segment in two at the parameter of the time, with control points as the evaluator places them
+        p0, p3 = np.array([t0, v0]), np.array([t3, v3])
+        p1 = np.array([min(t0 + outTimeOffsets[segment], t3), v0 + outValueOffsets[segment]])
+        p2 = np.array([max(t3 - inTimeOffsets[segment + 1], t0), v3 - inValueOffsets[segment + 1]])
+        u = _bezierParameter(time, t0, p1[0], p2[0], t3)
+        p01, p12, p23 = p0 + (p1 - p0) * u, p1 + (p2 - p1) * u, p2 + (p3 - p2) * u
+        p012, p123 = p01 + (p12 - p01) * u, p12 + (p23 - p12) * u
+        point = p012 + (p123 - p012) * u
+        outAngles[segment], outWeights[segment] = _tangentFromOffset(p01 - p0, frameSeconds)
+        keyInAngle, keyInWeight = _tangentFromOffset(point - p012, frameSeconds)
+        keyOutAngle, keyOutWeight = _tangentFromOffset(p123 - point, frameSeconds)
+        inAngles[segment + 1], inWeights[segment + 1] = _tangentFromOffset(p3 - p23, frameSeconds)
+    else:
+        # a piece of a hermite segment is the hermite between the slopes at its ends, so only the new key's slope is
+        # needed and the neighbouring keys stay as they are
+        span = t3 - t0
+        v1 = v0 + outValueOffsets[segment] * span / 3.0
+        v2 = v3 - inValueOffsets[segment + 1] * span / 3.0
+        u = (time - t0) / span
+        slope = 3.0 * ((1.0 - u) ** 2 * (v1 - v0) + 2.0 * u * (1.0 - u) * (v2 - v1) + u ** 2 * (v3 - v2)) / span
+        keyInAngle = keyOutAngle = float(np.degrees(np.arctan(slope / frameSeconds)))
+        keyInWeight = keyOutWeight = 1.0
+
+    index = segment + 1
+    return curveevaluator.CurveArrays(
+        times=np.insert(curve.times, index, time),
+        values=np.insert(curve.values, index, value),
+        inTangentTypes=np.insert(curve.inTangentTypes, index, fixedTangentType),
+        inAngles=np.insert(inAngles, index, keyInAngle),
+        inWeights=np.insert(inWeights, index, keyInWeight),
+        outTangentTypes=np.insert(curve.outTangentTypes, index, keyOutType),
+        outAngles=np.insert(outAngles, index, keyOutAngle),
+        outWeights=np.insert(outWeights, index, keyOutWeight),
+        weighted=curve.weighted
+    )
+
+def _scaleTangents(angles, weights, scale, weighted):
+    """
+    Stretches tangents along time. The value change stays the same while the time covered scales, so slopes divide
+    by the scale and weighted tangents change length
+    """
+    radians = np.radians(angles)
+    timeComponent = np.cos(radians) * scale
+    valueComponent = np.sin(radians)
+    scaledAngles = np.degrees(np.arctan2(valueComponent, timeComponent))
+    if not weighted:
+        return scaledAngles, weights
+    return scaledAngles, weights * np.hypot(timeComponent, valueComponent)
@@ -0,0 +1,218 @@
+import sys, os, time, types, importlib
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+packageDir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _moduleFile(module):
+    _file = getattr(module, "__file__", None)
+    if not _file:
+        return None
+    return os.path.abspath(_file)
+
+def _fileMtime(filepath):
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
+
+
+
+class ReloadManager(object):
+
+    def __init__(self, rootDir=packageDir):
+        """
+        Tracks the modules loaded from the given directory and reloads only the ones whose source changed
+
+        Parameters
+        ----------
+        rootDir: str
+            Directory the tracked modules live in
+        """
+        super().__init__()
+        self._rootDir = os.path.normcase(os.path.abspath(rootDir))
+        self._moduleMtimes = {}
+        self._snapshotTime = None
+
+    def rootDir(self):
+        return self._rootDir
+
+    def isTrackedModule(self, module):
+        if module is None or module.__name__ == __name__:
+            return False
+        _file = _moduleFile(module)
+        if _file is None:
+            return False
+        return os.path.normcase(_file).startswith(self.rootDir())
+
+    def trackedModules(self):
+        """
+        Gets the imported modules that live under the root directory
+
+        Returns
+        -------
+        dict
+            Module name to module
+
+        """
+        return {name: module for name, module in list(sys.modules.items()) if self.isTrackedModule(module)}
+
+    def snapshot(self, newModulesOnly=False):
+        """
+        Records the current source mtime of every tracked module
+
+        Parameters
+        ----------
+        newModulesOnly: bool
+            Whether to only record modules imported since the last snapshot, e.g. right after the tool lazily
+            imported its modules, keeping the recorded mtime of every other module
+
+        """
+        if not newModulesOnly:
+            self._snapshotTime = time.time_ns()
+        for name, module in self.trackedModules().items():
+            if newModulesOnly and name in self._moduleMtimes:
+                continue
+            self._moduleMtimes[name] = _fileMtime(_moduleFile(module))
+
+    def changedModules(self):
+        """
+        Gets the tracked modules whose source file changed since they were recorded. A module imported since the last
+        snapshot, which may have been edited after its import, counts as changed when its source is newer than the
+        snapshot. At worst that reloads a module edited before it was imported once more
+
+        Returns
+        -------
+        list[str]
+
+        """
+        changed = []
+        for name, module in self.trackedModules().items():
+            _mtime = _fileMtime(_moduleFile(module))
+            if name not in self._moduleMtimes:
+                self._moduleMtimes[name] = _mtime
+                if _mtime is not None and self._snapshotTime is not None and _mtime > self._snapshotTime:
+                    changed.append(name)
+                continue
+            if _mtime != self._moduleMtimes[name]:
+                changed.append(name)
+        return changed
+
+    def dependencyGraph(self, modules):
+        """
+        Builds which tracked modules each module references, either directly or through imported names
+
+        Parameters
+        ----------
+        modules: dict
+            Module name to module
+
+        Returns
+        -------
+        dict
+            Module name to a set of the module names it depends on
+
+        """
+        moduleNames = {id(module): name for name, module in modules.items()}
+        graph = {}
+        for name, module in modules.items():
+            dependencies = set()
+            for value in list(vars(module).values()):
+                if isinstance(value, types.ModuleType):
+                    _dependency = moduleNames.get(id(value))
+                else:
+                    _dependency = getattr(value, "__module__", None)
+                if _dependency in modules and _dependency != name:
+                    dependencies.add(_dependency)
+            graph[name] = dependencies
+        return graph
+
+    def reloadOrder(self, changed, graph):
+        """
+        Gets the changed modules plus every module depending on them, ordered so dependencies reload first
+
+        Parameters
+        ----------
+        changed: list[str]
+        graph: dict
+            Result of 'dependencyGraph'
+
+        Returns
+        -------
+        list[str]
+
+        """
+        dependents = {name: set() for name in graph}
+        for name, dependencies in graph.items():
+            for dependency in dependencies:
+                dependents[dependency].add(name)
+
+        affected = set()
+        pending = list(changed)
+        while pending:
+            name = pending.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            pending.extend(dependents.get(name, ()))
+
+        order = []
+        visited = set()
+
+        def visit(name):
+            if name in visited:
+                return
+            visited.add(name)
+            for dependency in sorted(graph.get(name, ())):
+                if dependency in affected:
+                    visit(dependency)
+            order.append(name)
+
+        for name in sorted(affected):
+            visit(name)
+        return order
+
+    def reloadChanged(self):
+        """
+        Reloads the modules whose source changed, and the modules depending on them, in dependency order
+
+        Returns
+        -------
+        list[str]
+            The reloaded module names
+
+        """
+        changed = self.changedModules()
+        if not changed:
+            return []
+
+        modules = self.trackedModules()
+        order = self.reloadOrder(changed, self.dependencyGraph(modules))
+        for name in order:
+            logger.debug(f"Reloading {name}")
+            importlib.reload(modules[name])
+
+        self.snapshot()
+        return order
+
+
+_reloadManager = None
+
+def reloadManager():
+    global _reloadManager
+    if _reloadManager is None:
+        _reloadManager = ReloadManager()
+        _reloadManager.snapshot()
+    return _reloadManager
+
+def reloadChanged():
+    return reloadManager().reloadChanged()
+
+def recordLoadedModules():
+    """
+    Records the modules imported since the last snapshot, call it after the tool imported its lazily loaded modules
+    """
+    reloadManager().snapshot(newModulesOnly=True)
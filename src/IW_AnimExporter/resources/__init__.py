@@ -11,8 +11,15 @@ def readJson(filepath):
         data = json.load(file)
         return data
 
+_appconfigCache = {}
+
 def _appconfig():
-    return readJson(appconfig)
+    # Parsed once and reused until the config file changes on disk
+    _mtime = os.stat(appconfig).st_mtime_ns
+    if _appconfigCache.get("mtime") != _mtime:
+        _appconfigCache["data"] = readJson(appconfig)
+        _appconfigCache["mtime"] = _mtime
+    return _appconfigCache["data"]
 
 def _interfacemodes():
     return _appconfig().get(f"InterfaceModes")
@@ -62,3 +69,24 @@ def applicationName():
 
 def windowSize():
     return _appconfig().get("WindowSize")
+
+def startupBudget():
+    return _appconfig().get("StartupBudget")
+
+def telemetryLog():
+    return _appconfig().get("TelemetryLog")
+
+def profileDirectory():
+    return _appconfig().get("ProfileDirectory")
+
+def exportMemoryBudget():
+    return _appconfig().get("ExportMemoryBudget")
+
+def exportPrecision():
+    return _appconfig().get("ExportPrecision")
+
+def libraryIndex():
+    return _appconfig().get("LibraryIndex")
+
+def libraryRoots():
+    return _appconfig().get("LibraryRoots") or []
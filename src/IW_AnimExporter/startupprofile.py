@@ -0,0 +1,103 @@
+import sys, os, time, importlib
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+if os.path.dirname(__file__) not in sys.path:
+    sys.path.append(os.path.dirname(__file__))
+
+# 'resources' is deliberately not imported here, it is one of the measured modules
+
+# Modules in the order the window needs them when launched from the shelf
+startupModules = [
+    "resources",
+    "exportapi.exporthandler",
+    "exportapi.scenedatacontroller",
+    "ui.style",
+    "ui.mainwindow",
+]
+
+
+def measureStartup(modules=None, includeStylesheets=True):
+    """
+    Measures how long each startup module takes to import. Modules that are already imported are
+    reported with a time of 0.0, so for a true cold start run this from a fresh interpreter
+
+    Parameters
+    ----------
+    modules: list[str]
+        Modules to import, defaults to 'startupModules'
+    includeStylesheets: bool
+        Whether to also time the compilation of every stylesheet
+
+    Returns
+    -------
+    dict
+        Seconds spent per step, in the order they ran
+
+    """
+    if modules is None:
+        modules = startupModules
+
+    timings = {}
+    for moduleName in modules:
+        if moduleName in sys.modules:
+            timings[moduleName] = 0.0
+            continue
+        _start = time.perf_counter()
+        try:
+            importlib.import_module(moduleName)
+        except ImportError as e:
+            logger.warning(f"Could not import {moduleName}: {e}")
+            continue
+        timings[moduleName] = time.perf_counter() - _start
+
+    if includeStylesheets and "ui.style" in sys.modules:
+        style = sys.modules["ui.style"]
+        for attributeName, stylesheet in style.stylesheets.items():
+            _start = time.perf_counter()
+            style.get_stylesheet(stylesheet)
+            timings[f"stylesheet:{attributeName}"] = time.perf_counter() - _start
+
+    return timings
+
+def checkStartupBudget(timings, budget=None):
+    """
+    Whether the measured startup fits within the budget
+
+    Parameters
+    ----------
+    timings: dict
+        Result of 'measureStartup'
+    budget: float
+        Seconds allowed, defaults to the 'StartupBudget' app config value
+
+    Returns
+    -------
+    bool
+
+    """
+    if budget is None:
+        import resources
+        budget = resources.startupBudget()
+    return sum(timings.values()) <= budget
+
+def main():
+    timings = measureStartup()
+
+    import resources
+    budget = resources.startupBudget()
+    total = sum(timings.values())
+
+    for step, seconds in timings.items():
+        print(f"{step:<40} {seconds * 1000.0:>10.2f} ms")
+    print(f"{'total':<40} {total * 1000.0:>10.2f} ms  (budget {budget * 1000.0:.2f} ms)")
+
+    if not checkStartupBudget(timings, budget):
+        print("Startup is over budget")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import importlib
+
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-from. import mainwindow, style
\ No newline at end of file
+# Submodules are imported on first attribute access so importing the package does not pull in Qt
+_submodules = ("mainwindow", "style", "curvepreview")
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
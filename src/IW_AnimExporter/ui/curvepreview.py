@@ -0,0 +1,248 @@
+import os, sys, struct
+
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+from PySide2 import QtGui, QtCore, QtWidgets
+
+# region Local Imports
+parentPackageDir = os.path.dirname(os.path.dirname(__file__))
+if parentPackageDir not in sys.path:
+    sys.path.append(parentPackageDir)
+# endregion
+
+#   The curves are evaluated once onto a shared grid when they are set. For drawing, the visible part of that grid is
+#   reduced to a minimum and maximum per pixel column and turned into one cached path per curve. While zooming or
+#   panning the cached paths are only transformed, the paths are rebuilt for the new range once the view settles.
+
+
+def _curveevaluator():
+    # numpy is only loaded once a curve is previewed, keeping the window cheap to open
+    from exportapi import curveevaluator
+    return curveevaluator
+
+
+def _polylinePath(xs, ys):
+    """
+    Builds a path through the given points straight from their arrays. The points are written in the serialized form
+    of a QPainterPath and read back in one go, instead of creating a QPointF per point: the element count, every
+    element's type and position, then the path's start element and fill rule, all big endian
+    """
+    # numpy is loaded by the time there are curves to draw
+    import numpy as np
+    elements = np.empty(len(xs), dtype=[("type", ">i4"), ("x", ">f8"), ("y", ">f8")])
+    elements["type"] = int(QtGui.QPainterPath.LineToElement)
+    elements["type"][0] = int(QtGui.QPainterPath.MoveToElement)
+    elements["x"] = xs
+    elements["y"] = ys
+    data = QtCore.QByteArray(struct.pack(">i", len(elements)) + elements.tobytes() + struct.pack(">ii", 0, int(QtCore.Qt.OddEvenFill)))
+    path = QtGui.QPainterPath()
+    QtCore.QDataStream(data) >> path
+    return path
+
+
+class CurvePreview(QtWidgets.QWidget):
+
+    rebuildDelay = 60
+    zoomFactor = 1.25
+    valueMargin = 8
+
+    def __init__(self, *args, **kwargs):
+        """
+        Draws a set of animation curves. Wheel zooms the time range around the cursor, dragging pans it and a double
+        click frames every curve again
+        """
+        super().__init__(*args, **kwargs)
+        self.setMinimumHeight(140)
+        self.setMouseTracking(False)
+
+        self._attributes = []
+        self._sampleTimes = None
+        self._values = None
+        self._valueRange = (0.0, 1.0)
+        self._timeRange = (0.0, 1.0)
+        self._viewRange = (0.0, 1.0)
+
+        self._paths = []
+        self._pathKey = None
+        self._pathRange = None
+
+        self._dragPosition = None
+        self._dragViewRange = None
+
+        self._rebuildTimer = QtCore.QTimer(self)
+        self._rebuildTimer.setSingleShot(True)
+        self._rebuildTimer.setInterval(self.rebuildDelay)
+        self._rebuildTimer.timeout.connect(self._rebuildPaths)
+
+    # region DATA
+
+    def setCurveData(self, animationCurveData, frameSeconds=1.0 / 24.0):
+        """
+        Shows the given curves, replacing the current ones
+
+        Parameters
+        ----------
+        animationCurveData: dict
+            Attribute name to keyframe time to keyframe data
+        frameSeconds: float
+            Length of a frame in seconds
+
+        """
+        curveevaluator = _curveevaluator()
+        curves = {
+            attr: curveevaluator.CurveArrays.fromKeyframeData(attributeCurveData)
+            for attr, attributeCurveData in animationCurveData.items()
+            if attributeCurveData
+        }
+        self._attributes = list(curves)
+        self._sampleTimes, self._values = curveevaluator.sampleCurvesUniform(list(curves.values()), frameSeconds=frameSeconds)
+        if self._values.size:
+            valueMin, valueMax = float(self._values.min()), float(self._values.max())
+            if valueMax - valueMin < 1e-9:
+                valueMin, valueMax = valueMin - 1.0, valueMax + 1.0
+            self._valueRange = (valueMin, valueMax)
+            self._timeRange = (float(self._sampleTimes[0]), float(self._sampleTimes[-1]))
+            if self._timeRange[1] - self._timeRange[0] < 1e-9:
+                self._timeRange = (self._timeRange[0] - 1.0, self._timeRange[1] + 1.0)
+        self.frameAll()
+
+    def clear(self):
+        self._attributes = []
+        self._sampleTimes = None
+        self._values = None
+        self._paths = []
+        self._pathKey = None
+        self.update()
+
+    def frameAll(self):
+        self._viewRange = self._timeRange
+        self._pathKey = None
+        self.update()
+
+    # endregion
+
+    # region PATHS
+
+    def _currentPathKey(self):
+        return self._viewRange, self.width(), self.height()
+
+    def _rebuildPaths(self):
+        """
+        Builds one path per curve for the current view range and size, in widget coordinates
+        """
+        self._paths = []
+        self._pathKey = self._currentPathKey()
+        self._pathRange = self._viewRange
+        if self._values is None or not self._values.size:
+            self.update()
+            return
+
+        width = max(self.width(), 1)
+        startTime, endTime = self._viewRange
+        pointTimes, pointValues = _curveevaluator().downsampleMinMax(self._sampleTimes, self._values, startTime, endTime, width)
+        if not len(pointTimes):
+            self.update()
+            return
+
+        xs = (pointTimes - startTime) * (width / (endTime - startTime))
+        ys = self._valueToY(pointValues)
+        for curveYs in ys:
+            self._paths.append(_polylinePath(xs, curveYs))
+        self.update()
+
+    def _valueToY(self, values):
+        valueMin, valueMax = self._valueRange
+        drawHeight = max(self.height() - 2 * self.valueMargin, 1)
+        return self.height() - self.valueMargin - (values - valueMin) * (drawHeight / (valueMax - valueMin))
+
+    def _scheduleRebuild(self):
+        self._rebuildTimer.start()
+        self.update()
+
+    # endregion
+
+    # region EVENTS
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), self.palette().color(QtGui.QPalette.Base))
+
+        if self._values is None or not self._values.size:
+            painter.setPen(self.palette().color(QtGui.QPalette.Mid))
+            painter.drawText(self.rect(), QtCore.Qt.AlignCenter, "No Curves To Preview")
+            return
+
+        if self._pathKey is None or (self._pathKey[1:] != self._currentPathKey()[1:]):
+            # new curves or a new size, neither can be transformed from the cached paths
+            self._rebuildTimer.stop()
+            self._rebuildPaths()
+
+        self._drawZeroLine(painter)
+
+        painter.save()
+        if self._pathRange != self._viewRange:
+            # draw the cached paths moved and scaled onto the new range until they are rebuilt for it
+            pathStart, pathEnd = self._pathRange
+            viewStart, viewEnd = self._viewRange
+            scale = (pathEnd - pathStart) / (viewEnd - viewStart)
+            painter.translate((pathStart - viewStart) * self.width() / (viewEnd - viewStart), 0.0)
+            painter.scale(scale, 1.0)
+
+        pen = QtGui.QPen()
+        pen.setCosmetic(True)
+        curveCount = len(self._paths)
+        for index, path in enumerate(self._paths):
+            pen.setColor(QtGui.QColor.fromHsvF((index / max(curveCount, 1)) % 1.0, 0.6, 0.95))
+            painter.setPen(pen)
+            painter.drawPath(path)
+        painter.restore()
+
+        painter.setPen(self.palette().color(QtGui.QPalette.Text))
+        viewStart, viewEnd = self._viewRange
+        painter.drawText(self.rect().adjusted(4, 2, -4, -2), QtCore.Qt.AlignBottom | QtCore.Qt.AlignLeft, f"{viewStart:g}")
+        painter.drawText(self.rect().adjusted(4, 2, -4, -2), QtCore.Qt.AlignBottom | QtCore.Qt.AlignRight, f"{viewEnd:g}")
+        painter.drawText(self.rect().adjusted(4, 2, -4, -2), QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft, f"{len(self._attributes)} curves")
+
+    def _drawZeroLine(self, painter):
+        valueMin, valueMax = self._valueRange
+        if not valueMin <= 0.0 <= valueMax:
+            return
+        zeroY = float(self._valueToY(0.0))
+        painter.setPen(self.palette().color(QtGui.QPalette.Mid))
+        painter.drawLine(QtCore.QPointF(0.0, zeroY), QtCore.QPointF(self.width(), zeroY))
+
+    def _timeAt(self, x):
+        viewStart, viewEnd = self._viewRange
+        return viewStart + (viewEnd - viewStart) * x / max(self.width(), 1)
+
+    def wheelEvent(self, event):
+        if self._values is None:
+            return
+        factor = 1.0 / self.zoomFactor if event.angleDelta().y() > 0 else self.zoomFactor
+        pivot = self._timeAt(event.pos().x())
+        viewStart, viewEnd = self._viewRange
+        self._viewRange = (pivot + (viewStart - pivot) * factor, pivot + (viewEnd - pivot) * factor)
+        self._scheduleRebuild()
+
+    def mousePressEvent(self, event):
+        self._dragPosition = event.pos().x()
+        self._dragViewRange = self._viewRange
+
+    def mouseMoveEvent(self, event):
+        if self._dragPosition is None:
+            return
+        viewStart, viewEnd = self._dragViewRange
+        shift = (self._dragPosition - event.pos().x()) * (viewEnd - viewStart) / max(self.width(), 1)
+        self._viewRange = (viewStart + shift, viewEnd + shift)
+        self._scheduleRebuild()
+
+    def mouseReleaseEvent(self, event):
+        self._dragPosition = None
+        self._dragViewRange = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.frameAll()
+
+    # endregion
@@ -14,7 +14,7 @@ if parentPackageDir not in sys.path:
 
 import resources
 
-from . import style
+from . import style, curvepreview
 # endregion
 
 
@@ -299,8 +299,11 @@ class ListItemSelectionView(QtWidgets.QListView):
 
 class FileSelector(HLayout):
     FileSelected = QtCore.Signal(str)
+    FilepathChanged = QtCore.Signal(str)
 
-    def __init__(self, filepath="", allow_pasting=True, *args, **kwargs):
+    filepathSeparator = ";"
+
+    def __init__(self, filepath="", allow_pasting=True, allow_multiple=False, *args, **kwargs):
         """
         Facilitates the selection of a file
 
@@ -310,11 +313,14 @@ class FileSelector(HLayout):
             Preexisting filepath to display
         allow_pasting: bool
             Whether to enable pasting of text into the file selection line edit
+        allow_multiple: bool
+            Whether several files can be selected at once, they are displayed separated by 'filepathSeparator'
         args
         kwargs
         """
         super().__init__(*args, **kwargs)
         self.allowPasting = allow_pasting
+        self.allowMultiple = allow_multiple
 
         self.buildWidget(filepath)
 
@@ -356,6 +362,7 @@ class FileSelector(HLayout):
         if not self.allowPasting:
             _line_edit.setReadOnly(True)
         self.FileSelected.connect(_line_edit.setText)
+        _line_edit.textChanged.connect(self.FilepathChanged.emit)
         return _line_edit
 
     def build_button(self):
@@ -378,6 +385,18 @@ class FileSelector(HLayout):
 
         """
         _file_browser = QtWidgets.QFileDialog()
+        if self.allowMultiple:
+            _selection_item = _file_browser.getOpenFileNames(
+                parent=self,
+                caption=("Select Files"),
+                dir="/home"
+            )
+            _selected_files = [_file for _file in _selection_item[0] if os.path.exists(_file)]
+            if not _selected_files:
+                return
+            self.fileSelectionLineedit.setText(self.filepathSeparator.join(_selected_files))
+            return
+
         _selection_item = _file_browser.getOpenFileName(
             parent=self,
             caption=("Select File"),
@@ -617,6 +636,9 @@ class AttributeEditor(HLayout):
     def attributeValue(self):
         return self.getEditorValue(self._attributeEditorWidget)
 
+    def editorWidget(self):
+        return self._attributeEditorWidget
+
     def setAttributeValue(self, value):
         if not self.valueValidator(value):
             raise TypeError
@@ -737,6 +759,35 @@ class AttributeEditorIntDisplay(AttributeEditor):
     def setEditorValue(self, attribute_editor, value):
         attribute_editor.setValue(value)
 
+class AttributeEditorFloatDisplay(AttributeEditor):
+
+    decimals = 6
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def valueValidator(self, test_value):
+
+        # In it's current serialization this datatype being a plain
+
+        if not isinstance(test_value, float):
+            return False
+
+        return True
+
+    def getEditorValue(self, attribute_editor):
+        return attribute_editor.value()
+
+    def buildEditorWidget(self):
+        editor = QtWidgets.QDoubleSpinBox()
+        editor.setDecimals(self.decimals)
+        editor.setSingleStep(10 ** -(self.decimals - 2))
+        editor.setMaximum(1e6)
+        return editor
+
+    def setEditorValue(self, attribute_editor, value):
+        attribute_editor.setValue(value)
+
 class AttributeEditorFileSaveDisplay(AttributeEditor):
 
     def __init__(self, *args, **kwargs):
@@ -785,7 +836,7 @@ class AttributeEditorFileSelectDisplay(AttributeEditor):
         return attribute_editor.filepath()
 
     def buildEditorWidget(self):
-        editor = FileSelector()
+        editor = FileSelector(allow_multiple=True)
         return editor
 
     def setEditorValue(self, attribute_editor, value):
@@ -860,20 +911,212 @@ class ObjectListPanel(VLayout):
         self.SelectionChanged.emit(selectionData)
 
 
+class LibrarySearchPanel(VLayout):
+    SearchRequested = QtCore.Signal(dict)
+    RescanRequested = QtCore.Signal()
+
+    resultColumns = ["File", "Clip", "Object", "Attribute", "Keys", "Start", "End"]
+
+    def __init__(self, *args, **kwargs):
+        """
+        Searches the library index of exported files by object, attribute and covered frame range
+        """
+        super().__init__(*args, **kwargs)
+        self.objectField = QtWidgets.QLineEdit()
+        self.objectField.setPlaceholderText("Object, * wildcards")
+        self.attributeField = QtWidgets.QLineEdit()
+        self.attributeField.setPlaceholderText("Attribute, * wildcards")
+        self.startField = QtWidgets.QLineEdit()
+        self.startField.setPlaceholderText("From frame")
+        self.startField.setValidator(QtGui.QDoubleValidator())
+        self.endField = QtWidgets.QLineEdit()
+        self.endField.setPlaceholderText("To frame")
+        self.endField.setValidator(QtGui.QDoubleValidator())
+
+        for field in (self.objectField, self.attributeField, self.startField, self.endField):
+            field.returnPressed.connect(self.emitSearchRequested)
+
+        searchButton = QtWidgets.QPushButton(text="Search")
+        searchButton.setStyleSheet(style.maya_button)
+        searchButton.clicked.connect(self.emitSearchRequested)
+        rescanButton = QtWidgets.QPushButton(text="Rescan")
+        rescanButton.setStyleSheet(style.maya_button)
+        rescanButton.clicked.connect(self.RescanRequested.emit)
+
+        frameLayout = HLayout(spacing=5)
+        frameLayout.addWidgets([self.startField, self.endField])
+        buttonLayout = HLayout(spacing=5)
+        buttonLayout.addWidgets([searchButton, rescanButton])
+
+        self.resultsView = QtWidgets.QTreeWidget()
+        self.resultsView.setHeaderLabels(self.resultColumns)
+        self.resultsView.setRootIsDecorated(False)
+        self.resultsView.itemDoubleClicked.connect(self.copyResultFilepath)
+        self.statusLabel = QtWidgets.QLabel()
+
+        self.addWidgets([self.objectField, self.attributeField, frameLayout, buttonLayout])
+        self.addWidget(self.resultsView, stretch=1)
+        self.addWidget(self.statusLabel)
+
+    @staticmethod
+    def _frameValue(field):
+        text = field.text().strip()
+        return float(text) if text else None
+
+    def emitSearchRequested(self):
+        self.SearchRequested.emit({
+            "objectName": self.objectField.text().strip() or None,
+            "attribute": self.attributeField.text().strip() or None,
+            "startFrame": self._frameValue(self.startField),
+            "endFrame": self._frameValue(self.endField),
+        })
+
+    def populateResults(self, curves):
+        self.resultsView.clear()
+        for curve in curves:
+            item = QtWidgets.QTreeWidgetItem([
+                os.path.basename(curve["path"]),
+                curve["clip"] or "",
+                curve["objectName"] or "",
+                curve["attribute"],
+                str(curve["keyCount"]),
+                f"{curve['startTime']:g}" if curve["startTime"] is not None else "",
+                f"{curve['endTime']:g}" if curve["endTime"] is not None else "",
+            ])
+            item.setToolTip(0, curve["path"])
+            item.setData(0, QtCore.Qt.UserRole, curve["path"])
+            self.resultsView.addTopLevelItem(item)
+        self.statusLabel.setText(f"{len(curves)} curves")
+
+    def setStatus(self, text):
+        self.statusLabel.setText(text)
+
+    def copyResultFilepath(self, item, column):
+        filepath = item.data(0, QtCore.Qt.UserRole)
+        QtWidgets.QApplication.clipboard().setText(filepath)
+        self.statusLabel.setText(f"Copied {filepath}")
+
+
+class JobQueuePanel(VLayout):
+    MoveRequested = QtCore.Signal(int, int)
+    RemoveRequested = QtCore.Signal(int)
+    StartRequested = QtCore.Signal()
+    StopRequested = QtCore.Signal()
+    ClearFinishedRequested = QtCore.Signal()
+
+    jobColumns = ["Type", "Object", "File", "Status", "Attempts", "Estimate"]
+
+    def __init__(self, *args, **kwargs):
+        """
+        Lists the queued export and import jobs, which run one after the other once started
+        """
+        super().__init__(*args, **kwargs)
+        self.jobsView = QtWidgets.QTreeWidget()
+        self.jobsView.setHeaderLabels(self.jobColumns)
+        self.jobsView.setRootIsDecorated(False)
+
+        buttonLayout = HLayout(spacing=5)
+        for text, slot in (
+            ("Up", lambda: self.emitMoveRequested(-1)),
+            ("Down", lambda: self.emitMoveRequested(1)),
+            ("Remove", self.emitRemoveRequested),
+            ("Clear Done", self.ClearFinishedRequested.emit),
+        ):
+            button = QtWidgets.QPushButton(text=text)
+            button.setStyleSheet(style.maya_button)
+            button.clicked.connect(slot)
+            buttonLayout.addWidget(button)
+
+        runLayout = HLayout(spacing=5)
+        for text, signal in (("Run Queue", self.StartRequested), ("Stop", self.StopRequested)):
+            button = QtWidgets.QPushButton(text=text)
+            button.setStyleSheet(style.maya_button)
+            button.clicked.connect(signal.emit)
+            runLayout.addWidget(button)
+
+        self.statusLabel = QtWidgets.QLabel(text="No jobs queued")
+
+        self.addWidget(self.jobsView, stretch=1)
+        self.addWidgets([buttonLayout, runLayout, self.statusLabel])
+
+    def _selectedJobId(self):
+        item = self.jobsView.currentItem()
+        if item is None:
+            return None
+        return item.data(0, QtCore.Qt.UserRole)
+
+    def emitMoveRequested(self, offset):
+        jobId = self._selectedJobId()
+        if jobId is not None:
+            self.MoveRequested.emit(jobId, offset)
+
+    def emitRemoveRequested(self):
+        jobId = self._selectedJobId()
+        if jobId is not None:
+            self.RemoveRequested.emit(jobId)
+
+    @staticmethod
+    def _formatSeconds(seconds):
+        if seconds is None:
+            return ""
+        return f"{seconds:.1f}s" if seconds < 60 else f"{int(seconds // 60)}m {int(seconds % 60)}s"
+
+    def populateJobs(self, jobs, remainingDuration):
+        selectedJobId = self._selectedJobId()
+        self.jobsView.clear()
+        for job in jobs:
+            item = QtWidgets.QTreeWidgetItem([
+                job["jobType"],
+                job["objectName"] or "",
+                os.path.basename(job["filepath"] or ""),
+                job["status"],
+                str(job["attempts"]),
+                self._formatSeconds(job["duration"] if job["duration"] is not None else job["estimatedDuration"]),
+            ])
+            item.setData(0, QtCore.Qt.UserRole, job["jobId"])
+            item.setToolTip(2, job["filepath"] or "")
+            if job["error"]:
+                item.setToolTip(3, job["error"])
+            self.jobsView.addTopLevelItem(item)
+            if job["jobId"] == selectedJobId:
+                self.jobsView.setCurrentItem(item)
+
+        waiting = sum(job["status"] in ("pending", "running") for job in jobs)
+        self.statusLabel.setText(f"{waiting} of {len(jobs)} jobs waiting, about {self._formatSeconds(remainingDuration) or '0.0s'} left")
+
+
 class ObjectPortPanel(VLayout):
     # ExportObjectAnimation = QtCore.Signal(str, str, object, object)
     # ImportObjectAnimation = QtCore.Signal(str, str, float)
 
     CommitButtonClicked = QtCore.Signal(dict)
+    QueueButtonClicked = QtCore.Signal(dict)
+    PreviewFileRequested = QtCore.Signal(str)
+
+    # milliseconds the file path has to stay unchanged before its file is read for the preview
+    previewDelay = 400
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        self._previewFilepath = None
+        self._previewTimer = QtCore.QTimer(self)
+        self._previewTimer.setSingleShot(True)
+        self._previewTimer.setInterval(self.previewDelay)
+        self._previewTimer.timeout.connect(self._emitPreviewFile)
+
         self.dataDisplay = self.buildDataDisplay()
+        self.curvePreview = curvepreview.CurvePreview()
         self.commitButton = self.buildCommitButton("Export")
+        self.queueButton = self.buildQueueButton()
+
+        buttonLayout = HLayout(spacing=5)
+        buttonLayout.addWidget(self.commitButton, stretch=1)
+        buttonLayout.addWidget(self.queueButton)
 
         self.addWidget(self.dataDisplay)
-        self.addWidget(self.commitButton, alignment=QtCore.Qt.AlignBottom)
+        self.addWidget(self.curvePreview, stretch=1)
+        self.addWidget(buttonLayout, alignment=QtCore.Qt.AlignBottom)
 
         self.setEmptyData()
 
@@ -884,6 +1127,16 @@ class ObjectPortPanel(VLayout):
         button.clicked.connect(self.emitCommitButtonClicked)
         return button
 
+    def buildQueueButton(self):
+        button = QtWidgets.QPushButton(text="Add To Queue")
+        button.setStyleSheet(style.maya_button)
+        button.setMinimumSize(100, 35)
+        button.clicked.connect(self.emitQueueButtonClicked)
+        return button
+
+    def emitQueueButtonClicked(self):
+        self.QueueButtonClicked.emit(self.dataDisplay.attributeDictionary())
+
     def emitCommitButtonClicked(self):
         self.CommitButtonClicked.emit(self.dataDisplay.attributeDictionary())
 
@@ -902,6 +1155,7 @@ class ObjectPortPanel(VLayout):
                 AttributeEditorFileSaveDisplay,
                 AttributeEditorFileSelectDisplay,
                 AttributeEditorIntDisplay,
+                AttributeEditorFloatDisplay,
                 AttributeEditorChecklist,
                 AttributeEditorStringDisplay
             ],
@@ -913,17 +1167,47 @@ class ObjectPortPanel(VLayout):
 
     def populateObjectData(self, objectData):
         self.dataDisplay.setAttributes(objectData)
+        for editor in self.dataDisplay.children():
+            if isinstance(editor, AttributeEditorFileSelectDisplay):
+                editor.editorWidget().FilepathChanged.connect(self.emitPreviewFileRequested)
+                editor.editorWidget().FilepathChanged.connect(self.updateAttributeSelection)
         # self.titleLabel = QtWidgets.QLabel(text=objectName)
         # self.dataDisplay.addWidget(self.titleLabel, alignment=QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
         self.commitButton.setEnabled(True)
+        self.queueButton.setEnabled(True)
 
         return
 
     def setEmptyData(self):
+        self._previewTimer.stop()
         self.dataDisplay.clear_layout()
         emptyLabel = QtWidgets.QLabel(text='No Data To Display')
         self.dataDisplay.addWidget(emptyLabel, alignment=QtCore.Qt.AlignCenter)
+        self.curvePreview.clear()
         self.commitButton.setEnabled(False)
+        self.queueButton.setEnabled(False)
+
+    def emitPreviewFileRequested(self, filepath):
+        # the path changes with every typed character, the file is only read once typing paused
+        self._previewFilepath = filepath
+        self._previewTimer.start()
+
+    def _emitPreviewFile(self):
+        # with several files selected the first one is previewed
+        filepath = self._previewFilepath.split(FileSelector.filepathSeparator)[0].strip()
+        if os.path.isfile(filepath):
+            self.PreviewFileRequested.emit(filepath)
+
+    def updateAttributeSelection(self, filepath):
+        # several files import onto the objects they are named after with all of their attributes
+        multipleFiles = len([_file for _file in filepath.split(FileSelector.filepathSeparator) if _file.strip()]) > 1
+        for editor in self.dataDisplay.children():
+            if isinstance(editor, AttributeEditorChecklist):
+                editor.editorWidget().setEnabled(not multipleFiles)
+                editor.editorWidget().setToolTip("Each file imports every attribute onto the object it is named after" if multipleFiles else "")
+
+    def setCurvePreview(self, animationCurveData, frameSeconds):
+        self.curvePreview.setCurveData(animationCurveData, frameSeconds)
 
     def emitExportObjectAnimation(self, filepath):
         self.ExportObjectAnimation.emit(self.objectName, filepath, None, None)
@@ -939,6 +1223,16 @@ class MainWindow(QtWidgets.QMainWindow):
     ObjectSelected = QtCore.Signal(str)
     PortCommitButtonClicked = QtCore.Signal(dict)
     InterfaceModeChanged = QtCore.Signal(str)
+    LibrarySearchRequested = QtCore.Signal(dict)
+    LibraryRescanRequested = QtCore.Signal()
+    PreviewFileRequested = QtCore.Signal(str)
+    PortQueueButtonClicked = QtCore.Signal(dict)
+    JobMoveRequested = QtCore.Signal(int, int)
+    JobRemoveRequested = QtCore.Signal(int)
+    JobQueueStartRequested = QtCore.Signal()
+    JobQueueStopRequested = QtCore.Signal()
+    ClearFinishedJobsRequested = QtCore.Signal()
+    ProfilingToggled = QtCore.Signal(bool)
 
 
     def __new__(cls, *args, **kwargs):
@@ -965,13 +1259,30 @@ class MainWindow(QtWidgets.QMainWindow):
         self.sceneObjectList.SelectionChanged.connect(self.emitObjectSelected)
         self.sceneObjectList.setStyleSheet(style.maya_outliner)
 
+        self.librarySearchPanel = LibrarySearchPanel(margins=[0, 5, 0, 0], spacing=5)
+        self.librarySearchPanel.SearchRequested.connect(self.LibrarySearchRequested.emit)
+        self.librarySearchPanel.RescanRequested.connect(self.LibraryRescanRequested.emit)
+
+        browserTabs = QtWidgets.QTabWidget()
+        browserTabs.addTab(self.sceneObjectList, "Scene")
+        browserTabs.addTab(self.librarySearchPanel, "Library")
+
+        self.jobQueuePanel = JobQueuePanel(margins=[0, 5, 0, 0], spacing=5)
+        self.jobQueuePanel.MoveRequested.connect(self.JobMoveRequested.emit)
+        self.jobQueuePanel.RemoveRequested.connect(self.JobRemoveRequested.emit)
+        self.jobQueuePanel.StartRequested.connect(self.JobQueueStartRequested.emit)
+        self.jobQueuePanel.StopRequested.connect(self.JobQueueStopRequested.emit)
+        self.jobQueuePanel.ClearFinishedRequested.connect(self.ClearFinishedJobsRequested.emit)
+        browserTabs.addTab(self.jobQueuePanel, "Queue")
 
 
         self.objectPortPanel = ObjectPortPanel(margins=8)
         self.objectPortPanel.CommitButtonClicked.connect(self.PortCommitButtonClicked.emit)
+        self.objectPortPanel.PreviewFileRequested.connect(self.PreviewFileRequested.emit)
+        self.objectPortPanel.QueueButtonClicked.connect(self.PortQueueButtonClicked.emit)
 
         splitter = QtWidgets.QSplitter()
-        splitter.addWidget(self.sceneObjectList)
+        splitter.addWidget(browserTabs)
         splitter.addWidget(self.objectPortPanel)
         splitter.setStyleSheet(style.maya_splitter)
 
@@ -980,12 +1291,20 @@ class MainWindow(QtWidgets.QMainWindow):
         _centralWidget.addWidget(splitter, stretch=1)
 
         self.setCentralWidget(_centralWidget)
+        self._buildMenuBar()
         self.setMinimumSize(*resources.windowSize())
         self.setWindowTitle(resources.applicationName())
         self.setStyleSheet(style.maya_widget)
         splitter.setSizes([300, 700])
 
 
+    def _buildMenuBar(self):
+        toolsMenu = self.menuBar().addMenu("Tools")
+        self.profilingAction = toolsMenu.addAction("Profile Jobs")
+        self.profilingAction.setCheckable(True)
+        self.profilingAction.setToolTip("Write a profile and hot function report for every export and import")
+        self.profilingAction.toggled.connect(self.ProfilingToggled.emit)
+
     def _buildInterfaceModeButton(self):
         button = ToggleButton(
             enabled_text=resources.InterfaceModes.getInterfaceModeName(resources.InterfaceModes.Mode1),
@@ -1034,3 +1353,23 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def emitObjectSelected(self, objectName):
         self.ObjectSelected.emit(objectName)
+
+    @QtCore.Slot()
+    def setCurvePreview(self, animationCurveData, frameSeconds):
+        self.objectPortPanel.setCurvePreview(animationCurveData, frameSeconds)
+
+    @QtCore.Slot()
+    def setProfilingChecked(self, checked):
+        self.profilingAction.setChecked(checked)
+
+    @QtCore.Slot()
+    def populateJobQueue(self, jobs, remainingDuration):
+        self.jobQueuePanel.populateJobs(jobs, remainingDuration)
+
+    @QtCore.Slot()
+    def populateLibraryResults(self, curves):
+        self.librarySearchPanel.populateResults(curves)
+
+    @QtCore.Slot()
+    def setLibraryStatus(self, text):
+        self.librarySearchPanel.setStatus(text)
@@ -1,7 +1,10 @@
-import os
+import os, json, hashlib, tempfile
 
 stylesheet_dir = os.path.join(os.path.dirname(__file__), "stylesheets")
 
+# Processed stylesheets are written here so a cold start only has to read one file per sheet
+stylesheet_cache_dir = os.path.join(tempfile.gettempdir(), "IW_AnimExporter", "qss_cache")
+
 def process_stylesheet(stylesheet, variables):
     _processed = stylesheet
 
@@ -30,30 +33,128 @@ variables = {
     "@primary_100;": "#656565;",
 }
 
-def get_style_var(style):
-    _stylesheet_path = os.path.join(stylesheet_dir, style)
-    with open(_stylesheet_path, "r") as f:
-        _data = f.read()
+# Stylesheets that can be embedded into other stylesheets by placeholder
+style_var_sources = {
+    "@@maya_button@@": "maya_button.qss"
+}
 
-    return process_stylesheet(_data, variables)
+# Module attribute name -> stylesheet file, compiled on first access
+stylesheets = {
+    "maya_button": "maya_button.qss",
+    "maya_widget": "maya_widget.qss",
+    "maya_outliner": "maya_outliner.qss",
+    "maya_splitter": "maya_splitter.qss",
+}
 
+_compiled = {}
 
 
-style_var = {
-    "@@maya_button@@": get_style_var("maya_button.qss")
-}
-def get_stylesheet(style):
+def _read_stylesheet(style):
     _stylesheet_path = os.path.join(stylesheet_dir, style)
     with open(_stylesheet_path, "r") as f:
-        _data = f.read()
+        return f.read()
+
+def _cache_key(style):
+    """
+    Builds a key describing every input that affects the processed result of the given stylesheet
+
+    Parameters
+    ----------
+    style: str
+        Stylesheet file name
+
+    Returns
+    -------
+    str
+
+    """
+    _sources = [style] + sorted(style_var_sources.values())
+    _mtimes = [os.stat(os.path.join(stylesheet_dir, _source)).st_mtime_ns for _source in _sources]
+    _payload = json.dumps([_sources, _mtimes, variables, style_var_sources], sort_keys=True)
+    return hashlib.sha1(_payload.encode("utf-8")).hexdigest()
+
+def _cache_path(style):
+    return os.path.join(stylesheet_cache_dir, f"{style}.cache")
+
+def _read_cache(style, key):
+    try:
+        with open(_cache_path(style), "r") as f:
+            _cachedKey = f.readline().strip()
+            if _cachedKey != key:
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+def _write_cache(style, key, data):
+    try:
+        os.makedirs(stylesheet_cache_dir, exist_ok=True)
+        _tmpPath = f"{_cache_path(style)}.{os.getpid()}.tmp"
+        with open(_tmpPath, "w") as f:
+            f.write(f"{key}\n")
+            f.write(data)
+        os.replace(_tmpPath, _cache_path(style))
+    except OSError:
+        # A read only temp dir only costs us the cache, the stylesheet itself is still valid
+        return
 
-    _data = get_style_var(style)
+def get_style_var(style):
+    return process_stylesheet(_read_stylesheet(style), variables)
 
-    return process_stylesheet(_data, style_var)
+def compile_stylesheet(style):
+    """
+    Processes the given stylesheet without consulting any cache
 
+    Parameters
+    ----------
+    style: str
+        Stylesheet file name
 
+    Returns
+    -------
+    str
 
-maya_button = get_stylesheet("maya_button.qss")
-maya_widget = get_stylesheet("maya_widget.qss")
-maya_outliner = get_stylesheet("maya_outliner.qss")
-maya_splitter = get_stylesheet("maya_splitter.qss")
+    """
+    style_var = {_var: get_style_var(_source) for _var, _source in style_var_sources.items()}
+    return process_stylesheet(get_style_var(style), style_var)
+
+def get_stylesheet(style):
+    """
+    Gets the processed stylesheet, from memory, then the on disk cache, compiling it only when the sources changed
+
+    Parameters
+    ----------
+    style: str
+        Stylesheet file name
+
+    Returns
+    -------
+    str
+
+    """
+    _key = _cache_key(style)
+    _memoryCached = _compiled.get(style)
+    if _memoryCached is not None and _memoryCached[0] == _key:
+        return _memoryCached[1]
+
+    _data = _read_cache(style, _key)
+    if _data is None:
+        _data = compile_stylesheet(style)
+        _write_cache(style, _key, _data)
+
+    _compiled[style] = (_key, _data)
+    return _data
+
+def clear_cache():
+    _compiled.clear()
+    for style in stylesheets.values():
+        try:
+            os.remove(_cache_path(style))
+        except OSError:
+            continue
+
+def __getattr__(name):
+    # Lazily compiles 'maya_button', 'maya_widget', etc. the first time they are accessed
+    if name in stylesheets:
+        return get_stylesheet(stylesheets[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,79 @@
+import os, sys
+
+import pytest
+
+# the package's modules import each other as top level 'exportapi' and 'resources', as they do inside Maya
+packageDir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "IW_AnimExporter")
+if packageDir not in sys.path:
+    sys.path.insert(0, packageDir)
+
+
+@pytest.fixture(autouse=True)
+def isolatedLogs(tmp_path, monkeypatch):
+    """
+    Keeps telemetry and the library index of every test in its own temp directory
+    """
+    monkeypatch.setenv("IW_ANIMEXPORTER_TELEMETRY_LOG", str(tmp_path / "telemetry.jsonl"))
+    monkeypatch.setenv("IW_ANIMEXPORTER_LIBRARY_INDEX", str(tmp_path / "library.sqlite"))
+    monkeypatch.delenv("IW_ANIMEXPORTER_EXPORT_MEMORY_BUDGET", raising=False)
+    monkeypatch.delenv("IW_ANIMEXPORTER_PROFILE", raising=False)
+
+
+class FakeSceneCommands(object):
+    """
+    Stands in for 'maya.cmds' with the undo queue, viewport refresh and evaluation manager state of a scene, recording
+    every call in order
+    """
+
+    def __init__(self, undoState=True, refreshSuspended=False, evaluationMode="parallel"):
+        self.undoState = undoState
+        self.refreshSuspended = refreshSuspended
+        self.evaluationMode = evaluationMode
+        self.openChunks = []
+        self.calls = []
+
+    def undoInfo(self, query=False, state=False, stateWithoutFlush=None, openChunk=False, closeChunk=False, chunkName=None):
+        self.calls.append(("undoInfo", dict(query=query, stateWithoutFlush=stateWithoutFlush, openChunk=openChunk, closeChunk=closeChunk)))
+        if query:
+            return self.undoState
+        if stateWithoutFlush is not None:
+            self.undoState = stateWithoutFlush
+        if openChunk:
+            self.openChunks.append(chunkName)
+        if closeChunk:
+            self.openChunks.pop()
+
+    def refresh(self, query=False, suspend=None):
+        self.calls.append(("refresh", dict(query=query, suspend=suspend)))
+        if query:
+            return self.refreshSuspended
+        self.refreshSuspended = suspend
+
+    def evaluationManager(self, query=False, mode=None):
+        self.calls.append(("evaluationManager", dict(query=query, mode=mode)))
+        if query:
+            return [self.evaluationMode]
+        self.evaluationMode = mode
+
+
+@pytest.fixture
+def sceneCommands(monkeypatch):
+    """
+    Replaces the commands of 'exporthandler' with a 'FakeSceneCommands'
+    """
+    from exportapi import exporthandler
+    commands = FakeSceneCommands()
+    monkeypatch.setattr(exporthandler, "cmds", commands)
+    return commands
+
+
+def keyframe(value, inAngle=0.0, outAngle=0.0, inWeight=1.0, outWeight=1.0, tangentType="auto"):
+    return {
+        "value": value,
+        "inTangentType": tangentType,
+        "outTangentType": tangentType,
+        "inAngle": inAngle,
+        "outAngle": outAngle,
+        "inWeight": inWeight,
+        "outWeight": outWeight,
+    }
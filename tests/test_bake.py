@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from exportapi import exporthandler
+
+frameSeconds = 1.0 / 24.0
+
+
+def test_sample_times_include_the_end_frame():
+    assert exporthandler.getSampleTimes(0, 2) == [0.0, 1.0, 2.0]
+    assert exporthandler.getSampleTimes(1, 2, step=0.25) == [1.0, 1.25, 1.5, 1.75, 2.0]
+    assert exporthandler.getSampleTimes(0, 0.9) == [0.0]
+    with pytest.raises(ValueError):
+        exporthandler.getSampleTimes(0, 10, step=0)
+
+def test_baked_samples_become_linear_keys_along_the_samples(monkeypatch):
+    monkeypatch.setattr(exporthandler, "secondsPerFrame", lambda: frameSeconds)
+    monkeypatch.setattr(exporthandler, "sampleObjectAttributes", lambda objectName, attributes, sampleTimes: {attr: [2.0 * sampleTime for sampleTime in sampleTimes] for attr in attributes})
+
+    baked = exporthandler.getBakedAnimationData("hero", ["translateX"], 0, 4, step=2.0)
+
+    curve = baked["translateX"]
+    assert sorted(curve) == [0.0, 2.0, 4.0]
+    slopeAngle = math.degrees(math.atan(2.0 / frameSeconds))
+    for keyframeTime, keyframeData in curve.items():
+        assert keyframeData["value"] == 2.0 * keyframeTime
+        assert keyframeData["inTangentType"] == keyframeData["outTangentType"] == exporthandler.bakedTangentType
+    assert curve[0.0]["inAngle"] == 0.0 and curve[4.0]["outAngle"] == 0.0
+    assert curve[2.0]["inAngle"] == pytest.approx(slopeAngle) and curve[2.0]["outAngle"] == pytest.approx(slopeAngle)
+
+def test_reduction_keeps_the_endpoints_and_the_corners():
+    sampleTimes = [float(t) for t in range(9)]
+    values = [min(t, 4.0) for t in sampleTimes]
+    curve = exporthandler.buildDenseCurveData(sampleTimes, values, frameSeconds)
+
+    reduced = exporthandler.reduceCurveKeys(curve, tolerance=1e-6, frameSeconds=frameSeconds)
+
+    assert sorted(reduced) == [0.0, 4.0, 8.0]
+    assert reduced[4.0]["inAngle"] == pytest.approx(math.degrees(math.atan(1.0 / frameSeconds)))
+    assert reduced[4.0]["outAngle"] == 0.0
+
+def test_reduction_tolerance_and_non_linear_keys():
+    sampleTimes = [0.0, 1.0, 2.0, 3.0]
+    curve = exporthandler.buildDenseCurveData(sampleTimes, [0.0, 1.001, 2.0, 3.0], frameSeconds)
+    assert sorted(exporthandler.reduceCurveKeys(curve, tolerance=0.01, frameSeconds=frameSeconds)) == [0.0, 3.0]
+    assert 1.0 in exporthandler.reduceCurveKeys(curve, tolerance=0.0001, frameSeconds=frameSeconds)
+
+    curve[2.0]["outTangentType"] = "auto"
+    assert 2.0 in exporthandler.reduceCurveKeys(curve, tolerance=0.01, frameSeconds=frameSeconds)
@@ -0,0 +1,28 @@
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def test_clips_keep_the_keys_on_their_boundaries():
+    curve = {float(t): keyframe(float(t)) for t in range(0, 12, 2)}
+    clips = [{"name": "walk", "start": 0, "end": 4}, {"name": "run", "start": 4, "end": 9}]
+
+    sliced = exporthandler.sliceClips({"translateX": curve}, clips)
+
+    assert sorted(sliced["walk"]["translateX"]) == [0.0, 2.0, 4.0]
+    assert sorted(sliced["run"]["translateX"]) == [4.0, 6.0, 8.0]
+    assert sliced["run"]["translateX"][6.0] == curve[6.0]
+
+def test_rebased_clips_start_at_frame_zero():
+    curve = {float(t): keyframe(float(t)) for t in range(10, 20)}
+    sliced = exporthandler.sliceClips({"translateX": curve}, [{"name": "idle", "start": 12.5, "end": 15}], rebase=True)
+    assert sliced["idle"]["translateX"] == {0.5: curve[13.0], 1.5: curve[14.0], 2.5: curve[15.0]}
+
+def test_exported_clips_read_back_per_clip(tmp_path):
+    curve = {float(t): keyframe(float(t)) for t in range(10)}
+    clips = [{"name": "walk", "start": 0, "end": 4}, {"name": "run", "start": 5, "end": 9}]
+    filepath = str(tmp_path / "hero.json")
+    exporthandler.writeJson(filepath, exporthandler.sliceClips({"translateX": curve}, clips), clips=True)
+
+    animationCurveData = exporthandler.readJson(filepath)
+    assert exporthandler.clipCurveData(filepath, animationCurveData, clip="run") == {"translateX": {t: curve[t] for t in range(5, 10)}}
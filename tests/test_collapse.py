@@ -0,0 +1,40 @@
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def _curves():
+    curve = {float(t): keyframe(0.5 * t * t, inAngle=10.0 * t, outAngle=10.0 * t) for t in range(6)}
+    return {
+        "translateX": curve,
+        "translateY": {t: dict(k, value=k["value"] - 3.25) for t, k in curve.items()},
+        "translateZ": {t: dict(k, value=k["value"] + 1.0) for t, k in curve.items()},
+        "visibility": {float(t): keyframe(1.0) for t in range(3)},
+        "rotateX": {t: dict(k, inTangentType="linear") for t, k in curve.items()},
+    }
+
+def test_static_and_repeated_curves_collapse():
+    collapsed = exporthandler.collapseCurveData(_curves())
+
+    assert collapsed["visibility"][exporthandler.staticCurveKey] == 1.0
+    assert collapsed["visibility"][exporthandler.staticTimesKey] == [0.0, 1.0, 2.0]
+    # repeated curves reference the first curve of their shape, never another reference
+    assert collapsed["translateY"] == {exporthandler.referenceCurveKey: "translateX", exporthandler.referenceOffsetKey: -3.25}
+    assert collapsed["translateZ"] == {exporthandler.referenceCurveKey: "translateX", exporthandler.referenceOffsetKey: 1.0}
+    assert not exporthandler.isCollapsedCurve(collapsed["translateX"])
+    assert not exporthandler.isCollapsedCurve(collapsed["rotateX"])
+
+def test_collapsed_curves_round_trip_in_memory():
+    # the offsets are exact in binary, so the expanded values match exactly
+    curves = _curves()
+    assert dict(exporthandler.expandCurveItems(exporthandler.collapseCurveData(curves).items())) == curves
+
+def test_collapsed_curves_round_trip_through_a_file(tmp_path):
+    curves = _curves()
+    filepath = str(tmp_path / "hero.json")
+    exporthandler.writeJson(filepath, exporthandler.iterCollapsedCurves(curves.items()))
+
+    stored = dict(exporthandler.iterJson(filepath, expand=False))
+    assert exporthandler.staticCurveKey in stored["visibility"]
+    assert exporthandler.referenceCurveKey in stored["translateY"]
+    assert exporthandler.readJson(filepath) == curves
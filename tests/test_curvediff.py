@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import keyframe
+
+from exportapi import exporthandler, curvediff
+
+
+def _writeClipFile(filepath, runOffset=0.0):
+    curve = {float(t): keyframe(float(t)) for t in range(4)}
+    runCurve = {t: dict(k, value=k["value"] + runOffset) for t, k in curve.items()}
+    exporthandler.writeJson(filepath, {"walk": {"translateX": curve}, "run": {"translateX": runCurve}}, clips=True)
+
+def test_compare_files_picks_a_clip(tmp_path):
+    filepathA = str(tmp_path / "a.json")
+    filepathB = str(tmp_path / "b.json")
+    _writeClipFile(filepathA)
+    _writeClipFile(filepathB, runOffset=1.0)
+
+    assert curvediff.compareFiles(filepathA, filepathB, clip="walk").passed()
+    assert not curvediff.compareFiles(filepathA, filepathB, clip="run").passed()
+    assert curvediff.main([filepathA, filepathB, "--clip", "walk"]) == 0
+
+def test_compare_files_needs_a_clip_for_clip_files(tmp_path):
+    filepath = str(tmp_path / "a.json")
+    _writeClipFile(filepath)
+    with pytest.raises(ValueError, match="walk, run"):
+        curvediff.compareFiles(filepath, filepath)
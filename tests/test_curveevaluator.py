@@ -0,0 +1,25 @@
+import numpy as np
+
+from exportapi import curveevaluator
+
+
+def test_weighted_curves_with_clamped_control_points_are_solved_exactly(monkeypatch):
+    # long tangents are clamped onto the neighbouring key, leaving time flat at the segment ends
+    curve = curveevaluator.CurveArrays(
+        times=[0.0, 3.0, 10.0, 11.0],
+        values=[0.0, 5.0, -2.0, 1.0],
+        inTangentTypes=["fixed"] * 4,
+        inAngles=[0.0, 80.0, -70.0, 10.0],
+        inWeights=[1.0, 30.0, 50.0, 5.0],
+        outTangentTypes=["fixed"] * 4,
+        outAngles=[60.0, 30.0, -85.0, 10.0],
+        outWeights=[40.0, 20.0, 60.0, 1.0],
+        weighted=True
+    )
+    sampleTimes = np.linspace(0.0, 11.0, 20001)
+    values = curveevaluator.evaluateCurve(curve, sampleTimes)
+
+    # plain bisection run far past double precision as the reference
+    monkeypatch.setattr(curveevaluator, "_maxBezierIterations", 200)
+    monkeypatch.setattr(curveevaluator, "_bezierParameterTolerance", 0.0)
+    np.testing.assert_allclose(values, curveevaluator.evaluateCurve(curve, sampleTimes), atol=1e-9)
@@ -0,0 +1,39 @@
+import pytest
+
+from exportapi import exporthandler
+
+
+def test_edits_run_in_one_undo_chunk_with_updates_suspended(sceneCommands):
+    with exporthandler.suspendedSceneUpdates(chunkName="import"):
+        assert sceneCommands.openChunks == ["import"]
+        assert sceneCommands.refreshSuspended is True
+        assert sceneCommands.evaluationMode == "off"
+
+    assert sceneCommands.openChunks == []
+    assert sceneCommands.refreshSuspended is False
+    assert sceneCommands.evaluationMode == "parallel"
+
+def test_scene_state_is_restored_when_the_edits_raise(sceneCommands):
+    with pytest.raises(RuntimeError):
+        with exporthandler.suspendedSceneUpdates():
+            raise RuntimeError("failed halfway")
+
+    assert sceneCommands.openChunks == []
+    assert sceneCommands.refreshSuspended is False
+    assert sceneCommands.evaluationMode == "parallel"
+
+def test_disabled_undo_replaces_the_chunk_and_is_turned_back_on(sceneCommands):
+    with exporthandler.suspendedSceneUpdates(disableUndo=True):
+        assert sceneCommands.undoState is False
+        assert sceneCommands.openChunks == []
+    assert sceneCommands.undoState is True
+
+def test_state_already_suspended_is_left_alone(sceneCommands):
+    sceneCommands.refreshSuspended = True
+    sceneCommands.evaluationMode = "off"
+    with exporthandler.suspendedSceneUpdates(undoChunk=False):
+        pass
+
+    assert sceneCommands.refreshSuspended is True
+    assert sceneCommands.evaluationMode == "off"
+    assert [call for call in sceneCommands.calls if not call[1]["query"]] == []
@@ -0,0 +1,87 @@
+import gzip, json
+
+import pytest
+
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def test_split_filepaths_of_an_empty_selection():
+    assert exporthandler.splitFilepaths(None) == []
+    assert exporthandler.splitFilepaths("") == []
+    assert exporthandler.splitFilepaths(" ; ") == []
+
+def test_split_filepaths_strips_every_file():
+    assert exporthandler.splitFilepaths("walk.json ; run.json.gz;") == ["walk.json", "run.json.gz"]
+
+def test_object_name_from_filepath_drops_every_extension():
+    assert exporthandler.objectNameFromFilepath("/anim/hip_ctrl.json.gz") == "hip_ctrl"
+
+
+def _writeClipFile(filepath):
+    curve = {float(t): keyframe(float(t)) for t in range(3)}
+    exporthandler.writeJson(filepath, {"walk": {"translateX": curve}, "run": {"translateX": curve}}, clips=True)
+
+def test_clip_files_record_their_clips_in_the_header(tmp_path):
+    clipFilepath = str(tmp_path / "hero.json")
+    curveFilepath = str(tmp_path / "prop.json")
+    _writeClipFile(clipFilepath)
+    exporthandler.writeJson(curveFilepath, {"translateX": {1.0: keyframe(1.0)}})
+
+    assert exporthandler.readHeader(clipFilepath)[exporthandler.headerClipsKey] is True
+    assert exporthandler.fileHasClips(clipFilepath)
+    assert not exporthandler.fileHasClips(curveFilepath)
+
+def test_clip_files_without_the_flag_are_told_by_their_shape(tmp_path):
+    filepath = str(tmp_path / "hero.json")
+    with open(filepath, "w") as file:
+        json.dump({"walk": {"translateX": {"1.0": keyframe(1.0)}}}, file)
+    assert exporthandler.fileHasClips(filepath)
+
+def test_importing_a_clip_needs_a_clip_file(tmp_path):
+    clipFilepath = str(tmp_path / "hero.json")
+    curveFilepath = str(tmp_path / "prop.json")
+    _writeClipFile(clipFilepath)
+    exporthandler.writeJson(curveFilepath, {"translateX": {1.0: keyframe(1.0)}})
+
+    assert list(exporthandler.decodeImportFile(clipFilepath, clip="run")) == ["translateX"]
+    with pytest.raises(ValueError):
+        exporthandler.decodeImportFile(clipFilepath)
+    with pytest.raises(ValueError):
+        exporthandler.decodeImportFile(curveFilepath, clip="run")
+
+def test_plain_json_files_without_a_header(tmp_path):
+    curves = {"translateX": {"1.0": keyframe(1.0)}, "translateY": {"2.0": keyframe(2.0)}}
+    for name, opener in (("plain.json", open), ("plain.json.gz", gzip.open)):
+        filepath = str(tmp_path / name)
+        with opener(filepath, "wt") as file:
+            json.dump(curves, file, indent=1)
+        assert exporthandler.readHeader(filepath) is None
+        assert exporthandler.readJson(filepath) == {"translateX": {1.0: keyframe(1.0)}, "translateY": {2.0: keyframe(2.0)}}
+
+def test_msgpack_files_stream_pairs_and_read_old_maps(tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+    curves = {"translateX": {1.0: keyframe(1.0)}, "translateY": {2.0: keyframe(2.0)}}
+    filepath = str(tmp_path / "pairs.msgpack")
+    exporthandler.writeJson(filepath, iter(curves.items()), encoding="msgpack", schema=1)
+    assert exporthandler.readHeader(filepath)[exporthandler.headerLayoutKey] == exporthandler.pairLayout
+    assert exporthandler.readJson(filepath) == curves
+
+    oldFilepath = str(tmp_path / "map.msgpack")
+    with open(oldFilepath, "wb") as file:
+        file.write(exporthandler.encodeHeader("msgpack"))
+        file.write(msgpack.packb(curves, use_bin_type=True))
+    assert exporthandler.readJson(oldFilepath) == curves
+
+def test_clip_lists_typed_into_the_interface():
+    assert exporthandler.parseClipList("") == []
+    assert exporthandler.parseClipList("walk: 0-30, run:31.5 - 60") == [
+        {"name": "walk", "start": 0.0, "end": 30.0},
+        {"name": "run", "start": 31.5, "end": 60.0},
+    ]
+    assert exporthandler.parseClipList("intro: -10-5")[0]["start"] == -10.0
+    with pytest.raises(ValueError):
+        exporthandler.parseClipList("walk 0-30")
+    with pytest.raises(ValueError):
+        exporthandler.parseClipList("walk: 30-0")
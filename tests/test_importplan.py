@@ -0,0 +1,53 @@
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def _curve(times, tangentType="linear", valueOffset=0.0):
+    return {float(t): keyframe(float(t) + valueOffset, tangentType=tangentType) for t in times}
+
+def test_matching_keys_are_left_alone():
+    curve = _curve(range(5))
+    plan = exporthandler.planAttributeImport("translateX", curve, _curve(range(5)))
+    assert plan.isEmpty()
+    assert plan.unchangedKeys == 5
+
+def test_changed_and_new_keys_are_set():
+    target = _curve([0, 1, 2])
+    curve = _curve([0, 1, 2, 3])
+    curve[1.0] = keyframe(5.0, tangentType="linear")
+
+    plan = exporthandler.planAttributeImport("translateX", curve, target)
+
+    assert plan.changeKeys == {1.0: curve[1.0]}
+    assert plan.addKeys == {3.0: curve[3.0]}
+    assert plan.cutRange is None
+    assert plan.unchangedKeys == 2
+
+def test_stale_keys_inside_the_file_range_are_replaced():
+    # the target has keys between and around the file's, only those within the file's range are stale
+    target = _curve([-2, 0, 1, 2, 3, 4, 10])
+    curve = _curve([0, 2, 4])
+
+    plan = exporthandler.planAttributeImport("translateX", curve, target)
+
+    assert plan.cutRange == (1.0, 3.0)
+    # the cut clears the file key inside it, which is set again
+    assert plan.addKeys == {2.0: curve[2.0]}
+    assert plan.changeKeys == {}
+    assert plan.unchangedKeys == 2
+
+def test_offset_keys_are_compared_at_their_new_times():
+    target = _curve([10, 11, 12])
+    curve = {t - 10.0: keyframeData for t, keyframeData in _curve([10, 11, 12]).items()}
+    assert exporthandler.planAttributeImport("translateX", curve, target, keyframeOffset=10).isEmpty()
+
+def test_automatic_tangent_neighbours_of_edits_are_set_again():
+    target = _curve(range(5), tangentType="auto")
+    curve = _curve(range(5), tangentType="auto")
+    curve[2.0] = keyframe(7.0, tangentType="auto")
+
+    plan = exporthandler.planAttributeImport("translateX", curve, target)
+
+    assert sorted(plan.changeKeys) == [1.0, 2.0, 3.0]
+    assert plan.unchangedKeys == 2
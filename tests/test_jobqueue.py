@@ -0,0 +1,85 @@
+from exportapi import jobqueue
+
+
+class FakeEstimator(object):
+
+    def __init__(self, estimates=None):
+        self.estimates = estimates or {}
+        self.durations = []
+
+    def estimate(self, jobType, objectName):
+        return self.estimates.get((jobType, objectName))
+
+    def addDuration(self, jobType, objectName, duration):
+        self.durations.append((jobType, objectName, duration))
+
+
+def _job(objectName, jobType=jobqueue.jobTypeExport, filepath=None, maxRetries=1):
+    return jobqueue.PortJob(jobType, objectName, filepath or f"{objectName}.json", "_exportObjectAnimationData", {}, maxRetries=maxRetries)
+
+def _objectNames(queue):
+    return [job.objectName for job in queue.jobs]
+
+
+def test_move_clamps_to_the_ends_of_the_queue():
+    queue = jobqueue.JobQueue(estimator=FakeEstimator())
+    first, second, third = (queue.enqueue(_job(name)) for name in ("a", "b", "c"))
+
+    queue.move(third.jobId, -1)
+    assert _objectNames(queue) == ["a", "c", "b"]
+    queue.move(first.jobId, 10)
+    assert _objectNames(queue) == ["c", "b", "a"]
+    queue.move(first.jobId, -10)
+    assert _objectNames(queue) == ["a", "c", "b"]
+    queue.move(-1, 1)
+    assert _objectNames(queue) == ["a", "c", "b"]
+
+def test_clear_finished_keeps_waiting_and_running_jobs():
+    queue = jobqueue.JobQueue(estimator=FakeEstimator())
+    done, failed, running, pending = (queue.enqueue(_job(name, maxRetries=0)) for name in ("done", "failed", "running", "pending"))
+    for job in (done, failed, running):
+        queue.jobStarted(job)
+    queue.jobFinished(done, 1.0)
+    queue.jobFinished(failed, 1.0, error="RuntimeError()")
+
+    queue.clearFinished()
+    assert _objectNames(queue) == ["running", "pending"]
+
+def test_failed_job_is_retried_until_its_retries_run_out():
+    estimator = FakeEstimator()
+    queue = jobqueue.JobQueue(estimator=estimator)
+    job = queue.enqueue(_job("a", maxRetries=1))
+
+    queue.jobStarted(job)
+    queue.jobFinished(job, 1.0, error="RuntimeError()")
+    assert job.status == jobqueue.statusPending
+    assert queue.nextPending() is job
+
+    queue.jobStarted(job)
+    queue.jobFinished(job, 1.0, error="RuntimeError()")
+    assert job.status == jobqueue.statusFailed
+    assert job.attempts == 2
+    assert queue.nextPending() is None
+    assert estimator.durations == []
+
+def test_successful_job_feeds_the_estimator():
+    estimator = FakeEstimator()
+    queue = jobqueue.JobQueue(estimator=estimator)
+    job = queue.enqueue(_job("a"))
+
+    queue.jobStarted(job)
+    queue.jobFinished(job, 2.5)
+    assert job.status == jobqueue.statusDone
+    assert job.error is None
+    assert estimator.durations == [(jobqueue.jobTypeExport, "a", 2.5)]
+
+def test_pending_jobs_coalesce_and_sum_their_estimates():
+    queue = jobqueue.JobQueue(estimator=FakeEstimator({(jobqueue.jobTypeExport, "a"): 2.0, (jobqueue.jobTypeImport, "a"): 3.0}))
+    first = queue.enqueue(_job("a", filepath="first.json"))
+    assert queue.enqueue(_job("a", filepath="second.json")) is first
+    assert first.filepath == "second.json"
+    queue.enqueue(_job("a", jobType=jobqueue.jobTypeImport, filepath="walk.json"))
+    queue.enqueue(_job("a", jobType=jobqueue.jobTypeImport, filepath="run.json"))
+
+    assert len(queue.jobs) == 3
+    assert queue.remainingDuration() == 8.0
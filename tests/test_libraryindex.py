@@ -0,0 +1,79 @@
+from conftest import keyframe
+
+from exportapi import exporthandler, libraryindex
+
+
+class FakeCurvesPort(exporthandler.AnimationPort):
+    """
+    Exports given curves instead of reading them from a Maya scene
+    """
+
+    def __init__(self, objectName, curves):
+        super().__init__(objectName)
+        self.curves = curves
+
+    def iterCurves(self, **kwargs):
+        return iter(self.curves)
+
+
+def _indexedHashes(filepath):
+    with libraryindex.LibraryIndex() as index:
+        return {curve["attribute"]: curve["curveHash"] for curve in index.findCurves() if curve["path"] == libraryindex._normalizedPath(filepath)}
+
+def _fileHashes(filepath):
+    return {entry["attribute"]: entry["curveHash"] for entry in libraryindex.fileCurveEntries(filepath)}
+
+
+def test_export_hash_matches_rescan_with_precision(tmp_path):
+    curve = {float(t): keyframe(0.123456789 * t + 1.0 / 3.0, inAngle=12.345678901234567, outAngle=-3.3333333333) for t in range(5)}
+    filepath = str(tmp_path / "rounded.json")
+    FakeCurvesPort("hero", [("translateX", curve)]).exportCurveData(filepath, precision={"values": 6, "angles": 6, "weights": 6, "times": 6})
+
+    assert _indexedHashes(filepath) == _fileHashes(filepath)
+    assert _indexedHashes(filepath)["translateX"] != libraryindex.curveHash(curve)
+
+def test_export_hash_matches_rescan_for_collapsed_curves(tmp_path):
+    curve = {float(t): keyframe(0.1 * t + 0.123456789) for t in range(10)}
+    offsetCurve = {t: dict(k, value=k["value"] + 0.333333333) for t, k in curve.items()}
+    staticCurve = {float(t): keyframe(2.0) for t in range(3)}
+    filepath = str(tmp_path / "collapsed.json")
+    FakeCurvesPort("hero", [("a", curve), ("b", offsetCurve), ("c", staticCurve)]).exportCurveData(filepath, precision={"values": 4})
+
+    raw = dict(exporthandler.iterJson(filepath, expand=False))
+    assert exporthandler.referenceCurveKey in raw["b"]
+    assert exporthandler.staticCurveKey in raw["c"]
+    assert _indexedHashes(filepath) == _fileHashes(filepath)
+
+def test_clip_export_hash_matches_rescan(tmp_path):
+    curve = {float(t): keyframe(t / 7.0) for t in range(20)}
+    clips = [{"name": "start", "start": 0, "end": 9}, {"name": "end", "start": 10, "end": 19}]
+    filepath = str(tmp_path / "clips.json")
+    FakeCurvesPort("hero", [("rotateY", curve)]).exportClips(filepath, clips, precision={"values": 3})
+
+    with libraryindex.LibraryIndex() as index:
+        indexed = {(curve["clip"], curve["attribute"]): curve["curveHash"] for curve in index.findCurves()}
+    rescanned = {(entry["clip"], entry["attribute"]): entry["curveHash"] for entry in libraryindex.fileCurveEntries(filepath)}
+    assert indexed == rescanned
+
+def _clipHashes(filepath):
+    with libraryindex.LibraryIndex() as index:
+        indexed = {(curve["clip"], curve["attribute"]): curve["curveHash"] for curve in index.findCurves() if curve["path"] == libraryindex._normalizedPath(filepath)}
+    rescanned = {(entry["clip"], entry["attribute"]): entry["curveHash"] for entry in libraryindex.fileCurveEntries(filepath)}
+    return indexed, rescanned
+
+def test_clip_export_hash_matches_rescan_for_reference_curves(tmp_path):
+    curve = {float(t): keyframe(t / 7.0) for t in range(20)}
+    offsetCurve = {t: dict(k, value=k["value"] + 2.5) for t, k in curve.items()}
+    clips = [{"name": "start", "start": 0, "end": 9}, {"name": "end", "start": 10, "end": 19}]
+    port = FakeCurvesPort("hero", [("rotateY", curve), ("rotateZ", offsetCurve)])
+
+    filepath = str(tmp_path / "clips.json")
+    port.exportClips(filepath, clips, precision={"values": 3})
+    indexed, rescanned = _clipHashes(filepath)
+    assert len(indexed) == 4
+    assert indexed == rescanned
+
+    for clipFilepath in port.exportClips(str(tmp_path / "separate.json"), clips, separateFiles=True, precision={"values": 3}):
+        assert exporthandler.referenceCurveKey in dict(exporthandler.iterJson(clipFilepath, expand=False))["rotateZ"]
+        assert len(_indexedHashes(clipFilepath)) == 2
+        assert _indexedHashes(clipFilepath) == _fileHashes(clipFilepath)
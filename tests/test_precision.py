@@ -0,0 +1,63 @@
+from exportapi import exporthandler
+
+
+def test_round_single_value():
+    assert exporthandler.roundColumn(1.23456789, 3) == (1.235, abs(1.23456789 - 1.235))
+    assert exporthandler.roundColumn("auto", 3) == ("auto", 0.0)
+
+def test_round_column_turns_negative_zero_positive():
+    rounded, _ = exporthandler.roundColumn(-0.0001, 2)
+    assert str(rounded) == "0.0"
+    rounded, _ = exporthandler.roundColumn([-0.0001, 1.5], 2)
+    assert [str(value) for value in rounded] == ["0.0", "1.5"]
+
+def test_round_column_in_python_and_numpy_agree():
+    for length in (exporthandler.vectorizedColumnLength - 1, exporthandler.vectorizedColumnLength + 1):
+        values = [index / 7.0 for index in range(length)]
+        rounded, error = exporthandler.roundColumn(values, 4)
+        assert rounded == [round(value, 4) for value in values]
+        assert error == max(abs(value - round(value, 4)) for value in values)
+        assert all(type(value) is float for value in rounded)
+
+def test_round_column_leaves_non_float_values():
+    rounded, error = exporthandler.roundColumn([1, 2.123456, None], 2)
+    assert rounded == [1, 2.12, None]
+    assert abs(error - 0.003456) < 1e-12
+    assert exporthandler.roundColumn([], 2) == ([], 0.0)
+
+def test_round_curve_follows_each_field_setting():
+    curve = {
+        "times": [1.0, 2.00000004],
+        "values": [0.123456789, 0.5],
+        "inType": "auto",
+        "inAngle": [10.987654, 0.0],
+        "outAngle": 3.33333333,
+        "inWeight": 1.0,
+    }
+    precisionLoss = {"values": 1.0}
+    rounded = exporthandler.roundCurve(curve, {"times": 3, "values": 4, "angles": 2, "weights": None}, precisionLoss)
+
+    assert rounded == {
+        "times": [1.0, 2.0],
+        "values": [0.1235, 0.5],
+        "inType": "auto",
+        "inAngle": [10.99, 0.0],
+        "outAngle": 3.33,
+        "inWeight": 1.0,
+    }
+    assert curve["values"] == [0.123456789, 0.5]
+    # the largest error so far is kept, smaller ones never lower it
+    assert precisionLoss["values"] == 1.0
+    assert abs(precisionLoss["times"] - 4e-8) < 1e-12
+    assert abs(precisionLoss["angles"] - abs(3.33333333 - 3.33)) < 1e-12
+    assert "weights" not in precisionLoss
+
+def test_round_collapsed_curve_keeps_reference_offsets():
+    static = {"@static": 0.333333, "@times": [1.0, 2.0], "@inAngle": 0.0}
+    reference = {"@reference": "translateX", "@offset": 0.333333}
+    precision = {"values": 2, "times": 2, "angles": 2}
+    assert exporthandler.roundCurve(static, precision, {})["@static"] == 0.33
+    assert exporthandler.roundCurve(reference, precision, {}) == reference
+
+def test_floats_are_written_in_full_by_default():
+    assert exporthandler.exportPrecision() is None
@@ -0,0 +1,22 @@
+import os
+
+from exportapi import profiling
+
+
+def test_nested_jobs_write_one_profile_named_after_the_outer_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_enabled", True)
+    monkeypatch.delenv(profiling.profileDirectoryEnvironmentVariable, raising=False)
+    monkeypatch.setattr(profiling.resources, "profileDirectory", lambda: None)
+    filepath = str(tmp_path / "walk.json")
+
+    with profiling.profiledJob("export", objectName="hero:hip_ctrl", filepath=filepath):
+        with profiling.profiledJob("import", filepath=str(tmp_path / "other" / "run.json")):
+            sum(range(1000))
+
+    profiles = [name for name in os.listdir(tmp_path) if name.endswith(".prof")]
+    assert len(profiles) == 1
+    assert profiles[0].startswith("export_hero_hip_ctrl_")
+
+def test_profile_names_of_quick_jobs_differ():
+    names = {profiling._profileName("export", objectName="cube") for _ in range(50)}
+    assert len(names) > 1
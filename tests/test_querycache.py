@@ -0,0 +1,48 @@
+from exportapi import exporthandler
+
+
+class FakeCommands(object):
+    """
+    Answers the attribute queries for one object, 'directCurves' connect straight to its plugs and 'blendedCurves' reach
+    them through a pairBlend or animLayer
+    """
+
+    def __init__(self, keyable, directCurves, blendedCurves=None):
+        self.keyable = keyable
+        self.directCurves = directCurves
+        self.blendedCurves = blendedCurves or {}
+
+    def listAttr(self, objectName, keyable=True):
+        return list(self.keyable)
+
+    def listConnections(self, objectName, **kwargs):
+        connections = []
+        for attr, curve in self.directCurves.items():
+            connections += [f"{objectName}.{attr}", curve]
+        return connections
+
+    def keyframe(self, objectName, attribute=None, query=True, name=False, keyframeCount=False):
+        curves = dict(self.directCurves, **self.blendedCurves)
+        if name:
+            return list(curves.values())
+        return 2 if attribute in curves else 0
+
+
+def _baselineAnimatedAttributes(commands, objectName):
+    # one keyframe count per keyable attribute, as attributes were found before the query cache
+    return [attr for attr in commands.listAttr(objectName, keyable=True) if commands.keyframe(objectName, attribute=attr, query=True, keyframeCount=True) > 0]
+
+
+def test_directly_keyed_attributes(monkeypatch):
+    commands = FakeCommands(["translateX", "translateY", "visibility"], {"translateX": "hero_translateX"})
+    monkeypatch.setattr(exporthandler, "cmds", commands)
+    assert exporthandler.getAnimatedObjectAttributes("hero") == _baselineAnimatedAttributes(commands, "hero") == ["translateX"]
+
+def test_attributes_keyed_through_blend_nodes(monkeypatch):
+    commands = FakeCommands(
+        ["translateX", "translateY", "rotateX", "visibility"],
+        {"translateX": "hero_translateX"},
+        {"translateY": "hero_translateY_BaseLayer", "rotateX": "hero_rotateX_pairBlend"}
+    )
+    monkeypatch.setattr(exporthandler, "cmds", commands)
+    assert exporthandler.getAnimatedObjectAttributes("hero") == _baselineAnimatedAttributes(commands, "hero") == ["translateX", "translateY", "rotateX"]
@@ -0,0 +1,57 @@
+import os, sys, importlib
+
+import pytest
+
+import reloadmanager
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """
+    A throwaway package whose 'consumer' module imports from its 'base' module
+    """
+    packageDir = tmp_path / "reloadpkg"
+    packageDir.mkdir()
+    (packageDir / "__init__.py").write_text("")
+    (packageDir / "base.py").write_text("VALUE = 1\n")
+    (packageDir / "consumer.py").write_text("from . import base\n\ndef value():\n    return base.VALUE\n")
+    (packageDir / "other.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    yield packageDir
+    for name in [name for name in sys.modules if name.split(".")[0] == "reloadpkg"]:
+        del sys.modules[name]
+
+def _edit(filepath, text):
+    filepath.write_text(text)
+    _mtime = os.stat(filepath).st_mtime_ns + 10 ** 10
+    os.utime(filepath, ns=(_mtime, _mtime))
+
+
+def test_changed_modules_reload_before_their_dependents(package):
+    consumer = importlib.import_module("reloadpkg.consumer")
+    other = importlib.import_module("reloadpkg.other")
+    manager = reloadmanager.ReloadManager(str(package))
+    manager.snapshot()
+    assert manager.reloadChanged() == []
+
+    _edit(package / "base.py", "VALUE = 2\n")
+
+    # the package itself holds its submodules as attributes, so it reloads along with them
+    reloaded = manager.reloadChanged()
+    assert sorted(reloaded) == ["reloadpkg", "reloadpkg.base", "reloadpkg.consumer"]
+    assert reloaded[0] == "reloadpkg.base"
+    assert consumer.value() == 2
+    assert sys.modules["reloadpkg.other"] is other
+    assert manager.reloadChanged() == []
+
+def test_modules_imported_after_the_snapshot_reload_on_their_first_edit(package):
+    importlib.import_module("reloadpkg.base")
+    manager = reloadmanager.ReloadManager(str(package))
+    manager.snapshot()
+
+    other = importlib.import_module("reloadpkg.other")
+    _edit(package / "other.py", "VALUE = 3\n")
+
+    assert manager.reloadChanged() == ["reloadpkg.other", "reloadpkg"]
+    assert other.VALUE == 3
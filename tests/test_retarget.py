@@ -0,0 +1,35 @@
+import logging
+
+import pytest
+
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def test_picked_attributes_filter_the_file_and_log_the_rest(caplog):
+    curves = {"translateX": {1.0: keyframe(1.0)}, "rotateY": {1.0: keyframe(2.0)}}
+    assert exporthandler.selectedCurveData("hero", curves) is curves
+    assert exporthandler.selectedCurveData("hero", curves, attributes=[]) is curves
+
+    with caplog.at_level(logging.INFO, logger=exporthandler.__name__):
+        assert exporthandler.selectedCurveData("hero", curves, attributes=["translateX"]) == {"translateX": curves["translateX"]}
+    assert "rotateY" in caplog.text
+
+def test_mapping_rules_run_in_order_per_scope():
+    pytest.importorskip("maya.cmds")
+    from exportapi import retarget
+
+    mapping = retarget.NameMapping([
+        {"type": "prefix", "from": "src_", "to": "tgt_"},
+        {"type": "namespace", "from": "", "to": "crowd01"},
+        {"type": "regex", "pattern": "^crowd01:L_(.*)$", "replace": "crowd01:Left_\\1"},
+        {"type": "table", "scope": "attribute", "mapping": {"rotateY": "spin"}},
+    ])
+    assert mapping.mapObject("src_hip_ctrl") == "crowd01:tgt_hip_ctrl"
+    assert mapping.mapObject("L_arm") == "crowd01:Left_arm"
+    assert mapping.mapObject("root|arm") == "crowd01:root|crowd01:arm"
+    assert mapping.mapAttribute("rotateY") == "spin"
+    assert mapping.mapAttribute("rotateX") == "rotateX"
+    with pytest.raises(ValueError):
+        retarget.NameMapping([{"type": "glob"}])
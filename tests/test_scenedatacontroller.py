@@ -0,0 +1,30 @@
+import types
+
+import pytest
+
+pytest.importorskip("PySide2")
+
+from exportapi import exporthandler, scenedatacontroller, telemetry
+
+
+def _fakeCommands():
+    keyCounts = {"hero": 4, "prop": 0}
+    return types.SimpleNamespace(
+        ls=lambda *args, **kwargs: list(keyCounts),
+        keyframe=lambda objectName, **kwargs: keyCounts[objectName]
+    )
+
+
+def test_object_discovery_is_recorded(monkeypatch):
+    monkeypatch.setattr(exporthandler, "cmds", telemetry.countingCommands(_fakeCommands()))
+    controller = scenedatacontroller.SceneDataController()
+    gathered = []
+    controller.ObjectNamesGathered.connect(gathered.append)
+
+    controller._emitAnimatedObjects()
+
+    assert gathered == [["hero"]]
+    record = telemetry.readRecords()[-1]
+    assert record["jobType"] == "objectDiscovery"
+    assert "discovery" in record["phases"]
+    assert record["mayaCalls"] == {"ls": 1, "keyframe": 2}
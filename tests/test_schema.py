@@ -0,0 +1,45 @@
+import gzip, json
+
+from conftest import keyframe
+
+from exportapi import exporthandler, schemamigration
+
+
+def test_compact_columns_round_trip():
+    curve = {float(t): keyframe(t / 3.0, inAngle=float(t)) for t in range(4)}
+    columns = exporthandler.curveToColumns(curve, compact=True)
+
+    assert columns["times"] == [0.0, 1.0, 2.0, 3.0]
+    assert columns["inAngle"] == [0.0, 1.0, 2.0, 3.0]
+    # tangent columns holding one value for every key are written once
+    assert columns["inWeight"] == 1.0
+    assert exporthandler.columnsToCurve(columns) == curve
+
+def test_schema_1_files_migrate_to_columns(tmp_path):
+    curves = {
+        "translateX": {str(float(t)): keyframe(t * 0.5) for t in range(3)},
+        "visibility": {exporthandler.staticCurveKey: 1.0, exporthandler.staticTimesKey: [0.0, 5.0]},
+    }
+    filepath = str(tmp_path / "hero.json.gz")
+    with gzip.open(filepath, "wt") as file:
+        json.dump(curves, file)
+    before = exporthandler.readJson(filepath)
+    assert schemamigration.fileSchemaVersion(filepath) == 1
+
+    assert schemamigration.migrateFile(filepath) == (filepath, schemamigration.migratedStatus, None)
+
+    assert schemamigration.fileSchemaVersion(filepath) == exporthandler.currentSchemaVersion
+    stored = dict(exporthandler.iterJson(filepath, expand=False))
+    assert exporthandler.isColumnarCurve(stored["translateX"])
+    assert exporthandler.staticCurveKey in stored["visibility"]
+    assert exporthandler.readJson(filepath) == before
+    assert schemamigration.migrateFile(filepath)[1] == schemamigration.currentStatus
+
+def test_unreadable_files_fail_without_being_touched(tmp_path):
+    filepath = str(tmp_path / "broken.json")
+    with open(filepath, "w") as file:
+        file.write("{not json")
+    _, status, error = schemamigration.migrateFile(filepath)
+    assert status == schemamigration.failedStatus and error
+    with open(filepath) as file:
+        assert file.read() == "{not json"
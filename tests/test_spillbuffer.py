@@ -0,0 +1,67 @@
+import os
+
+from conftest import keyframe
+
+from exportapi import exporthandler
+
+
+def _curve(offset, keyCount=20):
+    return {float(t): keyframe(offset + t) for t in range(keyCount)}
+
+def _shardFiles(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".shard"))
+
+
+def test_nothing_spills_without_a_budget(tmp_path):
+    with exporthandler.SpillBuffer(directory=str(tmp_path)) as buffer:
+        for index in range(50):
+            buffer.append(f"attr{index}", _curve(index))
+        assert buffer.shardCount() == 0
+        assert len(buffer) == 50
+    assert _shardFiles(tmp_path) == []
+
+def test_entries_keep_their_order_across_shards(tmp_path):
+    curves = [(f"attr{index}", _curve(index)) for index in range(30)]
+    budget = 3 * exporthandler.estimateDataSize(curves[0][1])
+    with exporthandler.SpillBuffer(budget, directory=str(tmp_path)) as buffer:
+        for key, curve in curves:
+            buffer.append(key, curve)
+        assert buffer.shardCount() > 1
+        assert len(_shardFiles(tmp_path)) == buffer.shardCount()
+        assert list(buffer.items()) == curves
+
+def test_get_reads_spilled_and_held_entries(tmp_path):
+    curves = [(f"attr{index}", _curve(index)) for index in range(10)]
+    budget = 3 * exporthandler.estimateDataSize(curves[0][1])
+    with exporthandler.SpillBuffer(budget, directory=str(tmp_path)) as buffer:
+        indices = [buffer.append(key, curve) for key, curve in curves]
+        assert buffer.shardCount()
+        for index, entry in zip(indices, curves):
+            assert buffer.get(index) == entry
+
+        # keyed access gives the value last added under a key
+        buffer.append("attr0", _curve(100))
+        assert "attr0" in buffer and "missing" not in buffer
+        assert buffer["attr0"] == _curve(100)
+        assert buffer["attr5"] == curves[5][1]
+
+def test_close_removes_every_shard(tmp_path):
+    buffer = exporthandler.SpillBuffer(1, directory=str(tmp_path))
+    for index in range(5):
+        buffer.append(f"attr{index}", _curve(index))
+    assert len(_shardFiles(tmp_path)) == 5
+
+    buffer.close()
+    assert _shardFiles(tmp_path) == []
+    assert len(buffer) == 0 and buffer.shardCount() == 0 and buffer.heldBytes == 0
+    assert list(buffer.items()) == []
+
+
+def test_data_size_grows_with_the_curve():
+    small, large = exporthandler.estimateDataSize(_curve(0, 10)), exporthandler.estimateDataSize(_curve(0, 100))
+    assert 5 * small < large < 20 * small
+
+def test_data_size_of_columns_counts_every_value():
+    columns = exporthandler.curveToColumns(_curve(0, 100), compact=True)
+    assert exporthandler.estimateDataSize(columns) > 100 * 8
+    assert exporthandler.estimateDataSize([]) > 0
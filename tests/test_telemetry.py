@@ -0,0 +1,49 @@
+import threading, types
+
+from exportapi import telemetry
+
+
+def _fakeCommands():
+    return types.SimpleNamespace(keyframe=lambda *args, **kwargs: [], listAttr=lambda *args, **kwargs: [])
+
+
+def test_commands_are_counted_into_the_callers_job_only():
+    commands = telemetry.countingCommands(_fakeCommands())
+    counts = {}
+    started = threading.Barrier(2)
+
+    def runJob(name, calls):
+        with telemetry.recordJob(name) as job:
+            started.wait()
+            for _ in range(calls):
+                commands.keyframe("obj")
+            counts[name] = dict(job.mayaCalls)
+
+    threads = [threading.Thread(target=runJob, args=("first", 3)), threading.Thread(target=runJob, args=("second", 5))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counts == {"first": {"keyframe": 3}, "second": {"keyframe": 5}}
+
+def test_commands_outside_a_job_are_not_wrapped():
+    fakeCommands = _fakeCommands()
+    commands = telemetry.countingCommands(fakeCommands)
+    assert commands.keyframe is fakeCommands.keyframe
+    assert telemetry.countingCommands(None) is None
+
+def test_nested_jobs_fold_into_the_outer_job():
+    with telemetry.recordJob("outer") as outer:
+        with telemetry.recordJob("inner") as inner:
+            telemetry.addKeys(4)
+    assert inner is outer
+    assert outer.keys == 4
+    assert [record["jobType"] for record in telemetry.readRecords()] == ["outer"]
+
+def test_records_label_process_peak_separately():
+    with telemetry.recordJob("export"):
+        pass
+    record = telemetry.readRecords()[-1]
+    assert "processPeakMemory" in record and "processPeakMemoryGrowth" in record
+    assert telemetry.activeJob() is None
@@ -0,0 +1,58 @@
+import numpy as np
+
+from exportapi import curveevaluator, timetransform
+
+
+def _curve(types, weighted=False):
+    keyCount = len(types)
+    return curveevaluator.CurveArrays(
+        times=[0.0, 4.0, 10.0, 13.0][:keyCount],
+        values=[0.0, 5.0, -2.0, 1.0][:keyCount],
+        inTangentTypes=[inType for inType, _ in types],
+        inAngles=[0.0, 30.0, -45.0, 10.0][:keyCount],
+        inWeights=[1.0, 2.0, 0.5, 1.5][:keyCount] if weighted else [1.0] * keyCount,
+        outTangentTypes=[outType for _, outType in types],
+        outAngles=[20.0, 30.0, -60.0, 10.0][:keyCount],
+        outWeights=[1.5, 0.7, 1.2, 1.0][:keyCount] if weighted else [1.0] * keyCount,
+        weighted=weighted
+    )
+
+
+def test_reversed_steps_stay_out_tangents_and_hold_the_same_values():
+    curve = _curve([("fixed", "step"), ("fixed", "fixed"), ("linear", "stepnext"), ("fixed", "fixed")])
+    reversedCurve = timetransform.TimeTransform(reverse=True).apply(curve)
+
+    assert not np.any(timetransform._isStepTangent(reversedCurve.inTangentTypes))
+    assert list(reversedCurve.outTangentTypes) == ["step", "linear", "stepnext", "fixed"]
+    sampleTimes = np.linspace(0.0, 13.0, 131)
+    np.testing.assert_allclose(
+        curveevaluator.evaluateCurve(reversedCurve, 13.0 - sampleTimes),
+        curveevaluator.evaluateCurve(curve, sampleTimes),
+        atol=1e-9
+    )
+
+def test_clipping_adds_boundary_keys_keeping_the_shape():
+    for weighted in (False, True):
+        curve = _curve([("fixed", "fixed")] * 4, weighted=weighted)
+        clipped = timetransform.TimeTransform(clipStart=2.5, clipEnd=11.0).apply(curve)
+
+        assert clipped.times[0] == 2.5 and clipped.times[-1] == 11.0
+        sampleTimes = np.linspace(2.5, 11.0, 86)
+        np.testing.assert_allclose(
+            curveevaluator.evaluateCurve(clipped, sampleTimes),
+            curveevaluator.evaluateCurve(curve, sampleTimes),
+            atol=1e-9
+        )
+
+def test_clipping_inside_a_step_keeps_stepping():
+    curve = _curve([("fixed", "step"), ("fixed", "stepnext"), ("fixed", "fixed")])
+    clipped = timetransform.TimeTransform(clipStart=2.0, clipEnd=7.0).apply(curve)
+
+    assert list(clipped.times) == [2.0, 4.0, 7.0]
+    assert list(clipped.values) == [0.0, 5.0, -2.0]
+    assert list(clipped.outTangentTypes[:2]) == ["step", "stepnext"]
+
+def test_clipping_on_a_key_adds_nothing():
+    curve = _curve([("fixed", "fixed")] * 4)
+    clipped = timetransform.TimeTransform(clipStart=4.0, clipEnd=20.0).apply(curve)
+    assert list(clipped.times) == [4.0, 10.0, 13.0]